@@ -1,5 +1,51 @@
-from .client import HChat
-from .types.request import InputMessage, MessageRole
-from .types.response import LLMResponse, ResponseChunk
+"""
+Public API. Names are resolved on first attribute access so `import hchat_sdk`
+stays cheap; httpx, pydantic and the provider modules load only when used.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
 
-__all__ = ['HChat', 'InputMessage', 'MessageRole', 'LLMResponse', 'ResponseChunk']
+if TYPE_CHECKING:
+    from .client import HChat, SyncHChat
+    from .errors import (
+        BudgetExceededError, ContextWindowExceededError, ProviderStreamError, QueueTimeoutError, StructuredOutputError
+    )
+    from .tokens import count_tokens, count_tokens_batch
+    from .types.request import InputMessage, MessageRole
+    from .types.response import LLMResponse, ResponseChunk
+
+# public name -> defining submodule
+_LAZY_ATTRS = {
+    'HChat': '.client',
+    'SyncHChat': '.client',
+    'ContextWindowExceededError': '.errors',
+    'QueueTimeoutError': '.errors',
+    'BudgetExceededError': '.errors',
+    'StructuredOutputError': '.errors',
+    'ProviderStreamError': '.errors',
+    'count_tokens': '.tokens',
+    'count_tokens_batch': '.tokens',
+    'InputMessage': '.types.request',
+    'MessageRole': '.types.request',
+    'LLMResponse': '.types.response',
+    'ResponseChunk': '.types.response',
+}
+
+__all__ = [
+    'HChat', 'SyncHChat', 'InputMessage', 'MessageRole', 'LLMResponse', 'ResponseChunk',
+    'ContextWindowExceededError', 'QueueTimeoutError', 'BudgetExceededError',
+    'StructuredOutputError', 'ProviderStreamError', 'count_tokens', 'count_tokens_batch'
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
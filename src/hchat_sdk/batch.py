@@ -0,0 +1,275 @@
+"""
+Offline batch jobs over JSONL files.
+
+Each input line is an LLMRequest-shaped record:
+
+    {"id": "q1", "model": "gpt-4o", "messages": [...], "max_tokens": 256, ...}
+
+(`input` may be used instead of `messages`.) Results are appended to the output
+JSONL as they finish, and a checkpoint file records the input byte offset below
+which every line is done, so an interrupted job resumes where it stopped:
+
+    python -m hchat_sdk.batch requests.jsonl results.jsonl --concurrency 32 --rate-limit 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pydantic import BaseModel
+
+from .client import HChat
+
+# Keys of an input record that are not forwarded as config
+_RECORD_KEYS = {'id', 'model', 'messages', 'input', 'provider', 'api_key', 'apiKey', 'api_base', 'apiBase', 'stream'}
+
+
+class BatchProgress(BaseModel):
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    in_flight: int = 0
+    elapsed: float = 0.0
+    throughput: float = 0.0  # completed requests per second in this run
+    fraction: float = 0.0  # share of input bytes done
+    eta_seconds: Optional[float] = None
+    # With adaptive concurrency: current limits summed over (provider, model) and requests waiting for a slot
+    concurrency_limit: Optional[float] = None
+    queued: int = 0
+
+
+class _RateLimiter:
+    """Spaces request starts to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BatchRunner:
+    """
+    Streams a JSONL file of requests through `Messages.complete`.
+    - Bounded concurrency and optional requests-per-second limit
+    - Memory stays flat: at most `max_window` lines are tracked past the checkpoint
+    - Resumable: completed lines are never re-sent after a restart
+    """
+
+    def __init__(
+        self,
+        client: HChat,
+        concurrency: int = 16,
+        rate_limit: Optional[float] = None,
+        progress_interval: float = 5.0,
+        on_progress: Optional[Callable[[BatchProgress], None]] = None,
+        max_window: Optional[int] = None
+    ):
+        self.client = client
+        self.concurrency = concurrency
+        self.rate_limiter = _RateLimiter(rate_limit) if rate_limit else None
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress or self._print_progress
+        self.max_window = max_window or concurrency * 64
+
+    async def run(self, input_path: str, output_path: str, checkpoint_path: Optional[str] = None) -> BatchProgress:
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        state = self._load_checkpoint(checkpoint_path)
+        self._offset: int = state["offset"]
+        self._line: int = state["line"]
+        done_ahead: Set[int] = set(state["done"])
+
+        self._checkpoint_path = checkpoint_path
+        self._window: "OrderedDict[int, List[Any]]" = OrderedDict()  # line -> [end_offset, done]
+        self._window_changed = asyncio.Event()
+        self._progress = BatchProgress()
+        self._total_bytes = os.path.getsize(input_path)
+        self._start_offset = self._offset
+        self._started = time.monotonic()
+
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+        reporter = asyncio.ensure_future(self._report_loop())
+
+        try:
+            with open(input_path, 'rb') as src, open(output_path, 'a', encoding='utf-8') as out:
+                src.seek(self._offset)
+                line_no = self._line
+                while True:
+                    await slots.acquire()
+                    while len(self._window) >= self.max_window:
+                        self._window_changed.clear()
+                        await self._window_changed.wait()
+
+                    raw = src.readline()
+                    if not raw:
+                        slots.release()
+                        break
+                    n = line_no
+                    line_no += 1
+                    self._window[n] = [src.tell(), False]
+
+                    if n in done_ahead or not raw.strip():
+                        self._progress.skipped += 1
+                        self._mark_done(n)
+                        slots.release()
+                        continue
+
+                    task = asyncio.ensure_future(self._process(n, raw, out, slots))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if tasks:
+                    await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            reporter.cancel()
+            self._save_checkpoint()
+
+        self._update_progress()
+        self.on_progress(self._progress)
+        return self._progress
+
+    async def _process(self, n: int, raw: bytes, out, slots: asyncio.Semaphore) -> None:
+        self._progress.in_flight += 1
+        record_id: Any = n
+        try:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            try:
+                record = json.loads(raw)
+                record_id = record.get("id", n)
+                model = record["model"]
+                input = record.get("messages", record.get("input"))
+                if input is None:
+                    raise ValueError("record needs 'messages' or 'input'")
+                config = {k: v for k, v in record.items() if k not in _RECORD_KEYS}
+                response = await self.client.messages.complete(model, input, **config)
+                result = {"id": record_id, "line": n, "response": response.model_dump(mode="json")}
+                self._progress.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = {"id": record_id, "line": n, "error": {"type": type(e).__name__, "message": str(e)}}
+                self._progress.failed += 1
+
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            self._mark_done(n)
+            self._save_checkpoint()
+        finally:
+            self._progress.in_flight -= 1
+            slots.release()
+
+    def _mark_done(self, n: int) -> None:
+        self._window[n][1] = True
+        # Advance the watermark over the contiguous prefix of finished lines
+        while self._window:
+            first, (end_offset, done) = next(iter(self._window.items()))
+            if not done:
+                break
+            self._window.popitem(last=False)
+            self._offset = end_offset
+            self._line = first + 1
+        self._window_changed.set()
+
+    def _load_checkpoint(self, path: str) -> Dict[str, Any]:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"offset": 0, "line": 0, "done": []}
+
+    def _save_checkpoint(self) -> None:
+        state = {
+            "offset": self._offset,
+            "line": self._line,
+            "done": [n for n, (_, done) in self._window.items() if done],
+        }
+        tmp = f"{self._checkpoint_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, self._checkpoint_path)
+
+    def _update_progress(self) -> None:
+        p = self._progress
+        p.elapsed = time.monotonic() - self._started
+        p.throughput = (p.completed + p.failed) / p.elapsed if p.elapsed > 0 else 0.0
+        p.fraction = self._offset / self._total_bytes if self._total_bytes else 1.0
+        processed = self._offset - self._start_offset
+        remaining = self._total_bytes - self._offset
+        p.eta_seconds = p.elapsed * remaining / processed if processed > 0 else None
+
+        controller = getattr(self.client.messages, "concurrency_controller", None)
+        if controller is not None:
+            stats = controller.stats()
+            p.concurrency_limit = sum(s.limit for s in stats)
+            p.queued = sum(s.queued for s in stats)
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            self._update_progress()
+            self.on_progress(self._progress)
+
+    @staticmethod
+    def _print_progress(p: BatchProgress) -> None:
+        eta = f"{int(p.eta_seconds // 60)}m{int(p.eta_seconds % 60):02d}s" if p.eta_seconds is not None else "?"
+        limit = f" (limit {p.concurrency_limit:.0f}, queued {p.queued})" if p.concurrency_limit is not None else ""
+        print(
+            f"[batch] {p.fraction:6.1%} | done {p.completed} | failed {p.failed} | in flight {p.in_flight}{limit} "
+            f"| {p.throughput:.1f} req/s | ETA {eta}",
+            file=sys.stderr
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m hchat_sdk.batch", description="Run a JSONL file of requests through HChat.")
+    parser.add_argument("input", help="Input JSONL of request records")
+    parser.add_argument("output", help="Output JSONL (appended to)")
+    parser.add_argument("--checkpoint", help="Checkpoint path (default: <output>.checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--adaptive-concurrency", action="store_true",
+        help="Adapt the in-flight limit per model to latency and 429/503 (--concurrency becomes the ceiling)"
+    )
+    parser.add_argument("--rate-limit", type=float, default=None, help="Max requests per second")
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    parser.add_argument("--api-key", default=os.getenv("HCHAT_API_KEY") or os.getenv("API_KEY"))
+    parser.add_argument("--api-base", default=None)
+    parser.add_argument("--uds", default=None, help="Unix domain socket of a local egress proxy")
+    parser.add_argument("--proxy", default=None, help="HTTP(S) proxy URL")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or HCHAT_API_KEY)")
+
+    async def _run() -> None:
+        async with HChat(
+            api_key=args.api_key, api_base=args.api_base, adaptive_concurrency=args.adaptive_concurrency,
+            uds=args.uds, proxy=args.proxy
+        ) as client:
+            runner = BatchRunner(
+                client,
+                concurrency=args.concurrency,
+                rate_limit=args.rate_limit,
+                progress_interval=args.progress_interval
+            )
+            await runner.run(args.input, args.output, args.checkpoint)
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,164 @@
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Mapping, Optional, Tuple
 from pydantic import BaseModel
 
+class ModelPricing(BaseModel):
+    """USD per 1M tokens. Cache prices fall back to the input price when unset."""
+    input: float
+    output: float
+    cache_read: Optional[float] = None
+    cache_write: Optional[float] = None
+
+ReasoningEffort = Literal['minimal', 'low', 'medium', 'high']
+
 class ModelCapability(BaseModel):
     model: str
     provider: str
     max_tokens: int
+    context_window: int
+    pricing: Optional[ModelPricing] = None
+    # Whether the model accepts reasoning controls, and the effort used when a call sets none
+    reasoning: bool = False
+    default_reasoning_effort: Optional[ReasoningEffort] = None
 
 # Simple registry based on the Node SDK
-MODEL_CAPABILITIES = [
+# (model, provider, max_tokens, context_window). Kept as plain tuples so importing
+# this module builds no models; ModelCapability instances are created on first use.
+_REGISTRY: List[Tuple[str, str, int, int]] = [
     # OpenAI (Mapped to azure provider for HChat deployment logic)
-    # ModelCapability(model='gpt-5', provider='azure', max_tokens=16384),
-    ModelCapability(model='gpt-5-mini', provider='azure', max_tokens=16384),
-    ModelCapability(model='gpt-4o', provider='azure', max_tokens=4096),
-    ModelCapability(model='gpt-4o-mini', provider='azure', max_tokens=16384),
-    ModelCapability(model='gpt-4.1', provider='azure', max_tokens=16384),
-    ModelCapability(model='gpt-4.1-mini', provider='azure', max_tokens=16384),
+    # ('gpt-5', 'azure', 16384, 400000),
+    ('gpt-5-mini', 'azure', 16384, 400000),
+    ('gpt-4o', 'azure', 4096, 128000),
+    ('gpt-4o-mini', 'azure', 16384, 128000),
+    ('gpt-4.1', 'azure', 16384, 1047576),
+    ('gpt-4.1-mini', 'azure', 16384, 1047576),
     
     # Anthropic
-    ModelCapability(model='claude-sonnet-4', provider='anthropic', max_tokens=8192),
-    ModelCapability(model='claude-sonnet-4-5', provider='anthropic', max_tokens=8192),
-    ModelCapability(model='claude-haiku-4-5', provider='anthropic', max_tokens=4096),
-    ModelCapability(model='claude-3-7-sonnet', provider='anthropic', max_tokens=8192),
-    ModelCapability(model='claude-3-5-sonnet-v2', provider='anthropic', max_tokens=8192),
+    ('claude-sonnet-4', 'anthropic', 8192, 200000),
+    ('claude-sonnet-4-5', 'anthropic', 8192, 200000),
+    ('claude-haiku-4-5', 'anthropic', 4096, 200000),
+    ('claude-3-7-sonnet', 'anthropic', 8192, 200000),
+    ('claude-3-5-sonnet-v2', 'anthropic', 8192, 200000),
     
     # Google
-    ModelCapability(model='gemini-2.5-pro', provider='google', max_tokens=8192),
-    ModelCapability(model='gemini-2.5-flash', provider='google', max_tokens=8192),
-    ModelCapability(model='gemini-2.5-flash-image', provider='google', max_tokens=4096),
-    ModelCapability(model='gemini-2.0-flash', provider='google', max_tokens=8192),
+    ('gemini-2.5-pro', 'google', 8192, 1048576),
+    ('gemini-2.5-flash', 'google', 8192, 1048576),
+    ('gemini-2.5-flash-image', 'google', 4096, 32768),
+    ('gemini-2.0-flash', 'google', 8192, 1048576),
 
     # HChat (Provider: hchat)
-    ModelCapability(model='gpt-5-mini', provider='hchat', max_tokens=16384),
-    ModelCapability(model='gpt-4.1', provider='hchat', max_tokens=16384),
-    ModelCapability(model='gpt-4.1-mini', provider='hchat', max_tokens=16384),
-    ModelCapability(model='gpt-4o', provider='hchat', max_tokens=4096),
-    ModelCapability(model='gpt-4o-mini', provider='hchat', max_tokens=16384),
-    ModelCapability(model='claude-sonnet-4-5', provider='hchat', max_tokens=8192),
-    ModelCapability(model='claude-haiku-4-5', provider='hchat', max_tokens=4096),
-    ModelCapability(model='claude-sonnet-4', provider='hchat', max_tokens=8192),
-    ModelCapability(model='claude-3-7-sonnet', provider='hchat', max_tokens=8192),
-    ModelCapability(model='claude-3-5-sonnet-v2', provider='hchat', max_tokens=8192),
-    ModelCapability(model='gemini-2.5-pro', provider='hchat', max_tokens=8192),
-    ModelCapability(model='gemini-2.5-flash', provider='hchat', max_tokens=8192),
-    ModelCapability(model='gemini-2.5-flash-image', provider='hchat', max_tokens=4096),
-    ModelCapability(model='gemini-2.0-flash', provider='hchat', max_tokens=8192),
+    ('gpt-5-mini', 'hchat', 16384, 400000),
+    ('gpt-4.1', 'hchat', 16384, 1047576),
+    ('gpt-4.1-mini', 'hchat', 16384, 1047576),
+    ('gpt-4o', 'hchat', 4096, 128000),
+    ('gpt-4o-mini', 'hchat', 16384, 128000),
+    ('claude-sonnet-4-5', 'hchat', 8192, 200000),
+    ('claude-haiku-4-5', 'hchat', 4096, 200000),
+    ('claude-sonnet-4', 'hchat', 8192, 200000),
+    ('claude-3-7-sonnet', 'hchat', 8192, 200000),
+    ('claude-3-5-sonnet-v2', 'hchat', 8192, 200000),
+    ('gemini-2.5-pro', 'hchat', 8192, 1048576),
+    ('gemini-2.5-flash', 'hchat', 8192, 1048576),
+    ('gemini-2.5-flash-image', 'hchat', 4096, 32768),
+    ('gemini-2.0-flash', 'hchat', 8192, 1048576),
 ]
 
+# List prices per model (USD per 1M tokens): (input, output, cache_read, cache_write).
+# Shared by every provider route of the same model.
+_PRICING: Dict[str, Tuple[float, float, Optional[float], Optional[float]]] = {
+    'gpt-5-mini': (0.25, 2.00, 0.025, None),
+    'gpt-4o': (2.50, 10.00, 1.25, None),
+    'gpt-4o-mini': (0.15, 0.60, 0.075, None),
+    'gpt-4.1': (2.00, 8.00, 0.50, None),
+    'gpt-4.1-mini': (0.40, 1.60, 0.10, None),
+    'claude-sonnet-4': (3.00, 15.00, 0.30, 3.75),
+    'claude-sonnet-4-5': (3.00, 15.00, 0.30, 3.75),
+    'claude-haiku-4-5': (1.00, 5.00, 0.10, 1.25),
+    'claude-3-7-sonnet': (3.00, 15.00, 0.30, 3.75),
+    'claude-3-5-sonnet-v2': (3.00, 15.00, 0.30, 3.75),
+    'gemini-2.5-pro': (1.25, 10.00, 0.31, None),
+    'gemini-2.5-flash': (0.30, 2.50, 0.075, None),
+    'gemini-2.5-flash-image': (0.30, 30.00, None, None),
+    'gemini-2.0-flash': (0.10, 0.40, 0.025, None),
+}
+
+# Reasoning-capable models -> default effort when the caller sets no reasoning options
+# (None keeps reasoning off unless asked for). Defaults favour latency: the cheapest
+# level each model serves well.
+_REASONING: Dict[str, Optional[str]] = {
+    'gpt-5-mini': 'minimal',
+    'claude-sonnet-4': None,
+    'claude-sonnet-4-5': None,
+    'claude-haiku-4-5': None,
+    'claude-3-7-sonnet': None,
+    'gemini-2.5-pro': 'low',
+    'gemini-2.5-flash': 'low',
+}
+
+# Thinking-token budget per effort level, for providers that take a budget (Anthropic, Gemini)
+REASONING_BUDGETS: Dict[str, int] = {'minimal': 0, 'low': 1024, 'medium': 4096, 'high': 16384}
+
+
+def reasoning_budget_for(effort: str) -> int:
+    return REASONING_BUDGETS[effort]
+
+
+def reasoning_effort_for(budget: int) -> str:
+    """Smallest effort level whose budget covers `budget` (for providers that take an effort)."""
+    for effort, limit in REASONING_BUDGETS.items():
+        if budget <= limit:
+            return effort
+    return 'high'
+
+
+def _pricing(model: str) -> Optional[ModelPricing]:
+    prices = _PRICING.get(model)
+    if prices is None:
+        return None
+    input, output, cache_read, cache_write = prices
+    return ModelPricing(input=input, output=output, cache_read=cache_read, cache_write=cache_write)
+
 
-def get_provider_for_model(model: str) -> str:
+@lru_cache(maxsize=None)
+def _static_capabilities() -> List[ModelCapability]:
+    return [
+        ModelCapability(
+            model=model, provider=provider, max_tokens=max_tokens, context_window=context_window,
+            pricing=_pricing(model), reasoning=model in _REASONING,
+            default_reasoning_effort=_REASONING.get(model)
+        )
+        for model, provider, max_tokens, context_window in _REGISTRY
+    ]
+
+
+@lru_cache(maxsize=None)
+def _static_index() -> Dict[str, ModelCapability]:
+    index: Dict[str, ModelCapability] = {}
+    for cap in _static_capabilities():
+        index.setdefault(cap.model, cap)
+    return index
+
+
+# `catalog` below is a loaded remote catalog (`ModelCatalog.index`) of one client. It replaces
+# the static registry, so deployments HChat retires stop routing; None uses the static entries.
+
+def list_model_capabilities(catalog: Optional[Mapping[str, ModelCapability]] = None) -> List[ModelCapability]:
+    """All registry entries: the loaded catalog if given, else the static registry."""
+    return list(catalog.values()) if catalog is not None else list(_static_capabilities())
+
+
+def get_model_capability(
+    model: str, catalog: Optional[Mapping[str, ModelCapability]] = None
+) -> Optional[ModelCapability]:
+    """Find the registry entry for a given model name."""
+    return catalog.get(model) if catalog is not None else _static_index().get(model)
+
+
+def get_provider_for_model(model: str, catalog: Optional[Mapping[str, ModelCapability]] = None) -> str:
     """Find the provider for a given model name."""
-    for cap in MODEL_CAPABILITIES:
-        if cap.model == model:
-            return cap.provider
+    cap = get_model_capability(model, catalog)
+    if cap is not None:
+        return cap.provider
             
     # Fallback heuristics REMOVED for strict validation matching Node SDK
     # if model.startswith('gpt'):
@@ -62,3 +169,10 @@ def get_provider_for_model(model: str) -> str:
     #     return 'google'
         
     raise ValueError(f"Unsupported model: {model}. Please check HChat Guide for supported models.")
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatible access to the materialized registry
+    if name == 'MODEL_CAPABILITIES':
+        return list_model_capabilities()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,193 @@
+"""
+Model cascades: answer with a cheap model and escalate only when its answer fails a check.
+
+    result = await client.messages.cascade(
+        ["gpt-4o-mini", "gpt-4o"], "Extract the invoice as JSON",
+        validator=json_validator({"type": "object", "required": ["total"]}),
+        hedge_after=2.0,
+    )
+    result.response, result.model, result.escalated, result.stages
+"""
+import asyncio
+import inspect
+import json
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+from .structured import extract_json_text, response_text, schema_error
+from .types.response import LLMResponse
+from .usage import cost_of
+
+if TYPE_CHECKING:
+    from .resources.messages import Messages
+
+# A validator accepts or rejects a response; it may be sync or async
+Validator = Callable[[LLMResponse], Union[bool, Awaitable[bool]]]
+
+
+class StageResult(BaseModel):
+    model: str
+    latency: Optional[float] = None  # seconds from stage start to response (None if cancelled)
+    cost: float = 0.0
+    accepted: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+
+
+class CascadeResult(BaseModel):
+    response: LLMResponse
+    model: str
+    escalated: bool  # answered by a stage other than the first
+    accepted: bool  # False when every stage was rejected; response is then the last one received
+    stages: List[StageResult]
+
+    @property
+    def total_cost(self) -> float:
+        return sum(s.cost for s in self.stages)
+
+
+# ---- Validators ----
+
+def json_validator(schema: Optional[Dict[str, Any]] = None) -> Validator:
+    """
+    Accepts responses whose text is JSON (code fences allowed) matching `schema`.
+    Uses `jsonschema` when installed; otherwise checks the top-level type and `required` keys.
+    """
+    def validate(response: LLMResponse) -> bool:
+        try:
+            data = json.loads(extract_json_text(response_text(response)))
+        except ValueError:
+            return False
+        return schema is None or schema_error(data, schema) is None
+    return validate
+
+
+def tool_call_validator(name: Optional[str] = None) -> Validator:
+    """Accepts responses that call a tool (optionally a specific one)."""
+    def validate(response: LLMResponse) -> bool:
+        content = response.choices[0].message.content if response.choices else ""
+        if isinstance(content, str):
+            return False
+        return any(b.type == 'tool_use' and (name is None or b.name == name) for b in content)
+    return validate
+
+
+def score_validator(scorer: Callable[[LLMResponse], Union[float, Awaitable[float]]], threshold: float) -> Validator:
+    """Accepts responses whose score (e.g. from a grader model or heuristic) reaches `threshold`."""
+    async def validate(response: LLMResponse) -> bool:
+        score = scorer(response)
+        if inspect.isawaitable(score):
+            score = await score
+        return score >= threshold
+    return validate
+
+
+# ---- Runner ----
+
+class Cascade:
+    """
+    Runs `models` in order until one passes `validator`.
+    With `hedge_after`, a stage that has not answered within that many seconds gets the
+    next stage started in parallel; the first acceptable answer wins and the rest are cancelled.
+    """
+
+    def __init__(
+        self,
+        messages: "Messages",
+        models: Sequence[str],
+        input: Any,
+        validator: Validator,
+        hedge_after: Optional[float] = None,
+        config: Optional[Dict[str, Any]] = None,
+        stage_configs: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ):
+        if not models:
+            raise ValueError("A cascade needs at least one model")
+        self.messages = messages
+        self.models = list(models)
+        self.input = input
+        self.validator = validator
+        self.hedge_after = hedge_after
+        self.config = config or {}
+        self.stage_configs = list(stage_configs or [None] * len(self.models))
+        self.stages = [StageResult(model=m) for m in self.models]
+        self._started_at: Dict[int, float] = {}
+
+    async def run(self) -> CascadeResult:
+        pending: Dict[asyncio.Task, int] = {}
+        started_at = self._started_at
+        next_stage = 0
+        best: Optional[int] = None  # strongest stage that answered
+        best_response: Optional[LLMResponse] = None
+        accepted = False
+        last_error: Optional[BaseException] = None
+
+        def start() -> None:
+            nonlocal next_stage
+            i = next_stage
+            next_stage += 1
+            started_at[i] = time.monotonic()
+            pending[asyncio.ensure_future(self._attempt(i))] = i
+
+        start()
+        try:
+            while pending and not accepted:
+                timeout = None
+                if self.hedge_after is not None and next_stage < len(self.models):
+                    timeout = max(0.0, started_at[next_stage - 1] + self.hedge_after - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    start()  # hedge: the current stage is slow, race the next one
+                    continue
+
+                # Prefer the strongest stage when several finish together
+                for task in sorted(done, key=lambda t: -pending[t]):
+                    i = pending.pop(task)
+                    stage = self.stages[i]
+                    stage.latency = time.monotonic() - started_at[i]
+                    try:
+                        response, ok = task.result()
+                    except Exception as e:
+                        stage.error = f"{type(e).__name__}: {e}"
+                        last_error = e
+                        continue
+                    stage.cost = self._cost(self.models[i], response)
+                    stage.accepted = ok
+                    if ok and not accepted:
+                        best, best_response, accepted = i, response, True
+                    elif not accepted and (best is None or i > best):
+                        best, best_response = i, response
+
+                if not accepted and not pending and next_stage < len(self.models):
+                    start()  # escalate
+        finally:
+            for task, i in pending.items():
+                task.cancel()
+                self.stages[i].cancelled = True
+            if pending:
+                # Let the losers unwind so their connections are released before we return
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if best_response is None:
+            raise last_error
+        return CascadeResult(
+            response=best_response,
+            model=self.models[best],
+            escalated=best > 0,
+            accepted=accepted,
+            stages=[self.stages[j] for j in sorted(started_at)],
+        )
+
+    async def _attempt(self, i: int):
+        config = {**self.config, **(self.stage_configs[i] or {})}
+        response = await self.messages.complete(self.models[i], self.input, **config)
+        accepted = self.validator(response)
+        if inspect.isawaitable(accepted):
+            accepted = await accepted
+        return response, bool(accepted)
+
+    def _cost(self, model: str, response: LLMResponse) -> float:
+        cap = self.messages._capability(model)
+        return cost_of(response.usage, cap.pricing if cap else None)
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .capabilities import ModelCapability, get_model_capability
+
+# After a failed background refresh, requests wait this long before triggering another
+RETRY_INTERVAL = 60.0
+
+
+class ModelCatalog:
+    """
+    Model list fetched from the HChat API (`GET {api_base}/models`). Once loaded it is the
+    client's registry for routing and `models.list()`, so new or retired deployments don't
+    need an SDK release; until then the static registry is used.
+    - Fresh for `ttl` seconds; until `stale_ttl` a stale copy is served while a
+      background refresh runs (stale-while-revalidate)
+    - Optionally persisted to `cache_path` so cold starts route without a fetch
+    - Routing only reads `index` and never waits on a fetch (see `revalidate`)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        ttl: float = 3600.0,
+        stale_ttl: float = 86400.0,
+        cache_path: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.http_client = http_client
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache_path = cache_path
+        self.models: List[ModelCapability] = []
+        self.index: Optional[Dict[str, ModelCapability]] = None  # by model name, once loaded
+        self.fetched_at: Optional[float] = None  # wall clock, so it survives restarts
+        self.last_error: Optional[Exception] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+
+        if cache_path:
+            self._load()
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self.fetched_at is None else time.time() - self.fetched_at
+
+    async def get(self) -> List[ModelCapability]:
+        """Catalog entries, fetching only when there is no usable copy."""
+        age = self.age
+        if age is None or age >= self.stale_ttl:
+            await self.refresh()
+        elif age >= self.ttl:
+            self.refresh_in_background()
+        return self.models
+
+    def revalidate(self) -> None:
+        """
+        Start a background refresh when there is no copy or it is older than `ttl`; never
+        waits. A no-op outside an event loop, and for RETRY_INTERVAL after a failed refresh.
+        """
+        age = self.age
+        if (age is not None and age < self.ttl) or time.monotonic() < self._retry_at:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.refresh_in_background()
+
+    def refresh_in_background(self) -> None:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._refresh_quietly())
+
+    async def refresh(self) -> List[ModelCapability]:
+        # Concurrent callers share one fetch
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._refreshing)
+        return self.models
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self._fetch()
+        except Exception:
+            # keep serving the stale copy; the error is on last_error
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+
+    async def _fetch(self) -> None:
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(timeout=60.0)
+        try:
+            response = await self.http_client.get(
+                f"{self.api_base}/models",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=10.0
+            )
+            response.raise_for_status()
+            models = self._parse(response.json())
+        except Exception as e:
+            self.last_error = e
+            raise
+        self.last_error = None
+        self._apply(models, time.time())
+        self._save()
+
+    def _parse(self, data: Any) -> List[ModelCapability]:
+        entries = data.get("data", data.get("models", [])) if isinstance(data, dict) else data
+        models: List[ModelCapability] = []
+        for entry in entries or []:
+            if isinstance(entry, str):
+                entry = {"model": entry}
+            name = entry.get("model") or entry.get("id")
+            if not name:
+                continue
+            # Fields the catalog omits fall back to the static registry entry
+            known = get_model_capability(name)
+            provider = entry.get("provider") or (known.provider if known else None)
+            max_tokens = entry.get("maxTokens") or entry.get("max_tokens") or entry.get("maxToken") or (known.max_tokens if known else None)
+            context_window = entry.get("contextWindow") or entry.get("context_window") or (known.context_window if known else None)
+            if not provider or not max_tokens or not context_window:
+                continue
+            pricing = entry.get("pricing") or (known.pricing.model_dump() if known and known.pricing else None)
+            reasoning = entry.get("reasoning", known.reasoning if known else False)
+            effort = entry.get("defaultReasoningEffort", known.default_reasoning_effort if known else None)
+            models.append(ModelCapability(
+                model=name, provider=provider, max_tokens=max_tokens, context_window=context_window,
+                pricing=pricing, reasoning=reasoning, default_reasoning_effort=effort
+            ))
+        return models
+
+    def _apply(self, models: List[ModelCapability], fetched_at: float) -> None:
+        self.models = models
+        self.fetched_at = fetched_at
+        # Swapped wholesale so lookups never see a half-applied update
+        self.index = {cap.model: cap for cap in models}
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            models = [ModelCapability(**m) for m in state["models"]]
+            fetched_at = float(state["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if time.time() - fetched_at < self.stale_ttl:
+            self._apply(models, fetched_at)
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        state: Dict[str, Any] = {
+            "fetched_at": self.fetched_at,
+            "models": [m.model_dump() for m in self.models],
+        }
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.cache_path)
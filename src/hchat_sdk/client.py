@@ -1,30 +1,213 @@
-from typing import Union, List, Optional, AsyncGenerator, Dict, Any
-import os
+from typing import TYPE_CHECKING, Union, List, Optional, AsyncGenerator
+
+# Importing the client stays cheap: httpx, pydantic and the feature modules load when a
+# client is created, and optional features only when their option or method is used
+if TYPE_CHECKING:
+    import asyncio
+
+    import httpx
+
+    from .types.request import InputMessage
+    from .types.response import LLMResponse, ResponseChunk
+    from .concurrency import ConcurrencyController
+    from .scheduler import RequestScheduler
+    from .usage import UsageTracker
+    from .metrics import LatencyStats, MetricsRecorder
+    from .compression import RequestCompression
+    from .transport import Verify
+    from .warmup import WarmupResult
+    from .resources.batches import Batches
+
+def _metrics_recorder(metrics: Union[bool, "MetricsRecorder"]) -> Optional["MetricsRecorder"]:
+    if metrics is True:
+        from .metrics import MetricsRecorder
+        return MetricsRecorder()
+    return metrics or None
+
+def _request_compression(compression: Union[bool, str, "RequestCompression"]) -> Optional["RequestCompression"]:
+    if compression is True or isinstance(compression, str):
+        from .compression import RequestCompression
+        return RequestCompression() if compression is True else RequestCompression(compression)
+    return compression or None
 
-from .types.request import InputMessage
-from .types.response import LLMResponse, ResponseChunk
-from .resources.messages import Messages
-from .resources.models import Models
 
 class HChat:
     DEFAULT_API_BASE = 'https://h-chat-api.autoever.com/v2/api'
 
-    def __init__(self, api_key: str, api_base: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        api_base: Optional[str] = None,
+        coalesce: bool = False,
+        remote_catalog: bool = False,
+        catalog_path: Optional[str] = None,
+        adaptive_concurrency: Union[bool, "ConcurrencyController"] = False,
+        scheduler: Optional["RequestScheduler"] = None,
+        usage_tracker: Optional["UsageTracker"] = None,
+        metrics: Union[bool, "MetricsRecorder"] = True,
+        compression: Union[bool, str, "RequestCompression"] = False,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        uds: Optional[str] = None,
+        proxy: Optional[Union[str, "httpx.Proxy"]] = None,
+        verify: "Verify" = True,
+        keepalive_expiry: Optional[float] = None,
+        http_client: Optional["httpx.AsyncClient"] = None
+    ):
+        from .transport import async_http_client, pool_keepalive_expiry
+        from .resources.messages import Messages
+        from .resources.models import Models
+
         self.api_key = api_key
         self.api_base = api_base or self.DEFAULT_API_BASE
-        
-        self.messages = Messages(self.api_key, self.api_base)
-        self.models = Models(self.api_key, self.api_base)
 
-    async def complete(self, model: str, input: Union[str, List[InputMessage]], **config) -> LLMResponse:
+        # One pooled client shared by every provider and the image fetcher; see hchat_sdk.transport
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or async_http_client(transport, uds, proxy, verify, keepalive_expiry)
+        # Read back from the pool, so a caller-supplied client's own setting is used
+        pool_expiry = pool_keepalive_expiry(self.http_client)
+        self._keepalive_expiry = keepalive_expiry if pool_expiry is None else pool_expiry
+        self._keepalive_tasks: List["asyncio.Task"] = []
+        self._batches: Optional["Batches"] = None
+
+        catalog = None
+        if remote_catalog:
+            from .catalog import ModelCatalog
+            # Routes from the disk cache right away; a stale or missing copy refreshes in the background
+            catalog = ModelCatalog(self.api_key, self.api_base, self.http_client, cache_path=catalog_path)
+            catalog.revalidate()
+
+        if adaptive_concurrency is True:
+            from .concurrency import ConcurrencyController
+            adaptive_concurrency = ConcurrencyController()
+        self.messages = Messages(
+            self.api_key, self.api_base, self.http_client,
+            coalesce=coalesce,
+            concurrency_controller=adaptive_concurrency or None,
+            scheduler=scheduler,
+            usage_tracker=usage_tracker,
+            metrics=_metrics_recorder(metrics),
+            compression=_request_compression(compression),
+            catalog=catalog
+        )
+        self.models = Models(self.api_key, self.api_base, catalog=catalog)
+
+    @property
+    def batches(self) -> "Batches":
+        """Native provider batch jobs; see `hchat_sdk.resources.batches`."""
+        if self._batches is None:
+            from .resources.batches import Batches
+            self._batches = Batches(self.messages, self.http_client)
+        return self._batches
+
+    def stats(self) -> List["LatencyStats"]:
+        """Latency statistics per (provider, model); see `hchat_sdk.metrics`."""
+        return self.messages.metrics.stats() if self.messages.metrics else []
+
+    async def warmup(self, models: Optional[List[str]] = None, connections: int = 1) -> List["WarmupResult"]:
+        """
+        Open `connections` pooled connections to the endpoint of each model (default: one
+        model per provider) so the first real request skips DNS, TCP and TLS setup.
+        """
+        from .warmup import endpoints, warmup
+        return await warmup(self.http_client, endpoints(self.messages, models), connections)
+
+    def start_keepalive(
+        self, models: Optional[List[str]] = None, connections: int = 1, interval: Optional[float] = None
+    ) -> "asyncio.Task":
+        """
+        Keep warm connections alive while idle; cancelled by `aclose()`. `interval` defaults to
+        0.8 x the pool's `keepalive_expiry` (24 s by default); pass `interval` for a supplied
+        `http_client` whose transport has no connection pool. See `hchat_sdk.warmup`.
+        """
+        from .warmup import endpoints, start_keepalive
+        task = start_keepalive(
+            self.http_client, endpoints(self.messages, models), connections, interval, self._keepalive_expiry
+        )
+        self._keepalive_tasks.append(task)
+        return task
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections (a caller-provided `http_client` is left open)."""
+        import asyncio
+        for task in self._keepalive_tasks:
+            task.cancel()
+        await asyncio.gather(*self._keepalive_tasks, return_exceptions=True)
+        self._keepalive_tasks.clear()
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+    async def __aenter__(self) -> "HChat":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def complete(self, model: str, input: Union[str, List["InputMessage"]], **config) -> "LLMResponse":
         """
         Deprecated: Use client.messages.complete() instead.
         """
         return await self.messages.complete(model, input, **config)
 
-    async def stream(self, model: str, input: Union[str, List[InputMessage]], **config) -> AsyncGenerator[ResponseChunk, None]:
+    async def stream(self, model: str, input: Union[str, List["InputMessage"]], **config) -> AsyncGenerator["ResponseChunk", None]:
         """
         Deprecated: Use client.messages.stream() instead.
         """
         async for chunk in self.messages.stream(model, input, **config):
             yield chunk
+
+
+class SyncHChat:
+    """
+    Blocking client for sync workers (Celery, gunicorn sync, scripts).
+    Shares conversion and parsing with HChat but runs on a pooled `httpx.Client`,
+    so there is no per-call event loop or connection setup.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: Optional[str] = None,
+        usage_tracker: Optional["UsageTracker"] = None,
+        metrics: Union[bool, "MetricsRecorder"] = True,
+        compression: Union[bool, str, "RequestCompression"] = False,
+        transport: Optional["httpx.BaseTransport"] = None,
+        uds: Optional[str] = None,
+        proxy: Optional[Union[str, "httpx.Proxy"]] = None,
+        verify: "Verify" = True,
+        keepalive_expiry: Optional[float] = None,
+        http_client: Optional["httpx.Client"] = None
+    ):
+        from .transport import sync_http_client
+        from .resources.messages import SyncMessages
+
+        self.api_key = api_key
+        self.api_base = api_base or HChat.DEFAULT_API_BASE
+
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or sync_http_client(transport, uds, proxy, verify, keepalive_expiry)
+        self.messages = SyncMessages(
+            self.api_key, self.api_base, self.http_client,
+            usage_tracker=usage_tracker,
+            metrics=_metrics_recorder(metrics),
+            compression=_request_compression(compression)
+        )
+
+    def stats(self) -> List["LatencyStats"]:
+        """Latency statistics per (provider, model); see `hchat_sdk.metrics`."""
+        return self.messages.metrics.stats() if self.messages.metrics else []
+
+    def warmup(self, models: Optional[List[str]] = None, connections: int = 1) -> List["WarmupResult"]:
+        """Blocking `HChat.warmup`; probes run on `connections` threads."""
+        from .warmup import endpoints, warmup_sync
+        return warmup_sync(self.http_client, endpoints(self.messages, models), connections)
+
+    def close(self) -> None:
+        """Close pooled HTTP connections (a caller-provided `http_client` is left open)."""
+        if self._owns_http_client:
+            self.http_client.close()
+
+    def __enter__(self) -> "SyncHChat":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,94 @@
+"""
+Request-body compression and response encodings.
+
+    client = HChat(api_key="...", compression=True)                     # gzip above 32 KiB
+    client = HChat(api_key="...", compression=RequestCompression("zstd", threshold=4096))
+
+Bodies at or above `threshold` bytes are sent with `Content-Encoding`. Bodies above
+`offload_threshold` are compressed in a worker thread so multi-MB histories and base64
+images do not stall the event loop. An endpoint that answers 415 Unsupported Media Type
+is remembered by origin (scheme://host:port, so no query-string API keys are kept) and
+gets uncompressed bodies from then on. Responses advertise every
+encoding httpx can decode here (brotli and zstd need the `brotli` and `zstandard`
+packages).
+
+Wire bytes and compression time appear in `client.stats()` and the Prometheus export.
+"""
+import gzip
+import importlib.util
+import threading
+from typing import Literal, Set
+from urllib.parse import urlsplit
+
+Encoding = Literal['gzip', 'zstd']
+
+# Status codes with which a server rejects a Content-Encoding it does not accept
+UNSUPPORTED_ENCODING_STATUS = (415,)
+
+
+def _has_module(*names: str) -> bool:
+    return any(importlib.util.find_spec(name) is not None for name in names)
+
+
+def accept_encoding() -> str:
+    """Response encodings httpx can decode in this environment, best first."""
+    encodings = []
+    if _has_module('zstandard'):
+        encodings.append('zstd')
+    if _has_module('brotli', 'brotlicffi'):
+        encodings.append('br')
+    return ", ".join(encodings + ['gzip', 'deflate'])
+
+
+def _origin(url: str) -> str:
+    """scheme://host[:port]; a gateway accepts or rejects Content-Encoding for all its paths."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.rpartition('@')[2]}"
+
+
+def _zstd_compressor(level: int):
+    try:
+        from compression import zstd  # Python 3.14+
+        return lambda data: zstd.compress(data, level)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd request compression requires the 'zstandard' package") from None
+    compressor = zstandard.ZstdCompressor(level=level)
+    return compressor.compress
+
+
+class RequestCompression:
+    """Per-client compression policy; endpoint negotiation state is shared by all providers."""
+
+    def __init__(
+        self,
+        encoding: Encoding = 'gzip',
+        threshold: int = 32 * 1024,
+        level: int = 6,
+        offload_threshold: int = 1024 * 1024,
+    ):
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.offload_threshold = offload_threshold
+        self.accept_encoding = accept_encoding()
+        self._zstd = _zstd_compressor(level) if encoding == 'zstd' else None
+        self._unsupported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def applies(self, url: str, size: int) -> bool:
+        return size >= self.threshold and _origin(url) not in self._unsupported
+
+    def compress(self, data: bytes) -> bytes:
+        if self._zstd is not None:
+            return self._zstd(data)
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def mark_unsupported(self, url: str) -> None:
+        """The endpoint rejected compressed bodies; send its origin plain JSON from now on."""
+        with self._lock:
+            self._unsupported.add(_origin(url))
+
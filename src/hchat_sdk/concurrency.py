@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from .errors import ProviderStreamError
+
+T = TypeVar('T')
+
+# Status codes treated as congestion signals (Anthropic uses 529 for "overloaded")
+OVERLOAD_STATUS_CODES = (429, 503, 529)
+
+
+def is_overload(error: BaseException) -> bool:
+    if isinstance(error, ProviderStreamError):
+        return error.code in OVERLOAD_STATUS_CODES
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in OVERLOAD_STATUS_CODES
+
+
+class LimiterStats(BaseModel):
+    provider: str
+    model: str
+    limit: float
+    in_flight: int
+    queued: int
+    latency: Optional[float] = None  # smoothed seconds (time to first chunk for streams)
+    min_latency: Optional[float] = None
+    overloads: int = 0
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one (provider, model).
+    - Additive increase (+1 per limit completions) while saturated and latency is near the baseline
+    - Multiplicative decrease on 429/503/529, and proportional decrease when latency
+      exceeds `tolerance` x the baseline (gradient signal)
+    - At most one decrease per smoothed latency window, so a burst of errors from
+      the same congestion event only backs off once
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff: float = 0.5,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.min_latency: Optional[float] = None
+        self.overloads = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; give it back
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        saturated = self.in_flight >= int(self.limit) or bool(self._waiters)
+        self.in_flight -= 1
+        if overloaded:
+            self.overloads += 1
+            self._decrease(self.backoff)
+        elif latency is not None:
+            self._observe(latency, saturated)
+        self._wake()
+
+    def _observe(self, latency: float, saturated: bool) -> None:
+        self.latency = latency if self.latency is None else self.latency + self.smoothing * (latency - self.latency)
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        else:
+            # Let the baseline drift up slowly so a permanently slower backend is not punished forever
+            self.min_latency += 0.01 * (latency - self.min_latency)
+
+        if self.latency > self.tolerance * self.min_latency:
+            self._decrease(max(self.backoff, self.tolerance * self.min_latency / self.latency))
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * factor)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+
+class ConcurrencyController:
+    """
+    Per-(provider, model) adaptive limiters for `Messages`.
+    Requests beyond the current limit wait in FIFO order; `stats()` exposes the live
+    limit, in-flight count and queue depth for dashboards and batch progress.
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 256, **limiter_options):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limiter_options = limiter_options
+        self._limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+
+    def limiter(self, provider: str, model: str) -> AdaptiveLimiter:
+        key = (provider, model)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveLimiter(self.initial_limit, self.min_limit, self.max_limit, **self.limiter_options)
+            self._limiters[key] = limiter
+        return limiter
+
+    async def run(self, provider: str, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        limiter = self.limiter(provider, model)
+        await limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except Exception as e:
+            limiter.release(overloaded=is_overload(e))
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(latency=time.monotonic() - started)
+        return result
+
+    async def stream(self, provider: str, model: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncGenerator[T, None]:
+        """Holds a slot for the whole stream; latency is measured to the first chunk."""
+        limiter = self.limiter(provider, model)
+        await limiter.acquire()
+        started = time.monotonic()
+        first_chunk: Optional[float] = None
+        try:
+            async with aclosing(factory()) as chunks:
+                async for chunk in chunks:
+                    if first_chunk is None:
+                        first_chunk = time.monotonic() - started
+                    yield chunk
+        except Exception as e:
+            limiter.release(overloaded=is_overload(e))
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(latency=first_chunk)
+
+    def stats(self) -> List[LimiterStats]:
+        return [
+            LimiterStats(
+                provider=provider,
+                model=model,
+                limit=limiter.limit,
+                in_flight=limiter.in_flight,
+                queued=limiter.queued,
+                latency=limiter.latency,
+                min_latency=limiter.min_latency,
+                overloads=limiter.overloads,
+            )
+            for (provider, model), limiter in self._limiters.items()
+        ]
@@ -0,0 +1,270 @@
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from .tokens import get_token_counter
+from .types.content import TextContent
+from .types.request import InputMessage, MessageRole
+
+if TYPE_CHECKING:
+    from .resources.messages import Messages, SyncMessages
+
+
+def _is_tool_result(m: InputMessage) -> bool:
+    return isinstance(m.content, list) and any(b.type == 'tool_result' for b in m.content)
+
+
+def _turn_starts(messages: Sequence[InputMessage]) -> List[int]:
+    """Indices of user messages that open a new turn (tool results continue the previous one)."""
+    return [
+        i for i, m in enumerate(messages)
+        if m.role == MessageRole.USER and not _is_tool_result(m)
+    ]
+
+
+def _split_system(messages: Sequence[InputMessage]) -> Tuple[List[InputMessage], List[InputMessage]]:
+    system = [m for m in messages if m.role == MessageRole.SYSTEM]
+    rest = [m for m in messages if m.role != MessageRole.SYSTEM]
+    return system, rest
+
+
+def trim_to_budget(messages: Sequence[InputMessage], model: str, budget: int) -> Tuple[List[InputMessage], int]:
+    """
+    Drop the oldest turns until the messages fit in `budget` tokens.
+    System messages and the final message are always kept, and the result never
+    starts with an orphaned assistant turn or tool result.
+    Returns the kept messages and their estimated token count.
+    """
+    messages = list(messages)
+    per_message = get_token_counter(model).count_message_tokens(messages)
+    total = sum(per_message)
+    last = len(messages) - 1
+
+    dropped = set()
+    for i, m in enumerate(messages):
+        if total <= budget:
+            break
+        if m.role == MessageRole.SYSTEM or i == last:
+            continue
+        dropped.add(i)
+        total -= per_message[i]
+
+    for i, m in enumerate(messages):
+        if i in dropped or m.role == MessageRole.SYSTEM or i == last:
+            continue
+        if m.role == MessageRole.USER and not _is_tool_result(m):
+            break
+        dropped.add(i)
+        total -= per_message[i]
+
+    return [m for i, m in enumerate(messages) if i not in dropped], total
+
+
+class ContextStrategy(ABC):
+    """
+    Rewrites a conversation history before it is sent.
+    Async-only strategies subclass this directly; `SyncMessages` rejects them (`supports_sync`).
+    """
+    supports_sync = False
+
+    @abstractmethod
+    async def apply(self, messages: List[InputMessage], model: str, client: "Messages") -> List[InputMessage]:
+        pass
+
+
+class SyncContextStrategy(ContextStrategy):
+    """A strategy usable by both clients; without I/O, only apply_sync is needed."""
+    supports_sync = True
+
+    async def apply(self, messages: List[InputMessage], model: str, client: "Messages") -> List[InputMessage]:
+        return self.apply_sync(messages, model, client)
+
+    @abstractmethod
+    def apply_sync(self, messages: List[InputMessage], model: str, client: "SyncMessages") -> List[InputMessage]:
+        pass
+
+
+class SlidingWindow(SyncContextStrategy):
+    """Keep system messages plus the newest turns that fit in `max_tokens`."""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+
+    def apply_sync(self, messages: List[InputMessage], model: str, client=None) -> List[InputMessage]:
+        kept, _ = trim_to_budget(messages, model, self.max_tokens)
+        return kept
+
+
+class LastTurns(SyncContextStrategy):
+    """Keep system messages plus the last `n` user turns (with their replies and tool calls)."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def apply_sync(self, messages: List[InputMessage], model: str, client=None) -> List[InputMessage]:
+        system, rest = _split_system(messages)
+        starts = _turn_starts(rest)
+        if len(starts) <= self.n:
+            return list(messages)
+        return system + rest[starts[-self.n]:]
+
+
+class DropOldMedia(SyncContextStrategy):
+    """Strip image and thinking blocks from all but the last `keep_last_turns` turns."""
+
+    def __init__(self, keep_last_turns: int = 1, drop_images: bool = True, drop_thinking: bool = True):
+        self.keep_last_turns = keep_last_turns
+        self.drop_images = drop_images
+        self.drop_thinking = drop_thinking
+
+    def apply_sync(self, messages: List[InputMessage], model: str, client=None) -> List[InputMessage]:
+        starts = _turn_starts(messages)
+        if len(starts) <= self.keep_last_turns:
+            return list(messages)
+        cutoff = starts[-self.keep_last_turns] if self.keep_last_turns else len(messages)
+
+        result = []
+        for i, m in enumerate(messages):
+            if i >= cutoff or not isinstance(m.content, list):
+                result.append(m)
+                continue
+            blocks = []
+            changed = False
+            for block in m.content:
+                if self.drop_images and block.type in ('image', 'imageUrl'):
+                    blocks.append(TextContent(text='[image omitted]'))
+                    changed = True
+                elif self.drop_thinking and block.type == 'thinking':
+                    changed = True
+                else:
+                    blocks.append(block)
+            if not changed:
+                result.append(m)
+            elif blocks:
+                result.append(m.model_copy(update={"content": blocks}))
+        return result
+
+
+class RollingSummary(SyncContextStrategy):
+    """
+    Replace turns older than the last `keep_last_turns` with a summary from a cheap model.
+    - Summaries are cached by a rolling hash of the summarized prefix
+    - When the prefix grows, the previous summary is extended with only the new turns
+    """
+
+    SUMMARY_PROMPT = (
+        "You maintain a running summary of a conversation. Merge the existing summary (if any) "
+        "with the new messages into a concise summary that preserves facts, decisions, open "
+        "questions and user preferences. Reply with the summary only."
+    )
+
+    def __init__(
+        self,
+        model: str = 'gpt-4o-mini',
+        keep_last_turns: int = 4,
+        trigger_tokens: Optional[int] = None,
+        max_summary_tokens: int = 1024,
+        cache_size: int = 256
+    ):
+        self.model = model
+        self.keep_last_turns = keep_last_turns
+        self.trigger_tokens = trigger_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    async def apply(self, messages: List[InputMessage], model: str, client: "Messages") -> List[InputMessage]:
+        split = self._split(messages, model)
+        if split is None:
+            return list(messages)
+        system, old, recent = split
+
+        key, summary, prompt = self._plan(old)
+        if summary is None:
+            response = await client.complete(self.model, prompt, **self._summary_config())
+            summary = self._remember(key, response)
+        return self._assemble(system, summary, recent)
+
+    def apply_sync(self, messages: List[InputMessage], model: str, client: "SyncMessages") -> List[InputMessage]:
+        split = self._split(messages, model)
+        if split is None:
+            return list(messages)
+        system, old, recent = split
+
+        key, summary, prompt = self._plan(old)
+        if summary is None:
+            response = client.complete(self.model, prompt, **self._summary_config())
+            summary = self._remember(key, response)
+        return self._assemble(system, summary, recent)
+
+    def _split(self, messages: List[InputMessage], model: str):
+        system, rest = _split_system(messages)
+        starts = _turn_starts(rest)
+        if len(starts) <= self.keep_last_turns:
+            return None
+        if self.trigger_tokens is not None:
+            if sum(get_token_counter(model).count_message_tokens(messages)) <= self.trigger_tokens:
+                return None
+        split = starts[-self.keep_last_turns] if self.keep_last_turns else len(rest)
+        return system, rest[:split], rest[split:]
+
+    def _assemble(self, system: List[InputMessage], summary: str, recent: List[InputMessage]) -> List[InputMessage]:
+        return system + [
+            InputMessage(role=MessageRole.USER, content=f"[Summary of the earlier conversation]\n{summary}"),
+            InputMessage(role=MessageRole.ASSISTANT, content="Understood. I'll continue from that context."),
+        ] + recent
+
+    def _summary_config(self):
+        return {
+            "system": self.SUMMARY_PROMPT,
+            "max_tokens": self.max_summary_tokens,
+            "context_strategy": None
+        }
+
+    def _plan(self, old: List[InputMessage]) -> Tuple[str, Optional[str], Optional[str]]:
+        """Return (cache key, cached summary, prompt for the incremental summary)."""
+        digests = []
+        h = hashlib.sha256()
+        for m in old:
+            h.update(m.model_dump_json().encode())
+            digests.append(h.copy().hexdigest())
+
+        key = digests[-1]
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return key, self._cache[key], None
+
+        # Resume from the longest prefix we have already summarized
+        previous, start = None, 0
+        for i in range(len(digests) - 2, -1, -1):
+            if digests[i] in self._cache:
+                previous, start = self._cache[digests[i]], i + 1
+                break
+
+        transcript = "\n".join(f"{m.role.value}: {self._render(m)}" for m in old[start:])
+        prompt = f"Existing summary:\n{previous}\n\nNew messages:\n{transcript}" if previous else f"Messages:\n{transcript}"
+        return key, None, prompt
+
+    def _remember(self, key: str, response) -> str:
+        summary = self._render(response.choices[0].message)
+        self._cache[key] = summary
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return summary
+
+    @staticmethod
+    def _render(m: InputMessage) -> str:
+        if isinstance(m.content, str):
+            return m.content
+        parts = []
+        for block in m.content:
+            if block.type == 'text':
+                parts.append(block.text)
+            elif block.type == 'tool_use':
+                parts.append(f"[called {block.name}({block.input})]")
+            elif block.type == 'tool_result':
+                parts.append(f"[tool result: {block.content if isinstance(block.content, str) else '...'}]")
+            elif block.type in ('image', 'imageUrl'):
+                parts.append("[image]")
+        return " ".join(parts)
@@ -0,0 +1,52 @@
+class ContextWindowExceededError(ValueError):
+    """Raised before sending when a request cannot fit in the model's context window."""
+
+    def __init__(self, model: str, prompt_tokens: int, limit: int):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.limit = limit
+        super().__init__(
+            f"Request for {model} needs ~{prompt_tokens} prompt tokens but only {limit} fit "
+            f"in the context window (after reserving max_tokens)."
+        )
+
+
+class QueueTimeoutError(TimeoutError):
+    """Raised when a request waits in the scheduler queue longer than its deadline."""
+
+    def __init__(self, tenant: str, priority: str, timeout: float):
+        self.tenant = tenant
+        self.priority = priority
+        self.timeout = timeout
+        super().__init__(
+            f"Request for tenant {tenant!r} ({priority}) was dropped after waiting {timeout:.1f}s in the queue."
+        )
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised before sending when a usage budget covering the request is spent."""
+
+    def __init__(self, limit: float, model: str, tenant=None, tag=None):
+        self.limit = limit
+        self.model = model
+        self.tenant = tenant
+        self.tag = tag
+        scope = ", ".join(f"{k}={v}" for k, v in (("model", model), ("tenant", tenant), ("tag", tag)) if v)
+        super().__init__(f"Budget of ${limit:.2f} exhausted ({scope}).")
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a structured-output answer is not valid JSON or does not match the requested schema."""
+
+    def __init__(self, message: str, text: str):
+        self.text = text
+        super().__init__(f"Structured output did not validate: {message}")
+
+
+class ProviderStreamError(RuntimeError):
+    """Raised when a provider reports an error inside an otherwise successful (HTTP 200) stream."""
+
+    def __init__(self, provider: str, message: str, code=None):
+        self.provider = provider
+        self.code = code
+        super().__init__(f"{provider} stream error{f' ({code})' if code else ''}: {message}")
@@ -0,0 +1,188 @@
+import asyncio
+import base64
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import httpx
+from pydantic import BaseModel
+
+SUPPORTED_MEDIA_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+
+class CachedImage(BaseModel):
+    url: str
+    media_type: str
+    data: str  # base64 encoded
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+def _sniff_media_type(content: bytes) -> Optional[str]:
+    if content.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if content.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if content[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+class ImageFetcher:
+    """
+    Fetches URL images for providers that only accept inline data (Anthropic, Gemini).
+    - Downloads concurrently over the shared connection pool
+    - LRU cache keyed by URL, bounded by total decoded bytes
+    - Revalidates stale entries with If-None-Match / If-Modified-Since
+    - The same cache backs the sync path (`fetch_many_sync`) used by `SyncHChat`
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        sync_http_client: Optional[httpx.Client] = None,
+        max_cache_bytes: int = 64 * 1024 * 1024,
+        max_image_bytes: int = 20 * 1024 * 1024,
+        revalidate_after: float = 300.0,
+    ):
+        self.http_client = http_client
+        self.sync_http_client = sync_http_client
+        self.max_cache_bytes = max_cache_bytes
+        self.max_image_bytes = max_image_bytes
+        self.revalidate_after = revalidate_after
+        self._cache: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    async def fetch(self, url: str) -> CachedImage:
+        cached = self._lookup(url)
+        if cached and time.monotonic() - cached.fetched_at < self.revalidate_after:
+            return cached
+
+        # Coalesce concurrent fetches of the same URL
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url, cached))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def fetch_many(self, urls: Iterable[str]) -> Dict[str, CachedImage]:
+        unique = list(dict.fromkeys(urls))
+        images = await asyncio.gather(*(self.fetch(u) for u in unique))
+        return dict(zip(unique, images))
+
+    def fetch_sync(self, url: str) -> CachedImage:
+        cached = self._lookup(url)
+        if cached and time.monotonic() - cached.fetched_at < self.revalidate_after:
+            return cached
+        if self.sync_http_client is None:
+            self.sync_http_client = httpx.Client(timeout=60.0)
+        with self.sync_http_client.stream(
+            "GET", url, headers=self._conditional_headers(cached), follow_redirects=True, timeout=30.0
+        ) as response:
+            if self._not_modified(url, response, cached):
+                return cached
+            content = bytearray()
+            for chunk in response.iter_bytes():
+                self._append(url, content, chunk)
+        return self._accept(url, response, bytes(content))
+
+    def fetch_many_sync(self, urls: Iterable[str]) -> Dict[str, CachedImage]:
+        unique = list(dict.fromkeys(urls))
+        if len(unique) == 1:
+            return {unique[0]: self.fetch_sync(unique[0])}
+        with ThreadPoolExecutor(max_workers=min(8, len(unique))) as pool:
+            images = list(pool.map(self.fetch_sync, unique))
+        return dict(zip(unique, images))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    async def _download(self, url: str, cached: Optional[CachedImage]) -> CachedImage:
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(timeout=60.0)
+        async with self.http_client.stream(
+            "GET", url, headers=self._conditional_headers(cached), follow_redirects=True, timeout=30.0
+        ) as response:
+            if self._not_modified(url, response, cached):
+                return cached
+            content = bytearray()
+            async for chunk in response.aiter_bytes():
+                self._append(url, content, chunk)
+        return self._accept(url, response, bytes(content))
+
+    def _lookup(self, url: str) -> Optional[CachedImage]:
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached:
+                self._cache.move_to_end(url)
+            return cached
+
+    def _conditional_headers(self, cached: Optional[CachedImage]) -> Dict[str, str]:
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+        return headers
+
+    def _not_modified(self, url: str, response: httpx.Response, cached: Optional[CachedImage]) -> bool:
+        """True for a 304 on a cached entry; otherwise checks status and declared size before the body is read."""
+        if cached and response.status_code == 304:
+            cached.fetched_at = time.monotonic()
+            self._lookup(url)
+            return True
+        response.raise_for_status()
+        declared = response.headers.get('content-length')
+        if declared and declared.isdigit() and int(declared) > self.max_image_bytes:
+            raise ValueError(f"Image too large ({declared} bytes): {url}")
+        return False
+
+    def _append(self, url: str, content: bytearray, chunk: bytes) -> None:
+        # Content-Length may be missing or wrong; stop reading as soon as the cap is passed
+        content += chunk
+        if len(content) > self.max_image_bytes:
+            raise ValueError(f"Image too large (over {self.max_image_bytes} bytes): {url}")
+
+    def _accept(self, url: str, response: httpx.Response, content: bytes) -> CachedImage:
+        media_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+        if media_type not in SUPPORTED_MEDIA_TYPES:
+            media_type = _sniff_media_type(content)
+        if media_type is None:
+            raise ValueError(f"Unsupported image type for {url}. Supported: {', '.join(SUPPORTED_MEDIA_TYPES)}")
+
+        image = CachedImage(
+            url=url,
+            media_type=media_type,
+            data=base64.b64encode(content).decode('ascii'),
+            size=len(content),
+            etag=response.headers.get('etag'),
+            last_modified=response.headers.get('last-modified'),
+            fetched_at=time.monotonic(),
+        )
+        self._store(image)
+        return image
+
+    def _store(self, image: CachedImage) -> None:
+        with self._lock:
+            old = self._cache.pop(image.url, None)
+            if old:
+                self._cache_bytes -= old.size
+            if image.size > self.max_cache_bytes:
+                return
+            self._cache[image.url] = image
+            self._cache_bytes += image.size
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.size
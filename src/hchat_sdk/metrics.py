@@ -0,0 +1,281 @@
+"""
+In-client latency statistics per (provider, model).
+
+    client = HChat(api_key="...")          # metrics are on by default
+    ...
+    for s in client.stats():
+        s.model, s.ttft.p50, s.inter_token.p99, s.tokens_per_second.p50, s.error_rate
+    text = client.messages.metrics.to_prometheus()   # serve on /metrics
+
+Stream timings are taken inside the provider's stream loop, so they include parsing
+but not time spent by the caller between chunks. Request/response bytes on the wire and
+request-body compression time are counted per model as well.
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .types.response import ResponseChunk
+
+# Content events that carry generated tokens
+_TOKEN_EVENTS = ('text_delta', 'thinking_delta', 'tool_call_delta')
+
+
+class StreamingHistogram:
+    """
+    Log-bucketed histogram (HDR-style): fixed memory regardless of sample count,
+    quantiles within `precision` relative error between `lowest` and `highest`.
+    """
+
+    def __init__(self, lowest: float = 1e-4, highest: float = 1e5, precision: float = 0.02):
+        self.lowest = lowest
+        self.highest = highest
+        self._log_growth = math.log1p(2 * precision)
+        self.counts = [0] * (int(math.ceil(math.log(highest / lowest) / self._log_growth)) + 2)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float) -> None:
+        if value <= self.lowest:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.lowest) / self._log_growth) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                # Geometric midpoint of the bucket, clamped to the observed range
+                value = self.lowest * math.exp((index - 0.5) * self._log_growth) if index else self.lowest
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> "HistogramSummary":
+        return HistogramSummary(
+            count=self.count,
+            mean=self.sum / self.count if self.count else None,
+            p50=self.quantile(0.5),
+            p90=self.quantile(0.9),
+            p99=self.quantile(0.99),
+            max=self.max,
+        )
+
+
+class HistogramSummary(BaseModel):
+    count: int = 0
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+
+class LatencyStats(BaseModel):
+    provider: str
+    model: str
+    requests: int
+    errors: int
+    error_rate: float
+    ttft: HistogramSummary  # seconds to the first content delta (streams)
+    inter_token: HistogramSummary  # seconds between content deltas (streams)
+    total: HistogramSummary  # seconds per request
+    tokens_per_second: HistogramSummary  # completion tokens / generation time
+    compression: HistogramSummary  # seconds spent compressing request bodies
+    request_bytes: int = 0  # request bodies before compression
+    bytes_sent: int = 0  # request bodies on the wire
+    bytes_received: int = 0  # response bodies on the wire (before decoding)
+
+
+class _ModelMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.ttft = StreamingHistogram()
+        self.inter_token = StreamingHistogram()
+        self.total = StreamingHistogram()
+        self.tokens_per_second = StreamingHistogram(lowest=0.01, highest=1e6)
+        self.compression = StreamingHistogram(lowest=1e-6)
+        self.request_bytes = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def histograms(self) -> Dict[str, StreamingHistogram]:
+        return {
+            "ttft": self.ttft, "inter_token": self.inter_token,
+            "total": self.total, "tokens_per_second": self.tokens_per_second,
+            "compression": self.compression,
+        }
+
+    def byte_counts(self) -> Dict[str, int]:
+        return {"request_bytes": self.request_bytes, "bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received}
+
+
+class StreamTimer:
+    """Timestamps one stream; fed every chunk by the provider's stream loop."""
+
+    def __init__(self, recorder: "MetricsRecorder", provider: str, model: str):
+        self.recorder = recorder
+        self.key = (provider, model)
+        self.started = time.perf_counter()
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.deltas = 0
+        self.completion_tokens = 0
+
+    def on_chunk(self, chunk: ResponseChunk) -> None:
+        if chunk.type == 'stream_delta' and chunk.content.type in _TOKEN_EVENTS:
+            now = time.perf_counter()
+            if self.first is None:
+                self.first = now
+                self.recorder._observe(self.key, ttft=now - self.started)
+            else:
+                self.recorder._observe(self.key, inter_token=now - self.last)
+            self.last = now
+            self.deltas += 1
+        elif chunk.type == 'stream_stop':
+            self.completion_tokens = (chunk.data.get('usage') or {}).get('completionTokens') or 0
+
+    def finish(self) -> None:
+        now = time.perf_counter()
+        generation = (self.last - self.first) if self.first is not None and self.last > self.first else now - self.started
+        tokens = self.completion_tokens or self.deltas
+        self.recorder._finish(self.key, now - self.started, tokens / generation if tokens and generation > 0 else None)
+
+    def fail(self) -> None:
+        self.recorder._finish(self.key, time.perf_counter() - self.started, None, error=True)
+
+
+class MetricsRecorder:
+    """Thread-safe per-(provider, model) latency histograms and error counts."""
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], _ModelMetrics] = {}
+        self._lock = threading.Lock()
+
+    def time_stream(self, provider: str, model: str) -> StreamTimer:
+        return StreamTimer(self, provider, model)
+
+    def record_complete(self, provider: str, model: str, latency: float, completion_tokens: int = 0) -> None:
+        self._finish((provider, model), latency, completion_tokens / latency if completion_tokens and latency > 0 else None)
+
+    def record_error(self, provider: str, model: str, latency: float) -> None:
+        self._finish((provider, model), latency, None, error=True)
+
+    def record_compression(self, provider: str, model: str, seconds: float) -> None:
+        with self._lock:
+            self._metrics((provider, model)).compression.record(seconds)
+
+    def record_transfer(self, provider: str, model: str, body_bytes: int, sent_bytes: int, received_bytes: int) -> None:
+        with self._lock:
+            metrics = self._metrics((provider, model))
+            metrics.request_bytes += body_bytes
+            metrics.bytes_sent += sent_bytes
+            metrics.bytes_received += received_bytes
+
+    def _metrics(self, key: Tuple[str, str]) -> _ModelMetrics:
+        metrics = self._models.get(key)
+        if metrics is None:
+            metrics = self._models[key] = _ModelMetrics()
+        return metrics
+
+    def _observe(self, key: Tuple[str, str], ttft: Optional[float] = None, inter_token: Optional[float] = None) -> None:
+        with self._lock:
+            metrics = self._metrics(key)
+            if ttft is not None:
+                metrics.ttft.record(ttft)
+            if inter_token is not None:
+                metrics.inter_token.record(inter_token)
+
+    def _finish(self, key: Tuple[str, str], latency: float, tokens_per_second: Optional[float], error: bool = False) -> None:
+        with self._lock:
+            metrics = self._metrics(key)
+            metrics.requests += 1
+            if error:
+                metrics.errors += 1
+                return
+            metrics.total.record(latency)
+            if tokens_per_second is not None:
+                metrics.tokens_per_second.record(tokens_per_second)
+
+    def stats(self) -> List[LatencyStats]:
+        with self._lock:
+            return [
+                LatencyStats(
+                    provider=provider,
+                    model=model,
+                    requests=m.requests,
+                    errors=m.errors,
+                    error_rate=m.errors / m.requests if m.requests else 0.0,
+                    **{name: h.summary() for name, h in m.histograms().items()},
+                    **m.byte_counts(),
+                )
+                for (provider, model), m in self._models.items()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def to_prometheus(self, prefix: str = "hchat") -> str:
+        """Prometheus text exposition: summaries with p50/p90/p99 plus request/error counters."""
+        series = [
+            ("ttft_seconds", "ttft", "Time to first content delta of a stream."),
+            ("inter_token_seconds", "inter_token", "Time between content deltas of a stream."),
+            ("request_duration_seconds", "total", "Total request latency."),
+            ("tokens_per_second", "tokens_per_second", "Completion tokens per second of generation."),
+            ("compression_seconds", "compression", "Time spent compressing request bodies."),
+        ]
+        counters = [
+            ("requests_total", "requests", "Requests finished (including errors)."),
+            ("errors_total", "errors", "Requests that raised."),
+            ("request_body_bytes_total", "request_bytes", "Request body bytes before compression."),
+            ("sent_bytes_total", "bytes_sent", "Request body bytes on the wire."),
+            ("received_bytes_total", "bytes_received", "Response body bytes on the wire."),
+        ]
+        with self._lock:
+            models = [(key, {"requests": m.requests, "errors": m.errors, **m.byte_counts()},
+                       {name: _snapshot(h) for name, h in m.histograms().items()})
+                      for key, m in self._models.items()]
+
+        lines: List[str] = []
+        for suffix, attr, help_text in series:
+            name = f"{prefix}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for (provider, model), _, snapshots in models:
+                count, total, quantiles = snapshots[attr]
+                labels = f'provider="{_escape(provider)}",model="{_escape(model)}"'
+                for q, value in quantiles:
+                    if value is not None:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {value:.6g}')
+                lines.append(f"{name}_sum{{{labels}}} {total:.6g}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+        for suffix, attr, help_text in counters:
+            name = f"{prefix}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (provider, model), counts, _ in models:
+                lines.append(f'{name}{{provider="{_escape(provider)}",model="{_escape(model)}"}} {counts[attr]}')
+        return "\n".join(lines) + "\n"
+
+
+def _snapshot(h: StreamingHistogram):
+    return h.count, h.sum, [(q, h.quantile(q)) for q in (0.5, 0.9, 0.99)]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,112 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from .types.response import ResponseChunk, StreamError
+
+if TYPE_CHECKING:
+    from .resources.messages import Messages
+
+_DONE = object()
+
+
+class StreamMultiplexer:
+    """
+    Fan-in of many concurrent `Messages.stream` calls into one async iterator.
+    - Yields `(request_id, ResponseChunk)` in arrival order across all streams
+    - At most `max_concurrency` upstream streams are open at once
+    - Each stream may have at most `buffer_size` unread chunks (backpressure per stream)
+    - Failures are yielded as `StreamError` chunks for that request id only
+    - Leaving the iterator (or `aclose()`) cancels every stream and releases its connection
+    """
+
+    def __init__(
+        self,
+        messages: "Messages",
+        requests: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        buffer_size: int = 16
+    ):
+        self._messages = messages
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        for i, r in enumerate(requests):
+            r = dict(r)
+            request_id = str(r.pop("id", i))
+            if request_id in self._requests:
+                raise ValueError(f"Duplicate stream request id: {request_id}")
+            self._requests[request_id] = r
+
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._credits = {rid: asyncio.Semaphore(buffer_size) for rid in self._requests}
+        self._queue: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled: set = set()
+        self._pending = len(self._requests)
+        self._closed = False
+
+    @property
+    def request_ids(self) -> List[str]:
+        return list(self._requests)
+
+    def cancel(self, request_id: str) -> None:
+        """Stop one stream; chunks it has not yet delivered are discarded."""
+        self._cancelled.add(request_id)
+        task = self._tasks.get(request_id)
+        if task:
+            task.cancel()
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def __aenter__(self) -> "StreamMultiplexer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def __aiter__(self) -> AsyncGenerator[Tuple[str, ResponseChunk], None]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncGenerator[Tuple[str, ResponseChunk], None]:
+        if self._tasks or self._closed:
+            raise RuntimeError("StreamMultiplexer can only be iterated once")
+        for request_id, r in self._requests.items():
+            self._tasks[request_id] = asyncio.ensure_future(self._run(request_id, r))
+
+        try:
+            while self._pending:
+                request_id, item = await self._queue.get()
+                if item is _DONE:
+                    self._pending -= 1
+                    continue
+                self._credits[request_id].release()
+                if request_id in self._cancelled:
+                    continue
+                yield request_id, item
+        finally:
+            await self.aclose()
+
+    async def _run(self, request_id: str, r: Dict[str, Any]) -> None:
+        credits = self._credits[request_id]
+        try:
+            async with self._concurrency:
+                config = dict(r)
+                model = config.pop("model")
+                input = config.pop("input")
+                async for chunk in self._messages.stream(model, input, **config):
+                    await credits.acquire()
+                    self._queue.put_nowait((request_id, chunk))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            await credits.acquire()
+            self._queue.put_nowait((request_id, StreamError(
+                type="error",
+                data={"error": type(e).__name__, "message": str(e)}
+            )))
+        finally:
+            self._queue.put_nowait((request_id, _DONE))
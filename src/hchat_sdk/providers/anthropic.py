@@ -1,9 +1,11 @@
-from typing import AsyncGenerator, Dict, Any, List, Optional
-import httpx
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
+import time
 import uuid
 
-from .base import BaseProvider
+from .base import BaseProvider, StreamParser
+from ..structured import schema_of, tool_name_of
+from ..tokens import get_token_counter
 from ..types.request import LLMRequest, MessageRole, InputMessage
 from ..types.response import (
     LLMResponse, ResponseChunk, StreamStart, StreamDelta, StreamStop,
@@ -11,152 +13,166 @@ from ..types.response import (
     ToolCallStart, ToolCallDelta, ToolCallEnd, Usage, Choice
 )
 
-class AnthropicProvider(BaseProvider):
-    async def complete(self, request: LLMRequest) -> LLMResponse:
-        url = self._build_url(request)
-        payload = self._convert_request(request, stream=False)
-        headers = self._get_headers(request)
-        headers['anthropic-version'] = '2023-06-01'
+class AnthropicStreamParser(StreamParser):
+    def __init__(self, provider: "AnthropicProvider", request: LLMRequest):
+        super().__init__(request)
+        self.provider = provider
+        self.usage = Usage(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        self.current_block_type = None
+        self.current_tool_args = ""
+        self.current_tool_id = None
+        self.thinking_text = ""
+        # Structured output arrives as a forced tool call; it is surfaced as text
+        self.structured_tool = tool_name_of(request.response_format) if request.response_format else None
+
+    def _on_data(self, data_str: str) -> Iterator[ResponseChunk]:
+        try:
+            raw_chunk = json.loads(data_str)
+            event_type = raw_chunk.get("type")
+
+            if event_type == "message_start":
+                msg = raw_chunk.get("message", {})
+                self.usage = self.provider._map_usage(msg.get("usage", {}))
+                yield StreamStart(
+                    type="stream_start",
+                    data={
+                        "model": msg.get("model", self.request.model),
+                        "responseId": msg.get("id")
+                    }
+                )
+
+            elif event_type == "content_block_start":
+                block = raw_chunk.get("content_block", {})
+                self.current_block_type = block.get("type")
+                if self.current_block_type == "tool_use" and block.get("name") == self.structured_tool:
+                    self.current_block_type = "structured"
+                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
+
+                if self.current_block_type == "text":
+                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
+                    if block.get("text"):
+                        yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=block["text"]))
+
+                elif self.current_block_type == "thinking":
+                    yield StreamDelta(type="stream_delta", content=ThinkingStart(type="thinking_start"))
+                    if block.get("thinking"):
+                        self.thinking_text += block["thinking"]
+                        yield StreamDelta(type="stream_delta", content=ThinkingDelta(
+                            type="thinking_delta",
+                            thinking=block["thinking"],
+                            signature=block.get("signature")
+                        ))
+
+                elif self.current_block_type == "tool_use":
+                    self.current_tool_id = block.get("id")
+                    yield StreamDelta(type="stream_delta", content=ToolCallStart(
+                        type="tool_call_start",
+                        toolCallId=block.get("id"),
+                        name=block.get("name")
+                    ))
+
+            elif event_type == "content_block_delta":
+                delta = raw_chunk.get("delta", {})
+                delta_type = delta.get("type")
+
+                if delta_type == "text_delta":
+                    yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=delta.get("text", "")))
+
+                elif delta_type == "thinking_delta":
+                    self.thinking_text += delta.get("thinking", "")
+                    yield StreamDelta(type="stream_delta", content=ThinkingDelta(
+                        type="thinking_delta",
+                        thinking=delta.get("thinking", ""),
+                        signature=delta.get("signature")
+                    ))
+
+                elif delta_type == "input_json_delta" and self.current_block_type == "structured":
+                    yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=delta.get("partial_json", "")))
+
+                elif delta_type == "input_json_delta":
+                    partial_json = delta.get("partial_json", "")
+                    self.current_tool_args += partial_json
+                    yield StreamDelta(type="stream_delta", content=ToolCallDelta(
+                        type="tool_call_delta",
+                        args=partial_json,
+                        toolCallId=self.current_tool_id
+                    ))
+
+            elif event_type == "content_block_stop":
+                if self.current_block_type in ("text", "structured"):
+                    yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
+                elif self.current_block_type == "thinking":
+                    yield StreamDelta(type="stream_delta", content=ThinkingEnd(type="thinking_end"))
+                elif self.current_block_type == "tool_use":
+                    tool_input = {}
+                    try:
+                        if self.current_tool_args:
+                            tool_input = json.loads(self.current_tool_args)
+                    except:
+                        pass
+                    yield StreamDelta(type="stream_delta", content=ToolCallEnd(
+                        type="tool_call_end",
+                        input=tool_input,
+                        toolCallId=self.current_tool_id
+                    ))
+                    self.current_tool_args = ""
+                self.current_block_type = None
+
+            elif event_type == "message_delta":
+                u = raw_chunk.get("usage", {})
+                self.usage.completionTokens = u.get("output_tokens", 0)
+                self.usage.totalTokens = self.usage.promptTokens + self.usage.completionTokens
+                self.usage.reasoningTokens = self.provider._estimate_reasoning_tokens(
+                    self.request.model, [self.thinking_text], self.usage.completionTokens
+                )
+
+            elif event_type == "message_stop":
+                yield StreamStop(
+                    type="stream_stop",
+                    data={
+                        "finishReason": "stop",
+                        "usage": self.usage.model_dump()
+                    }
+                )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
-            response.raise_for_status()
-            data = response.json()
-            return self._map_complete_response(data, request)
+        except:
+            return
 
-    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
-        url = self._build_url(request)
-        payload = self._convert_request(request, stream=True)
+
+class AnthropicProvider(BaseProvider):
+    inline_url_images = True
+    assistant_prefill = True
+
+    def _prepare(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         headers = self._get_headers(request)
         headers['anthropic-version'] = '2023-06-01'
+        return self._build_url(request), headers, self._convert_request(request, stream=stream)
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", url, headers=headers, json=payload, timeout=60.0) as response:
-                response.raise_for_status()
-                
-                usage = Usage(prompt_tokens=0, completion_tokens=0, total_tokens=0)
-                current_block_type = None
-                current_tool_args = ""
-                
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    if line.startswith("data:"):
-                        data_str = line[len("data:"):].strip()
-                        if not data_str:
-                            continue
-                        
-                        try:
-                            raw_chunk = json.loads(data_str)
-                            event_type = raw_chunk.get("type")
-                            
-                            if event_type == "message_start":
-                                msg = raw_chunk.get("message", {})
-                                usage.prompt_tokens = msg.get("usage", {}).get("input_tokens", 0)
-                                yield StreamStart(
-                                    type="stream_start",
-                                    data={
-                                        "model": msg.get("model", request.model),
-                                        "responseId": msg.get("id")
-                                    }
-                                )
-                            
-                            elif event_type == "content_block_start":
-                                block = raw_chunk.get("content_block", {})
-                                current_block_type = block.get("type")
-                                
-                                if current_block_type == "text":
-                                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
-                                    if block.get("text"):
-                                        yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=block["text"]))
-                                
-                                elif current_block_type == "thinking":
-                                    yield StreamDelta(type="stream_delta", content=ThinkingStart(type="thinking_start"))
-                                    if block.get("thinking"):
-                                        yield StreamDelta(type="stream_delta", content=ThinkingDelta(
-                                            type="thinking_delta", 
-                                            thinking=block["thinking"],
-                                            signature=block.get("signature")
-                                        ))
-                                        
-                                elif current_block_type == "tool_use":
-                                    yield StreamDelta(type="stream_delta", content=ToolCallStart(
-                                        type="tool_call_start",
-                                        toolCallId=block.get("id"),
-                                        name=block.get("name")
-                                    ))
-                            
-                            elif event_type == "content_block_delta":
-                                delta = raw_chunk.get("delta", {})
-                                delta_type = delta.get("type")
-                                
-                                if delta_type == "text_delta":
-                                    yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=delta.get("text", "")))
-                                
-                                elif delta_type == "thinking_delta":
-                                    yield StreamDelta(type="stream_delta", content=ThinkingDelta(
-                                        type="thinking_delta",
-                                        thinking=delta.get("thinking", ""),
-                                        signature=delta.get("signature")
-                                    ))
-                                
-                                elif delta_type == "input_json_delta":
-                                    partial_json = delta.get("partial_json", "")
-                                    current_tool_args += partial_json
-                                    yield StreamDelta(type="stream_delta", content=ToolCallDelta(
-                                        type="tool_call_delta",
-                                        args=partial_json
-                                    ))
-                            
-                            elif event_type == "content_block_stop":
-                                if current_block_type == "text":
-                                    yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
-                                elif current_block_type == "thinking":
-                                    yield StreamDelta(type="stream_delta", content=ThinkingEnd(type="thinking_end"))
-                                elif current_block_type == "tool_use":
-                                    tool_input = {}
-                                    try:
-                                        if current_tool_args:
-                                            tool_input = json.loads(current_tool_args)
-                                    except:
-                                        pass
-                                    yield StreamDelta(type="stream_delta", content=ToolCallEnd(
-                                        type="tool_call_end",
-                                        input=tool_input
-                                    ))
-                                    current_tool_args = ""
-                                current_block_type = None
-                            
-                            elif event_type == "message_delta":
-                                u = raw_chunk.get("usage", {})
-                                usage.completion_tokens = u.get("output_tokens", 0)
-                                usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
-                            
-                            elif event_type == "message_stop":
-                                yield StreamStop(
-                                    type="stream_stop",
-                                    data={
-                                        "finishReason": "stop",
-                                        "usage": usage.model_dump()
-                                    }
-                                )
-                                
-                        except:
-                            continue
+    def _create_stream_parser(self, request: LLMRequest) -> StreamParser:
+        return AnthropicStreamParser(self, request)
 
     def _build_url(self, request: LLMRequest) -> str:
         return f"{request.api_base.rstrip('/')}/claude/messages"
 
+    def _continuation_request(self, request: LLMRequest, prefix: str) -> Optional[LLMRequest]:
+        # Prefill is rejected with extended thinking, and structured output streams tool input, not text
+        if request.reasoning or request.response_format:
+            return None
+        # The final assistant turn may not end with whitespace; the model re-emits it
+        prefix = prefix.rstrip()
+        return super()._continuation_request(request, prefix) if prefix else request
+
     def _convert_request(self, request: LLMRequest, stream: bool) -> Dict[str, Any]:
         messages = self._convert_messages(request.messages)
         
         # Default max_tokens
         max_tokens = request.max_tokens or 4096
 
-        # Thinking logic
+        # Thinking logic (budget_tokens must be >= 1024 and below max_tokens)
         thinking = None
-        if request.reasoning:
-            budget = request.reasoning_budget or 1024
+        budget = self._reasoning_budget(request)
+        if request.reasoning and budget:
+            budget = max(budget, 1024)
             if budget >= max_tokens:
                 budget = max_tokens // 2
             thinking = {
@@ -169,8 +185,8 @@ class AnthropicProvider(BaseProvider):
             "messages": messages,
             "stream": stream,
             "max_tokens": max_tokens,
-            "temperature": request.temperature if not request.reasoning else None,
-            "top_p": request.top_p if not request.reasoning else None,
+            "temperature": request.temperature if not thinking else None,
+            "top_p": request.top_p if not thinking else None,
             "top_k": request.top_k,
             "stop_sequences": request.stop,
             "system": request.system,
@@ -179,9 +195,15 @@ class AnthropicProvider(BaseProvider):
 
         if request.tools:
             payload["tools"] = self._convert_tools(request.tools)
+
+        if request.response_format:
+            self._apply_structured_output(payload, request)
+
+        if request.prompt_caching:
+            self._apply_cache_breakpoints(payload)
         
         # Anthropic doesn't allow both temperature and thinking
-        if request.reasoning:
+        if thinking:
             payload.pop("temperature", None)
             payload.pop("top_p", None)
 
@@ -199,36 +221,38 @@ class AnthropicProvider(BaseProvider):
             elif isinstance(m.content, list):
                 for block in m.content:
                     if block.type == 'text':
-                        content_blocks.append({"type": "text", "text": block.text})
+                        content_blocks.append(self._with_cache_control(
+                            {"type": "text", "text": block.text}, block
+                        ))
                     elif block.type == 'image':
                         source = block.source
                         if source.type == 'base64':
-                            content_blocks.append({
+                            content_blocks.append(self._with_cache_control({
                                 "type": "image",
                                 "source": {
                                     "type": "base64",
                                     "media_type": source.media_type or "image/jpeg",
                                     "data": source.data
                                 }
-                            })
+                            }, block))
                         elif source.type == 'url':
-                            # Anthropic doesn't support URLs directly in messages, 
-                            # would need to fetch it. Node SDK skips this or assumes base64.
+                            # Anthropic doesn't support URLs directly in messages.
+                            # complete()/stream() inline them via _inline_url_images first.
                             pass
                     elif block.type == 'tool_use':
-                        content_blocks.append({
+                        content_blocks.append(self._with_cache_control({
                             "type": "tool_use",
                             "id": block.id,
                             "name": block.name,
                             "input": block.input
-                        })
+                        }, block))
                     elif block.type == 'tool_result':
                         # Handle recursive content if needed, but for now:
-                        content_blocks.append({
+                        content_blocks.append(self._with_cache_control({
                             "type": "tool_result",
                             "tool_use_id": block.tool_use_id,
                             "content": block.content
-                        })
+                        }, block))
             
             result.append({
                 "role": "user" if m.role == MessageRole.USER else "assistant",
@@ -243,23 +267,105 @@ class AnthropicProvider(BaseProvider):
                 # Anthropic expects: name, description, input_schema
                 if "function" in t:
                     fn = t["function"]
-                    mapped.append({
+                    tool = {
                         "name": fn.get("name"),
                         "description": fn.get("description"),
                         "input_schema": fn.get("parameters")
-                    })
+                    }
                 else:
-                    mapped.append({
+                    tool = {
                         "name": t.get("name"),
                         "description": t.get("description"),
                         "input_schema": t.get("parameters")
-                    })
+                    }
+                if t.get("cache_control"):
+                    tool["cache_control"] = t["cache_control"]
+                mapped.append(tool)
         return mapped
 
+    def _apply_structured_output(self, payload: Dict[str, Any], request: LLMRequest) -> None:
+        # No native JSON mode: force a tool whose input schema is the requested schema
+        name = tool_name_of(request.response_format)
+        payload.setdefault("tools", []).append({
+            "name": name,
+            "description": "Respond with the final answer as this tool's input.",
+            "input_schema": schema_of(request.response_format) or {"type": "object"}
+        })
+        # Extended thinking only allows tool_choice auto
+        payload["tool_choice"] = {"type": "auto"} if payload.get("thinking") else {"type": "tool", "name": name}
+
+    def _with_cache_control(self, converted: Dict[str, Any], block) -> Dict[str, Any]:
+        if getattr(block, "cache_control", None):
+            converted["cache_control"] = block.cache_control
+        return converted
+
+    def _apply_cache_breakpoints(self, payload: Dict[str, Any]) -> None:
+        """
+        Automatic prompt caching (max 4 breakpoints, explicit markers count first):
+        1. Last tool definition
+        2. System prompt
+        3. End of the previous user turn (read side of the cache)
+        4. End of the latest message (write side for the next turn)
+        """
+        ephemeral = {"type": "ephemeral"}
+        messages = payload.get("messages", [])
+        blocks = [b for m in messages for b in m["content"]]
+        used = sum(1 for b in blocks if "cache_control" in b)
+        used += sum(1 for t in payload.get("tools", []) if "cache_control" in t)
+        if isinstance(payload.get("system"), list):
+            used += sum(1 for b in payload["system"] if "cache_control" in b)
+
+        candidates = []
+        if payload.get("tools"):
+            candidates.append(payload["tools"][-1])
+        if isinstance(payload.get("system"), str) and payload["system"]:
+            payload["system"] = [{"type": "text", "text": payload["system"]}]
+        if isinstance(payload.get("system"), list) and payload["system"]:
+            candidates.append(payload["system"][-1])
+        user_turns = [m for m in messages if m["role"] == "user" and m["content"]]
+        if len(user_turns) > 1:
+            candidates.append(user_turns[-2]["content"][-1])
+        if messages and messages[-1]["content"]:
+            candidates.append(messages[-1]["content"][-1])
+
+        for target in candidates:
+            if used >= 4:
+                break
+            if "cache_control" not in target:
+                target["cache_control"] = ephemeral
+                used += 1
+
+    def _map_usage(self, u: Dict[str, Any]) -> Usage:
+        # input_tokens excludes cached tokens; fold them back in so promptTokens matches other providers
+        cache_read = u.get('cache_read_input_tokens') or 0
+        cache_write = u.get('cache_creation_input_tokens') or 0
+        prompt_tokens = (u.get('input_tokens') or 0) + cache_read + cache_write
+        completion_tokens = u.get('output_tokens') or 0
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write
+        )
+
+    def _estimate_reasoning_tokens(self, model: str, thinking: List[str], completion_tokens: int) -> Optional[int]:
+        # Anthropic bills thinking inside output_tokens without reporting it separately;
+        # estimate it from the thinking text so reasoningTokens is populated like other providers
+        texts = [t for t in thinking if t]
+        if not texts:
+            return None
+        return min(sum(get_token_counter(model).count_texts(texts)), completion_tokens)
+
     def _map_complete_response(self, data: Dict[str, Any], request: LLMRequest) -> LLMResponse:
+        structured_tool = tool_name_of(request.response_format) if request.response_format else None
+        stop_reason = data.get('stop_reason', 'stop')
         content_blocks = []
         for block in data.get('content', []):
-            if block.get('type') == 'text':
+            if block.get('type') == 'tool_use' and block.get('name') == structured_tool:
+                content_blocks.append({"type": "text", "text": json.dumps(block.get("input"), ensure_ascii=False)})
+                stop_reason = "stop" if stop_reason == "tool_use" else stop_reason
+            elif block.get('type') == 'text':
                 content_blocks.append({"type": "text", "text": block.get("text", "")})
             elif block.get('type') == 'tool_use':
                 content_blocks.append({
@@ -269,25 +375,25 @@ class AnthropicProvider(BaseProvider):
                     "input": block.get("input")
                 })
         
-        usage = data.get('usage', {})
-        input_tokens = usage.get('input_tokens', 0)
-        output_tokens = usage.get('output_tokens', 0)
+
+        usage = self._map_usage(data.get('usage', {}))
+        usage.reasoningTokens = self._estimate_reasoning_tokens(
+            request.model,
+            [b.get('thinking', '') for b in data.get('content', []) if b.get('type') == 'thinking'],
+            usage.completionTokens
+        )
 
         return LLMResponse(
             id=data.get('id', 'unknown'),
             model=data.get('model', request.model),
-            created=0,
-            usage=Usage(
-                prompt_tokens=input_tokens,
-                completion_tokens=output_tokens,
-                total_tokens=input_tokens + output_tokens
-            ),
+            created=int(time.time()),
+            usage=usage,
             choices=[Choice(
                 index=0,
                 message=InputMessage(
                     role=MessageRole.ASSISTANT,
                     content=content_blocks
                 ),
-                finish_reason=data.get('stop_reason', 'stop')
+                finish_reason=stop_reason
             )]
         )
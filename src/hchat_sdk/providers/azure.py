@@ -1,180 +1,125 @@
 import json
-import uuid
-from typing import AsyncGenerator, Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
-import httpx
-
-from .base import BaseProvider
-from ..types.request import LLMRequest, ContentBlock, InputMessage, MessageRole
+from .base import BaseProvider, StreamParser, ToolCallAssembler
+from ..types.content import TextContent, ToolUseContent
+from ..types.request import LLMRequest, InputMessage, MessageRole
 from ..types.response import (
     LLMResponse, ResponseChunk, StreamDelta, StreamStart, StreamStop,
-    TextStart, TextDelta, TextEnd, ToolCallStart, ToolCallDelta, ToolCallEnd,
+    TextStart, TextDelta, TextEnd,
     Choice, Usage, ThinkingDelta
 )
 
 
-class AzureProvider(BaseProvider):
-    """
-    Azure Provider (HChat wrapped OpenAI)
-    - Supports deployments/{model}/chat/completions endpoint
-    - Stateful stream parsing for tool calls and text
-    - Maps max_tokens to max_completion_tokens
-    """
+class AzureStreamParser(StreamParser):
+    def __init__(self, provider: "AzureProvider", request: LLMRequest):
+        super().__init__(request)
+        self.provider = provider
+        self.is_first_chunk = True
+        self.in_text = False
+        self.tool_calls = ToolCallAssembler()
+        self.final_usage = None
+        self.final_finish_reason = "unknown"
 
-    async def complete(self, request: LLMRequest) -> LLMResponse:
-        url = self._build_url(request)
-        payload = self._convert_request(request, stream=False)
-        headers = self._get_headers(request)
-        headers["api-key"] = request.api_key
+    def _on_data(self, data_str: str) -> Iterator[ResponseChunk]:
+        if data_str == "[DONE]":
+            self.done = True
+            return
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
-            if not response.is_success:
-                 # Replicate server error handling logic if needed, but for now raise
-                 response.raise_for_status()
-            
-            data = response.json()
-            return self._map_complete_response(data)
+        try:
+            raw_chunk = json.loads(data_str)
+        except json.JSONDecodeError:
+            return
 
-    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
-        url = self._build_url(request)
-        print(f"DEBUG AZURE URL: {url}")
-        payload = self._convert_request(request, stream=True)
-        headers = self._get_headers(request)
-        headers["api-key"] = request.api_key
-        headers["Accept"] = "text/event-stream"
+        choices = raw_chunk.get("choices", [])
+        if self.is_first_chunk and choices:
+            choice = choices[0]
+            delta = choice.get("delta", {})
+            if delta.get("role"):
+                yield StreamStart(
+                    type="stream_start",
+                    data={
+                        "model": raw_chunk.get("model", self.request.model),
+                        "responseId": raw_chunk.get("id")
+                    }
+                )
+                self.is_first_chunk = False
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", url, headers=headers, json=payload, timeout=60.0) as response:
-                print(f"DEBUG RESPONSE STATUS: {response.status_code}")
-                if not response.is_success:
-                    err_body = await response.aread()
-                    print(f"\n[Azure Stream Error Body] {err_body.decode()}")
-                response.raise_for_status()
+        if not choices:
+            if "usage" in raw_chunk:
+                u = raw_chunk["usage"]
+                details = u.get("completion_tokens_details", {})
+                self.final_usage = Usage(
+                    prompt_tokens=u.get("prompt_tokens", 0),
+                    completion_tokens=u.get("completion_tokens", 0),
+                    total_tokens=u.get("total_tokens", 0),
+                    reasoning_tokens=details.get("reasoning_tokens", 0),
+                    cache_read_tokens=(u.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                )
+            return
 
-                is_first_chunk = True
-                current_block_type = None  # 'text' or 'tool_call'
-                current_tool_index = -1
-                current_tool_args_buffer = ""
-                current_tool_id = ""
-                current_tool_name = ""
-                final_usage = None
-                final_finish_reason = "unknown"
+        choice = choices[0]
+        delta = choice.get("delta", {})
 
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    if line.startswith("data:"):
-                        data_str = line[len("data:"):].strip()
-                        if data_str == "[DONE]":
-                            break
-                        
-                        try:
-                            raw_chunk = json.loads(data_str)
-                            
-                            choices = raw_chunk.get("choices", [])
-                            if is_first_chunk and choices:
-                                choice = choices[0]
-                                delta = choice.get("delta", {})
-                                if delta.get("role"):
-                                    yield StreamStart(
-                                        type="stream_start",
-                                        data={
-                                            "model": raw_chunk.get("model", request.model),
-                                            "responseId": raw_chunk.get("id")
-                                        }
-                                    )
-                                    is_first_chunk = False
+        # 1. Text Content
+        if "content" in delta and delta["content"]:
+            if not self.in_text:
+                yield from self.tool_calls.close()
+                yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
+                self.in_text = True
 
-                            if not choices:
-                                if "usage" in raw_chunk:
-                                    u = raw_chunk["usage"]
-                                    details = u.get("completion_tokens_details", {})
-                                    final_usage = Usage(
-                                        prompt_tokens=u.get("prompt_tokens", 0),
-                                        completion_tokens=u.get("completion_tokens", 0),
-                                        total_tokens=u.get("total_tokens", 0),
-                                        reasoning_tokens=details.get("reasoning_tokens", 0)
-                                    )
-                                continue
+            yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=delta["content"]))
 
-                            choice = choices[0]
-                            delta = choice.get("delta", {})
-                            
-                            # 1. Text Content
-                            if "content" in delta and delta["content"]:
-                                content = delta["content"]
-                                if current_block_type != "text":
-                                    if current_block_type == "tool_call":
-                                        yield self._create_tool_end_event(current_tool_args_buffer)
-                                    
-                                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
-                                    current_block_type = "text"
-                                
-                                yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=content))
+        # 2. Tool Calls (parallel calls may interleave by index)
+        if delta.get("tool_calls"):
+            if self.in_text:
+                yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
+                self.in_text = False
+            yield from self.tool_calls.feed(delta["tool_calls"])
 
-                            # 2. Tool Calls
-                            if "tool_calls" in delta:
-                                for tc in delta["tool_calls"]:
-                                    index = tc.get("index", 0)
-                                    
-                                    if current_block_type != "tool_call" or index != current_tool_index:
-                                        if current_block_type == "tool_call":
-                                            yield self._create_tool_end_event(current_tool_args_buffer)
-                                        
-                                        current_block_type = "tool_call"
-                                        current_tool_index = index
-                                        current_tool_args_buffer = ""
-                                        current_tool_id = tc.get("id") or f"call_{uuid.uuid4()}"
-                                        current_tool_name = tc.get("function", {}).get("name", "")
-                                        
-                                        yield StreamDelta(
-                                            type="stream_delta",
-                                            content=ToolCallStart(
-                                                type="tool_call_start",
-                                                toolCallId=current_tool_id,
-                                                name=current_tool_name
-                                            )
-                                        )
-                                    else:
-                                        if "id" in tc and not current_tool_id:
-                                            current_tool_id = tc["id"]
-                                        if "function" in tc and "name" in tc["function"] and not current_tool_name:
-                                            current_tool_name = tc["function"]["name"]
+        # 3. Reasoning (Thinking)
+        # Handle reasoning_content if present (O1 models)
+        reasoning = delta.get("reasoning_content")
+        if reasoning:
+            yield StreamDelta(type="stream_delta", content=ThinkingDelta(type="thinking_delta", thinking=reasoning))
 
-                                    if "function" in tc and "arguments" in tc["function"]:
-                                        args_delta = tc["function"]["arguments"]
-                                        current_tool_args_buffer += args_delta
-                                        yield StreamDelta(
-                                            type="stream_delta",
-                                            content=ToolCallDelta(type="tool_call_delta", args=args_delta)
-                                        )
+        if choice.get("finish_reason"):
+            self.final_finish_reason = choice["finish_reason"]
+            # Arguments are complete; don't hold the calls until the trailing usage chunk
+            yield from self.tool_calls.close()
 
-                            # 3. Reasoning (Thinking)
-                            # Handle reasoning_content if present (O1 models)
-                            reasoning = delta.get("reasoning_content")
-                            if reasoning:
-                                yield StreamDelta(type="stream_delta", content=ThinkingDelta(type="thinking_delta", thinking=reasoning))
+    def _on_finish(self) -> Iterator[ResponseChunk]:
+        # Cleanup
+        if self.in_text:
+            yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
+        yield from self.tool_calls.close()
 
-                            if choice.get("finish_reason"):
-                                final_finish_reason = choice["finish_reason"]
+        yield StreamStop(
+            type="stream_stop",
+            data={
+                "finishReason": self.final_finish_reason,
+                "usage": self.final_usage.model_dump() if self.final_usage else {"promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
+            }
+        )
 
-                        except json.JSONDecodeError:
-                            continue
 
-                # Cleanup
-                if current_block_type == "text":
-                    yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
-                elif current_block_type == "tool_call":
-                    yield self._create_tool_end_event(current_tool_args_buffer)
+class AzureProvider(BaseProvider):
+    """
+    Azure Provider (HChat wrapped OpenAI)
+    - Supports deployments/{model}/chat/completions endpoint
+    - Stateful stream parsing for tool calls and text
+    - Maps max_tokens to max_completion_tokens
+    """
 
-                yield StreamStop(
-                    type="stream_stop",
-                    data={
-                        "finishReason": final_finish_reason,
-                        "usage": final_usage.model_dump() if final_usage else {"promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
-                    }
-                )
+    def _prepare(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        headers = self._get_headers(request)
+        headers["api-key"] = request.api_key
+        if stream:
+            headers["Accept"] = "text/event-stream"
+        return self._build_url(request), headers, self._convert_request(request, stream=stream)
+
+    def _create_stream_parser(self, request: LLMRequest) -> StreamParser:
+        return AzureStreamParser(self, request)
 
     def _build_url(self, request: LLMRequest) -> str:
         api_base = request.api_base.rstrip("/") + "/"
@@ -182,15 +127,6 @@ class AzureProvider(BaseProvider):
             api_base += "openai/"
         return f"{api_base}deployments/{request.model}/chat/completions"
 
-    def _create_tool_end_event(self, args_buffer: str) -> StreamDelta:
-        input_data = {}
-        try:
-            if args_buffer:
-                input_data = json.loads(args_buffer)
-        except Exception:
-            pass
-        return StreamDelta(type="stream_delta", content=ToolCallEnd(type="tool_call_end", input=input_data))
-
     def _convert_request(self, request: LLMRequest, stream: bool) -> Dict[str, Any]:
         messages = self._convert_messages(request.messages)
         
@@ -239,11 +175,12 @@ class AzureProvider(BaseProvider):
             if mapped_tools:
                 payload["tools"] = mapped_tools
 
-        # Reasoning effort
-        if request.reasoning:
-            payload["reasoning_effort"] = "high"
-        else:
-            payload["reasoning_effort"] = "minimal"
+        # Structured output (normalized to the OpenAI shape by the client)
+        if request.response_format:
+            payload["response_format"] = request.response_format
+
+        # Reasoning effort (only sent when requested or defaulted for a reasoning model)
+        payload["reasoning_effort"] = self._reasoning_effort(request)
 
         payload = {k: v for k, v in payload.items() if v is not None}
         return payload
@@ -271,14 +208,15 @@ class AzureProvider(BaseProvider):
                 result.append({"role": msg.role, "content": content})
         return result
 
-    def _map_complete_response(self, data: Dict[str, Any]) -> LLMResponse:
+    def _map_complete_response(self, data: Dict[str, Any], request: LLMRequest) -> LLMResponse:
         usage_data = data.get("usage", {})
         details = usage_data.get("completion_tokens_details", {})
         usage = Usage(
             prompt_tokens=usage_data.get("prompt_tokens", 0),
             completion_tokens=usage_data.get("completion_tokens", 0),
             total_tokens=usage_data.get("total_tokens", 0),
-            reasoning_tokens=details.get("reasoning_tokens", 0)
+            reasoning_tokens=details.get("reasoning_tokens", 0),
+            cache_read_tokens=(usage_data.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
         )
 
         choices = []
@@ -291,15 +229,14 @@ class AzureProvider(BaseProvider):
             if tool_calls:
                 blocks = []
                 if content:
-                    blocks.append(ContentBlock(type="text", text=content))
+                    blocks.append(TextContent(text=content))
                 for tc in tool_calls:
                     fn = tc.get("function", {})
                     try:
                         args = json.loads(fn.get("arguments", "{}"))
                     except:
                         args = {}
-                    blocks.append(ContentBlock(
-                        type="tool_use",
+                    blocks.append(ToolUseContent(
                         id=tc.get("id"),
                         name=fn.get("name"),
                         input=args
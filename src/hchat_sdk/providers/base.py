@@ -1,22 +1,461 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import time
+import uuid
 import httpx
 
-from ..types.request import LLMRequest
-from ..types.response import LLMResponse, ResponseChunk
+from ..capabilities import reasoning_budget_for, reasoning_effort_for
+from ..compression import UNSUPPORTED_ENCODING_STATUS, RequestCompression
+from ..images import CachedImage, ImageFetcher
+from ..metrics import MetricsRecorder
+from ..types.content import Base64ImageSource, ImageContent
+from ..types.request import LLMRequest, InputMessage, MessageRole
+from ..types.response import LLMResponse, ResponseChunk, StreamDelta, ToolCallDelta, ToolCallEnd, ToolCallStart
+
+
+def _json_body(payload: Dict[str, Any]) -> bytes:
+    # Matches httpx's own json= encoding
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+class StreamParser(ABC):
+    """
+    Incremental SSE parser shared by the async and sync transports.
+    Lines are pushed in with feed(); finish() flushes open blocks at end of stream.
+    """
+
+    def __init__(self, request: LLMRequest):
+        self.request = request
+        self.done = False
+
+    def feed(self, line: str) -> List[ResponseChunk]:
+        if self.done or not line.strip() or not line.startswith("data:"):
+            return []
+        data_str = line[len("data:"):].strip()
+        if not data_str:
+            return []
+        return list(self._on_data(data_str))
+
+    def finish(self) -> List[ResponseChunk]:
+        return list(self._on_finish())
+
+    @abstractmethod
+    def _on_data(self, data_str: str) -> Iterator[ResponseChunk]:
+        pass
+
+    def _on_finish(self) -> Iterator[ResponseChunk]:
+        return iter(())
+
+
+class ToolCallAssembler:
+    """
+    Per-index tool-call state for OpenAI-style streams (Azure, OpenAI). Argument deltas of
+    parallel calls can interleave across indices, so each call keeps its own buffer and is
+    closed with its own ToolCallEnd when the choice finishes.
+    """
+
+    def __init__(self):
+        self.calls: Dict[int, Dict[str, str]] = {}  # index -> {"id", "name", "args"}, in start order
+
+    @property
+    def open(self) -> bool:
+        return bool(self.calls)
+
+    def feed(self, tool_calls: List[Dict[str, Any]]) -> Iterator[StreamDelta]:
+        for tc in tool_calls:
+            index = tc.get("index", 0)
+            fn = tc.get("function") or {}
+            call = self.calls.get(index)
+            if call is None:
+                call = self.calls[index] = {
+                    "id": tc.get("id") or f"call_{uuid.uuid4()}",
+                    "name": fn.get("name", ""),
+                    "args": ""
+                }
+                yield StreamDelta(type="stream_delta", content=ToolCallStart(
+                    type="tool_call_start", toolCallId=call["id"], name=call["name"]
+                ))
+            if fn.get("arguments"):
+                call["args"] += fn["arguments"]
+                yield StreamDelta(type="stream_delta", content=ToolCallDelta(
+                    type="tool_call_delta", args=fn["arguments"], toolCallId=call["id"]
+                ))
+
+    def close(self) -> Iterator[StreamDelta]:
+        for call in self.calls.values():
+            try:
+                input_data = json.loads(call["args"]) if call["args"] else {}
+            except ValueError:
+                input_data = {}
+            yield StreamDelta(type="stream_delta", content=ToolCallEnd(
+                type="tool_call_end", input=input_data, toolCallId=call["id"]
+            ))
+        self.calls = {}
+
+
+# Appended after the partial answer for APIs that do not continue a trailing assistant turn
+CONTINUE_PROMPT = "Continue exactly where your previous message stopped. Do not repeat any of it."
+
 
 class BaseProvider(ABC):
+    # Providers that cannot dereference image URLs get them inlined as base64 first
+    inline_url_images = False
+    # Whether a trailing assistant turn is continued in place (prefill) rather than answered
+    assistant_prefill = False
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        image_fetcher: Optional[ImageFetcher] = None,
+        sync_http_client: Optional[httpx.Client] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        compression: Optional[RequestCompression] = None
+    ):
+        # Per-(provider, model) latency histograms; None records nothing
+        self.metrics = metrics
+        # Request-body compression policy; None sends plain JSON
+        self.compression = compression
+        self._http_client = http_client
+        self._sync_http_client = sync_http_client
+        self._image_fetcher = image_fetcher
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=60.0)
+        return self._http_client
+
+    @property
+    def sync_http_client(self) -> httpx.Client:
+        if self._sync_http_client is None:
+            self._sync_http_client = httpx.Client(timeout=60.0)
+        return self._sync_http_client
+
+    @property
+    def image_fetcher(self) -> ImageFetcher:
+        if self._image_fetcher is None:
+            self._image_fetcher = ImageFetcher(self._http_client, self._sync_http_client)
+        return self._image_fetcher
+
+    # ---- Provider hooks ----
+
     @abstractmethod
-    async def complete(self, request: LLMRequest) -> LLMResponse:
+    def _prepare(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Return (url, headers, payload) for a request."""
         pass
 
     @abstractmethod
-    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
+    def _create_stream_parser(self, request: LLMRequest) -> StreamParser:
+        pass
+
+    @abstractmethod
+    def _map_complete_response(self, data: Dict[str, Any], request: LLMRequest) -> LLMResponse:
         pass
 
+    # ---- Async transport ----
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        started = time.perf_counter()
+        try:
+            if self.inline_url_images:
+                request = await self._inline_url_images(request)
+            url, headers, payload = self._prepare(request, stream=False)
+
+            async with self._post(request, url, headers, payload) as response:
+                await response.aread()
+            response.raise_for_status()
+            result = self._map_complete_response(response.json(), request)
+        except Exception:
+            self._record_error(request, started)
+            raise
+        self._record_complete(request, started, result)
+        return result
+
+    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
+        timer = self.metrics.time_stream(request.provider, request.model) if self.metrics is not None else None
+        try:
+            if self.inline_url_images:
+                request = await self._inline_url_images(request)
+            url, headers, payload = self._prepare(request, stream=True)
+
+            async with self._post(request, url, headers, payload) as response:
+                if not response.is_success:
+                    await response.aread()  # keep the error body on the raised exception
+                response.raise_for_status()
+
+                parser = self._create_stream_parser(request)
+                async for line in response.aiter_lines():
+                    for chunk in parser.feed(line):
+                        if timer is not None:
+                            timer.on_chunk(chunk)
+                        yield chunk
+                for chunk in parser.finish():
+                    if timer is not None:
+                        timer.on_chunk(chunk)
+                    yield chunk
+        except Exception:
+            if timer is not None:
+                timer.fail()
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            # Closed early by the consumer: record the part that was streamed
+            if timer is not None:
+                timer.finish()
+            raise
+        if timer is not None:
+            timer.finish()
+
+    # ---- Sync transport ----
+
+    def complete_sync(self, request: LLMRequest) -> LLMResponse:
+        started = time.perf_counter()
+        try:
+            if self.inline_url_images:
+                request = self._inline_url_images_sync(request)
+            url, headers, payload = self._prepare(request, stream=False)
+
+            with self._post_sync(request, url, headers, payload) as response:
+                response.read()
+            response.raise_for_status()
+            result = self._map_complete_response(response.json(), request)
+        except Exception:
+            self._record_error(request, started)
+            raise
+        self._record_complete(request, started, result)
+        return result
+
+    def stream_sync(self, request: LLMRequest) -> Iterator[ResponseChunk]:
+        timer = self.metrics.time_stream(request.provider, request.model) if self.metrics is not None else None
+        try:
+            if self.inline_url_images:
+                request = self._inline_url_images_sync(request)
+            url, headers, payload = self._prepare(request, stream=True)
+
+            with self._post_sync(request, url, headers, payload) as response:
+                if not response.is_success:
+                    response.read()
+                response.raise_for_status()
+
+                parser = self._create_stream_parser(request)
+                for line in response.iter_lines():
+                    for chunk in parser.feed(line):
+                        if timer is not None:
+                            timer.on_chunk(chunk)
+                        yield chunk
+                for chunk in parser.finish():
+                    if timer is not None:
+                        timer.on_chunk(chunk)
+                    yield chunk
+        except Exception:
+            if timer is not None:
+                timer.fail()
+            raise
+        except GeneratorExit:
+            if timer is not None:
+                timer.finish()
+            raise
+        if timer is not None:
+            timer.finish()
+
+    # ---- Request bodies ----
+
+    @asynccontextmanager
+    async def _post(
+        self, request: LLMRequest, url: str, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> AsyncIterator[httpx.Response]:
+        """Streamed POST of `payload`, compressed per `self.compression`; plain JSON after a 415."""
+        body = _json_body(payload)
+        headers = self._body_headers(headers)
+        if self.compression is not None and self.compression.applies(url, len(body)):
+            started = time.perf_counter()
+            if len(body) >= self.compression.offload_threshold:
+                content = await asyncio.to_thread(self.compression.compress, body)
+            else:
+                content = self.compression.compress(body)
+            self._record_compression(request, started)
+            encoded = {**headers, "Content-Encoding": self.compression.encoding}
+            async with self.http_client.stream("POST", url, headers=encoded, content=content, timeout=60.0) as response:
+                if response.status_code not in UNSUPPORTED_ENCODING_STATUS:
+                    try:
+                        yield response
+                    finally:
+                        self._record_transfer(request, body, content, response)
+                    return
+            self.compression.mark_unsupported(url)
+
+        async with self.http_client.stream("POST", url, headers=headers, content=body, timeout=60.0) as response:
+            try:
+                yield response
+            finally:
+                self._record_transfer(request, body, body, response)
+
+    @contextmanager
+    def _post_sync(
+        self, request: LLMRequest, url: str, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> Iterator[httpx.Response]:
+        body = _json_body(payload)
+        headers = self._body_headers(headers)
+        if self.compression is not None and self.compression.applies(url, len(body)):
+            started = time.perf_counter()
+            content = self.compression.compress(body)
+            self._record_compression(request, started)
+            encoded = {**headers, "Content-Encoding": self.compression.encoding}
+            with self.sync_http_client.stream("POST", url, headers=encoded, content=content, timeout=60.0) as response:
+                if response.status_code not in UNSUPPORTED_ENCODING_STATUS:
+                    try:
+                        yield response
+                    finally:
+                        self._record_transfer(request, body, content, response)
+                    return
+            self.compression.mark_unsupported(url)
+
+        with self.sync_http_client.stream("POST", url, headers=headers, content=body, timeout=60.0) as response:
+            try:
+                yield response
+            finally:
+                self._record_transfer(request, body, body, response)
+
+    def _body_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json", **headers}
+        if self.compression is not None:
+            headers["Accept-Encoding"] = self.compression.accept_encoding
+        return headers
+
+    # ---- Latency metrics ----
+
+    def _record_complete(self, request: LLMRequest, started: float, response: LLMResponse) -> None:
+        if self.metrics is not None:
+            self.metrics.record_complete(
+                request.provider, request.model, time.perf_counter() - started, response.usage.completionTokens
+            )
+
+    def _record_error(self, request: LLMRequest, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.record_error(request.provider, request.model, time.perf_counter() - started)
+
+    def _record_compression(self, request: LLMRequest, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.record_compression(request.provider, request.model, time.perf_counter() - started)
+
+    def _record_transfer(self, request: LLMRequest, body: bytes, sent: bytes, response: httpx.Response) -> None:
+        if self.metrics is not None:
+            self.metrics.record_transfer(
+                request.provider, request.model, len(body), len(sent), response.num_bytes_downloaded
+            )
+
+    def _probe_endpoint(self, request: LLMRequest) -> Tuple[str, Dict[str, str]]:
+        """URL and headers for connection warmup probes (see `hchat_sdk.warmup`)."""
+        url, _, _ = self._prepare(request, stream=False)
+        return url, {}
+
     def _get_headers(self, request: LLMRequest) -> dict:
         return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {request.api_key}",
             **(request.extra_headers or {})
         }
+
+    # ---- Reasoning controls ----
+
+    def _reasoning_effort(self, request: LLMRequest) -> Optional[str]:
+        """Effort level for providers that take one (OpenAI-style); None sends nothing."""
+        if request.reasoning_effort:
+            return request.reasoning_effort
+        if request.reasoning_budget is not None:
+            return reasoning_effort_for(request.reasoning_budget)
+        if request.reasoning is None:
+            return None
+        return "high" if request.reasoning else "minimal"
+
+    def _reasoning_budget(self, request: LLMRequest, default: int = 1024) -> Optional[int]:
+        """Thinking-token budget for providers that take one; 0 disables thinking, None sends nothing."""
+        if request.reasoning_budget is not None:
+            return request.reasoning_budget
+        if request.reasoning_effort:
+            return reasoning_budget_for(request.reasoning_effort)
+        if request.reasoning is None:
+            return None
+        return default if request.reasoning else 0
+
+    # ---- Stream resumption ----
+
+    def _continuation_request(self, request: LLMRequest, prefix: str) -> Optional[LLMRequest]:
+        """
+        Request that picks up an interrupted answer after `prefix`; None when this request
+        cannot be continued. Prefill providers extend the trailing assistant turn, others get
+        the partial answer plus an explicit instruction to continue.
+        - Not continued: a trailing assistant turn with content blocks, or an answer to tool output
+        """
+        messages = list(request.messages)
+        last = messages[-1] if messages else None
+        if last is not None and last.role == MessageRole.TOOL:
+            return None
+        if last is not None and isinstance(last.content, list) and any(
+            block.type in ('tool_use', 'tool_result') for block in last.content
+        ):
+            return None
+        if last is not None and last.role == MessageRole.ASSISTANT:
+            if not isinstance(last.content, str):
+                return None
+            # The caller already prefilled the answer; the prefix extends it
+            messages[-1] = last.model_copy(update={"content": last.content + prefix})
+        else:
+            messages.append(InputMessage(role=MessageRole.ASSISTANT, content=prefix))
+        if not self.assistant_prefill:
+            messages.append(InputMessage(role=MessageRole.USER, content=CONTINUE_PROMPT))
+        return request.model_copy(update={"messages": messages})
+
+    # ---- URL image inlining ----
+
+    async def _inline_url_images(self, request: LLMRequest) -> LLMRequest:
+        """Replace URL image blocks with base64 sources for providers that cannot fetch URLs."""
+        urls = self._collect_image_urls(request)
+        if not urls:
+            return request
+        return self._replace_url_images(request, await self.image_fetcher.fetch_many(urls))
+
+    def _inline_url_images_sync(self, request: LLMRequest) -> LLMRequest:
+        urls = self._collect_image_urls(request)
+        if not urls:
+            return request
+        return self._replace_url_images(request, self.image_fetcher.fetch_many_sync(urls))
+
+    def _collect_image_urls(self, request: LLMRequest) -> List[str]:
+        urls = []
+        for m in request.messages:
+            if isinstance(m.content, list):
+                for block in m.content:
+                    if block.type == 'image' and block.source.type == 'url':
+                        urls.append(block.source.url)
+                    elif block.type == 'imageUrl':
+                        urls.append(block.url)
+        return urls
+
+    def _replace_url_images(self, request: LLMRequest, images: Dict[str, CachedImage]) -> LLMRequest:
+        messages: List[InputMessage] = []
+        for m in request.messages:
+            if not isinstance(m.content, list):
+                messages.append(m)
+                continue
+            blocks = []
+            for block in m.content:
+                url = None
+                if block.type == 'image' and block.source.type == 'url':
+                    url = block.source.url
+                elif block.type == 'imageUrl':
+                    url = block.url
+                if url is None:
+                    blocks.append(block)
+                    continue
+                image = images[url]
+                source = Base64ImageSource(type='base64', media_type=image.media_type, data=image.data)
+                if block.type == 'image':
+                    # model_copy keeps cache_control and any other block fields
+                    blocks.append(block.model_copy(update={"source": source}))
+                else:
+                    blocks.append(ImageContent(source=source))
+            messages.append(m.model_copy(update={"content": blocks}))
+        return request.model_copy(update={"messages": messages})
@@ -1,123 +1,137 @@
-from typing import AsyncGenerator, Dict, Any, List, Optional
-import httpx
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
+import time
 import uuid
 
-from .base import BaseProvider
+from .base import BaseProvider, StreamParser
+from ..errors import ProviderStreamError
+from ..structured import schema_of, to_gemini_schema
 from ..types.request import LLMRequest, MessageRole, InputMessage
 from ..types.response import (
     LLMResponse, ResponseChunk, StreamStart, StreamDelta, StreamStop,
-    TextStart, TextDelta, TextEnd, ThinkingDelta,
+    TextStart, TextDelta, TextEnd, ThinkingStart, ThinkingDelta, ThinkingEnd,
     ToolCallStart, ToolCallDelta, ToolCallEnd, Usage, Choice
 )
 
-class GoogleProvider(BaseProvider):
-    async def complete(self, request: LLMRequest) -> LLMResponse:
-        url = self._get_url(request, stream=False)
-        payload = self._convert_request(request)
-        headers = self._get_headers(request)
-        headers['Content-Type'] = 'application/json'
+class GoogleStreamParser(StreamParser):
+    def __init__(self, provider: "GoogleProvider", request: LLMRequest):
+        super().__init__(request)
+        self.provider = provider
+        self.is_first_chunk = True
+        self.current_block_type = None # 'text', 'thinking', 'tool_call'
+        self.usage = Usage(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        self.finish_reason = "stop"
+
+    def _on_data(self, data_str: str) -> Iterator[ResponseChunk]:
+        raw_chunk = json.loads(data_str)
+        if "error" in raw_chunk:
+            err = raw_chunk["error"]
+            raise ProviderStreamError("google", err.get("message", str(err)), err.get("code"))
+
+        if self.is_first_chunk:
+            yield StreamStart(
+                type="stream_start",
+                data={
+                    "model": raw_chunk.get("modelVersion", self.request.model),
+                    "responseId": raw_chunk.get("responseId")
+                }
+            )
+            self.is_first_chunk = False
+
+        for candidate in raw_chunk.get("candidates", []):
+            for part in candidate.get("content", {}).get("parts", []):
+                yield from self._on_part(part)
+            if candidate.get("finishReason"):
+                self.finish_reason = candidate["finishReason"]
+
+        # Cumulative; the last chunk carries the final counts
+        if "usageMetadata" in raw_chunk:
+            self.usage = self.provider._map_usage(raw_chunk["usageMetadata"])
+
+    def _on_part(self, part: Dict[str, Any]) -> Iterator[ResponseChunk]:
+        signature = part.get("thoughtSignature")
+
+        # 1. Thinking (thought summaries)
+        if part.get("thought"):
+            yield from self._switch_block("thinking")
+            yield StreamDelta(type="stream_delta", content=ThinkingDelta(
+                type="thinking_delta", thinking=part.get("text", ""), signature=signature
+            ))
+            return
+
+        if signature:
+            # The signature rides on the first answer part after the reasoning; emit it as a
+            # thinking block so it can be sent back (ThinkingContent.signature) on the next turn
+            yield from self._switch_block("thinking")
+            yield StreamDelta(type="stream_delta", content=ThinkingDelta(
+                type="thinking_delta", thinking="", signature=signature
+            ))
+
+        # 2. Text
+        if part.get("text"):
+            yield from self._switch_block("text")
+            yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=part["text"]))
+
+        # 3. Tool Call (Gemini sends the full call in one part)
+        elif "functionCall" in part:
+            yield from self._switch_block(None)
+            call_id = f"call_{uuid.uuid4()}"
+            fn = part["functionCall"]
+            yield StreamDelta(type="stream_delta", content=ToolCallStart(
+                type="tool_call_start",
+                toolCallId=call_id,
+                name=fn.get("name")
+            ))
+            yield StreamDelta(type="stream_delta", content=ToolCallDelta(
+                type="tool_call_delta",
+                args=json.dumps(fn.get("args", {})),
+                toolCallId=call_id
+            ))
+            yield StreamDelta(type="stream_delta", content=ToolCallEnd(
+                type="tool_call_end",
+                input=fn.get("args", {}),
+                toolCallId=call_id
+            ))
+
+    def _switch_block(self, block_type: Optional[str]) -> Iterator[ResponseChunk]:
+        if self.current_block_type == block_type:
+            return
+        if self.current_block_type:
+            yield self.provider._create_end_event(self.current_block_type)
+        if block_type == "text":
+            yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
+        elif block_type == "thinking":
+            yield StreamDelta(type="stream_delta", content=ThinkingStart(type="thinking_start"))
+        self.current_block_type = block_type
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
-            response.raise_for_status()
-            data = response.json()
-            return self._map_complete_response(data, request)
+    def _on_finish(self) -> Iterator[ResponseChunk]:
+        yield from self._switch_block(None)
 
-    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
-        url = self._get_url(request, stream=True)
-        payload = self._convert_request(request)
+        yield StreamStop(
+            type="stream_stop",
+            data={
+                "finishReason": self.finish_reason,
+                "usage": self.usage.model_dump()
+            }
+        )
+
+
+class GoogleProvider(BaseProvider):
+    inline_url_images = True
+    assistant_prefill = True
+
+    def _prepare(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         headers = self._get_headers(request)
         headers['Content-Type'] = 'application/json'
+        return self._get_url(request, stream=stream), headers, self._convert_request(request)
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", url, headers=headers, json=payload, timeout=60.0) as response:
-                response.raise_for_status()
-                
-                is_first_chunk = True
-                current_block_type = None # 'text', 'thinking', 'tool_call'
-                
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    if line.startswith("data:"):
-                        data_str = line[len("data:"):].strip()
-                        if not data_str:
-                            continue
-                        
-                        try:
-                            raw_chunk = json.loads(data_str)
-                            
-                            if is_first_chunk:
-                                yield StreamStart(
-                                    type="stream_start",
-                                    data={
-                                        "model": raw_chunk.get("modelVersion", request.model),
-                                        "responseId": raw_chunk.get("responseId")
-                                    }
-                                )
-                                is_first_chunk = False
-
-                            if "candidates" in raw_chunk:
-                                for candidate in raw_chunk["candidates"]:
-                                    if "content" in candidate and "parts" in candidate["content"]:
-                                        for part in candidate["content"]["parts"]:
-                                            # 1. Text
-                                            if "text" in part and not part.get("thought"):
-                                                if current_block_type != "text":
-                                                    if current_block_type: yield self._create_end_event(current_block_type)
-                                                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
-                                                    current_block_type = "text"
-                                                yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=part["text"]))
-                                            
-                                            # 2. Thinking
-                                                if current_block_type != "thinking":
-                                                    if current_block_type: yield self._create_end_event(current_block_type)
-                                                    yield StreamDelta(type="stream_delta", content=ThinkingStart(type="thinking_start"))
-                                                    current_block_type = "thinking"
-                                                yield StreamDelta(type="stream_delta", content=ThinkingDelta(type="thinking_delta", thinking=part["text"]))
-                                            
-                                            # 3. Tool Call
-                                            elif "functionCall" in part:
-                                                if current_block_type: yield self._create_end_event(current_block_type)
-                                                
-                                                call_id = f"call_{uuid.uuid4()}"
-                                                fn = part["functionCall"]
-                                                yield StreamDelta(type="stream_delta", content=ToolCallStart(
-                                                    type="tool_call_start",
-                                                    toolCallId=call_id,
-                                                    name=fn.get("name")
-                                                ))
-                                                args_str = json.dumps(fn.get("args", {}))
-                                                yield StreamDelta(type="stream_delta", content=ToolCallDelta(
-                                                    type="tool_call_delta",
-                                                    args=args_str
-                                                ))
-                                                yield StreamDelta(type="stream_delta", content=ToolCallEnd(
-                                                    type="tool_call_end",
-                                                    input=fn.get("args", {})
-                                                ))
-                                                current_block_type = None # Reset after tool call as Gemini typically sends full call
-                            
-                            # Update usage if present
-                            if "usageMetadata" in raw_chunk:
-                                # We might want to yield StreamStop here or wait for the end
-                                pass
+    def _create_stream_parser(self, request: LLMRequest) -> StreamParser:
+        return GoogleStreamParser(self, request)
 
-                        except:
-                            continue
-                
-                if current_block_type:
-                    yield self._create_end_event(current_block_type)
-                
-                # Final usage stop chunk would be nice, but need to capture usageMetadata from last chunk
-                yield StreamStop(
-                    type="stream_stop",
-                    data={
-                        "finishReason": "stop",
-                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-                    }
-                )
+    def _probe_endpoint(self, request: LLMRequest) -> Tuple[str, Dict[str, str]]:
+        # Keep the API key out of the probe URL (it is logged and held by the keepalive task)
+        url = self._get_url(request, stream=False).split('?', 1)[0]
+        return url, {'x-goog-api-key': request.api_key}
 
     def _get_url(self, request: LLMRequest, stream: bool) -> str:
         method = 'streamGenerateContent' if stream else 'generateContent'
@@ -141,12 +155,21 @@ class GoogleProvider(BaseProvider):
             "stopSequences": request.stop,
         }
         
-        if request.reasoning:
+        budget = self._reasoning_budget(request)
+        if budget is not None:
+            if budget == 0 and "pro" in request.model:
+                budget = 128  # Pro models cannot turn thinking off; 128 is their minimum
             generation_config["thinkingConfig"] = {
-                "includeThoughts": True,
-                "thinkingBudget": request.reasoning_budget or 1024
+                "includeThoughts": bool(request.reasoning) and budget > 0,
+                "thinkingBudget": budget
             }
 
+        if request.response_format:
+            generation_config["responseMimeType"] = "application/json"
+            schema = schema_of(request.response_format)
+            if schema:
+                generation_config["responseSchema"] = to_gemini_schema(schema)
+
         payload = {
             "contents": contents,
             "generationConfig": generation_config
@@ -190,7 +213,13 @@ class GoogleProvider(BaseProvider):
             if isinstance(m.content, str):
                 parts.append({"text": m.content})
             elif isinstance(m.content, list):
+                signature = None
                 for block in m.content:
+                    start = len(parts)
+                    if block.type == 'thinking':
+                        # Thought text is not resent; its signature goes on the next part
+                        signature = block.signature or signature
+                        continue
                     if block.type == 'text':
                         parts.append({"text": block.text})
                     elif block.type == 'image':
@@ -203,8 +232,8 @@ class GoogleProvider(BaseProvider):
                                 }
                             })
                         elif source.type == 'url':
-                            # Gemini handles fileUri for GCS or similar, 
-                            # but for public URLs we might need inlineData or similar if backend supports it.
+                            # Gemini only resolves fileUri for GCS, so public URLs are
+                            # inlined as base64 by _inline_url_images before conversion.
                             pass
                     elif block.type == 'tool_use':
                         parts.append({
@@ -220,11 +249,30 @@ class GoogleProvider(BaseProvider):
                                 "response": { "result": block.content }
                             }
                         })
+                    if signature and len(parts) > start:
+                        parts[start]["thoughtSignature"] = signature
+                        signature = None
+                if signature and role == "model":
+                    parts.append({"text": "", "thoughtSignature": signature})
             
             if parts:
                 contents.append({"role": role, "parts": parts})
         return contents
 
+    def _map_usage(self, usage_md: Dict[str, Any]) -> Usage:
+        # Gemini reports thoughts separately from candidates; both are billed as output,
+        # so fold them into completionTokens like OpenAI's reasoning tokens
+        prompt_tokens = usage_md.get('promptTokenCount', 0)
+        thoughts = usage_md.get('thoughtsTokenCount', 0)
+        completion_tokens = usage_md.get('candidatesTokenCount', 0) + thoughts
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=usage_md.get('totalTokenCount') or prompt_tokens + completion_tokens,
+            reasoning_tokens=thoughts,
+            cache_read_tokens=usage_md.get('cachedContentTokenCount', 0)
+        )
+
     def _map_complete_response(self, data: Dict[str, Any], request: LLMRequest) -> LLMResponse:
         content_blocks = []
         candidates = data.get('candidates', [])
@@ -235,10 +283,13 @@ class GoogleProvider(BaseProvider):
             finish_reason = candidate.get('finishReason', 'stop')
             parts = candidate.get('content', {}).get('parts', [])
             for p in parts:
-                if "text" in p and not p.get("thought"):
+                if p.get("thought"):
+                    content_blocks.append({"type": "thinking", "thinking": p.get("text", ""), "signature": p.get("thoughtSignature")})
+                    continue
+                if p.get("thoughtSignature"):
+                    content_blocks.append({"type": "thinking", "thinking": "", "signature": p["thoughtSignature"]})
+                if p.get("text"):
                     content_blocks.append({"type": "text", "text": p["text"]})
-                elif p.get("thought"):
-                    content_blocks.append({"type": "thinking", "thinking": p["text"]})
                 elif "functionCall" in p:
                     fn = p["functionCall"]
                     content_blocks.append({
@@ -248,19 +299,11 @@ class GoogleProvider(BaseProvider):
                         "input": fn.get("args")
                     })
         
-        usage_md = data.get('usageMetadata', {})
-        usage = Usage(
-            prompt_tokens=usage_md.get('promptTokenCount', 0),
-            completion_tokens=usage_md.get('candidatesTokenCount', 0),
-            total_tokens=usage_md.get('totalTokenCount', 0),
-            reasoning_tokens=usage_md.get('thoughtsTokenCount', 0)
-        )
-
         return LLMResponse(
             id=data.get('responseId', 'unknown'),
             model=data.get('modelVersion', request.model),
-            created=0,
-            usage=usage,
+            created=int(time.time()),
+            usage=self._map_usage(data.get('usageMetadata', {})),
             choices=[Choice(
                 index=0,
                 message=InputMessage(
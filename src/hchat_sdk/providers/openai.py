@@ -1,18 +1,100 @@
 import json
-import uuid
-from typing import AsyncGenerator, Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
-import httpx
-
-from .base import BaseProvider
-from ..types.request import LLMRequest, ContentBlock, InputMessage, MessageRole
+from .base import BaseProvider, StreamParser, ToolCallAssembler
+from ..types.content import TextContent, ToolUseContent
+from ..types.request import LLMRequest, InputMessage, MessageRole
 from ..types.response import (
     LLMResponse, ResponseChunk, StreamDelta, StreamStart, StreamStop,
-    TextStart, TextDelta, TextEnd, ToolCallStart, ToolCallDelta, ToolCallEnd,
+    TextStart, TextDelta, TextEnd,
     Choice, Usage, ThinkingDelta
 )
 
 
+class OpenAIStreamParser(StreamParser):
+    def __init__(self, provider: "OpenAIProvider", request: LLMRequest):
+        super().__init__(request)
+        self.provider = provider
+        self.is_first_chunk = True
+        self.in_text = False
+        self.tool_calls = ToolCallAssembler()
+        self.final_usage = None
+        self.final_finish_reason = "unknown"
+
+    def _on_data(self, data_str: str) -> Iterator[ResponseChunk]:
+        if data_str == "[DONE]":
+            self.done = True
+            return
+
+        try:
+            raw_chunk = json.loads(data_str)
+        except json.JSONDecodeError:
+            return
+
+        # The trailing usage chunk carries an empty choices list
+        choice = (raw_chunk.get("choices") or [{}])[0]
+
+        if self.is_first_chunk:
+            delta = choice.get("delta", {})
+            if delta.get("role"):
+                yield StreamStart(
+                    type="stream_start",
+                    data={
+                        "model": raw_chunk.get("model", self.request.model),
+                        "responseId": raw_chunk.get("id")
+                    }
+                )
+                self.is_first_chunk = False
+
+        if not choice:
+            if "usage" in raw_chunk:
+                u = raw_chunk["usage"]
+                self.final_usage = Usage(
+                    prompt_tokens=u.get("prompt_tokens", 0),
+                    completion_tokens=u.get("completion_tokens", 0),
+                    total_tokens=u.get("total_tokens", 0),
+                    cache_read_tokens=(u.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                )
+            return
+
+        delta = choice.get("delta", {})
+
+        # 1. Text Content
+        if "content" in delta and delta["content"]:
+            if not self.in_text:
+                yield from self.tool_calls.close()
+                yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
+                self.in_text = True
+
+            yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=delta["content"]))
+
+        # 2. Tool Calls (parallel calls may interleave by index)
+        if delta.get("tool_calls"):
+            if self.in_text:
+                yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
+                self.in_text = False
+            yield from self.tool_calls.feed(delta["tool_calls"])
+
+        if choice.get("finish_reason"):
+            self.final_finish_reason = choice["finish_reason"]
+            # Arguments are complete; don't hold the calls until the trailing usage chunk
+            yield from self.tool_calls.close()
+
+    def _on_finish(self) -> Iterator[ResponseChunk]:
+        # Cleanup
+        if self.in_text:
+            yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
+        yield from self.tool_calls.close()
+
+        yield StreamStop(
+            type="stream_stop",
+            data={
+                "finishReason": self.final_finish_reason,
+                "usage": self.final_usage.model_dump() if self.final_usage else {"promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
+            }
+        )
+
+
 class OpenAIProvider(BaseProvider):
     """
     Standard OpenAI Provider
@@ -21,158 +103,18 @@ class OpenAIProvider(BaseProvider):
     - Uses chat/completions endpoint
     """
 
-    async def complete(self, request: LLMRequest) -> LLMResponse:
-        url = self._build_url(request)
-        payload = self._convert_request(request, stream=False)
-        headers = self._get_headers(request)
-        headers["Authorization"] = f"Bearer {request.api_key}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=60.0)
-            if not response.is_success:
-                 response.raise_for_status()
-            
-            data = response.json()
-            return self._map_complete_response(data)
-
-    async def stream(self, request: LLMRequest) -> AsyncGenerator[ResponseChunk, None]:
-        url = self._build_url(request)
-        payload = self._convert_request(request, stream=True)
+    def _prepare(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         headers = self._get_headers(request)
         headers["Authorization"] = f"Bearer {request.api_key}"
+        return self._build_url(request), headers, self._convert_request(request, stream=stream)
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", url, headers=headers, json=payload, timeout=60.0) as response:
-                response.raise_for_status()
-
-                is_first_chunk = True
-                current_block_type = None
-                current_tool_index = -1
-                current_tool_args_buffer = ""
-                current_tool_id = ""
-                current_tool_name = ""
-                final_usage = None
-                final_finish_reason = "unknown"
-
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    if line.startswith("data:"):
-                        data_str = line[len("data:"):].strip()
-                        if data_str == "[DONE]":
-                            break
-                        
-                        try:
-                            raw_chunk = json.loads(data_str)
-                            
-                            if is_first_chunk:
-                                choice = raw_chunk.get("choices", [{}])[0]
-                                delta = choice.get("delta", {})
-                                if delta.get("role"):
-                                    yield StreamStart(
-                                        type="stream_start",
-                                        data={
-                                            "model": raw_chunk.get("model", request.model),
-                                            "responseId": raw_chunk.get("id")
-                                        }
-                                    )
-                                    is_first_chunk = False
-
-                            choice = raw_chunk.get("choices", [{}])[0]
-                            if not choice:
-                                if "usage" in raw_chunk:
-                                    u = raw_chunk["usage"]
-                                    final_usage = Usage(
-                                        prompt_tokens=u.get("prompt_tokens", 0),
-                                        completion_tokens=u.get("completion_tokens", 0),
-                                        total_tokens=u.get("total_tokens", 0)
-                                    )
-                                continue
-
-                            delta = choice.get("delta", {})
-                            
-                            # 1. Text Content
-                            if "content" in delta and delta["content"]:
-                                content = delta["content"]
-                                if current_block_type != "text":
-                                    if current_block_type == "tool_call":
-                                        yield self._create_tool_end_event(current_tool_args_buffer)
-                                    
-                                    yield StreamDelta(type="stream_delta", content=TextStart(type="text_start"))
-                                    current_block_type = "text"
-                                
-                                yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=content))
-
-                            # 2. Tool Calls
-                            if "tool_calls" in delta:
-                                for tc in delta["tool_calls"]:
-                                    index = tc.get("index", 0)
-                                    
-                                    if current_block_type != "tool_call" or index != current_tool_index:
-                                        if current_block_type == "tool_call":
-                                            yield self._create_tool_end_event(current_tool_args_buffer)
-                                        
-                                        current_block_type = "tool_call"
-                                        current_tool_index = index
-                                        current_tool_args_buffer = ""
-                                        current_tool_id = tc.get("id") or f"call_{uuid.uuid4()}"
-                                        current_tool_name = tc.get("function", {}).get("name", "")
-                                        
-                                        yield StreamDelta(
-                                            type="stream_delta",
-                                            content=ToolCallStart(
-                                                type="tool_call_start",
-                                                toolCallId=current_tool_id,
-                                                name=current_tool_name
-                                            )
-                                        )
-                                    else:
-                                        if "id" in tc and not current_tool_id:
-                                            current_tool_id = tc["id"]
-                                        if "function" in tc and "name" in tc["function"] and not current_tool_name:
-                                            current_tool_name = tc["function"]["name"]
-
-                                    if "function" in tc and "arguments" in tc["function"]:
-                                        args_delta = tc["function"]["arguments"]
-                                        current_tool_args_buffer += args_delta
-                                        yield StreamDelta(
-                                            type="stream_delta",
-                                            content=ToolCallDelta(type="tool_call_delta", args=args_delta)
-                                        )
-
-                            if choice.get("finish_reason"):
-                                final_finish_reason = choice["finish_reason"]
-
-                        except json.JSONDecodeError:
-                            continue
-
-                # Cleanup
-                if current_block_type == "text":
-                    yield StreamDelta(type="stream_delta", content=TextEnd(type="text_end"))
-                elif current_block_type == "tool_call":
-                    yield self._create_tool_end_event(current_tool_args_buffer)
-
-                yield StreamStop(
-                    type="stream_stop",
-                    data={
-                        "finishReason": final_finish_reason,
-                        "usage": final_usage.model_dump() if final_usage else {"promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
-                    }
-                )
+    def _create_stream_parser(self, request: LLMRequest) -> StreamParser:
+        return OpenAIStreamParser(self, request)
 
     def _build_url(self, request: LLMRequest) -> str:
         api_base = request.api_base.rstrip("/") + "/"
         return f"{api_base}chat/completions"
 
-    def _create_tool_end_event(self, args_buffer: str) -> StreamDelta:
-        input_data = {}
-        try:
-            if args_buffer:
-                input_data = json.loads(args_buffer)
-        except Exception:
-            pass
-        return StreamDelta(type="stream_delta", content=ToolCallEnd(type="tool_call_end", input=input_data))
-
     def _convert_request(self, request: LLMRequest, stream: bool) -> Dict[str, Any]:
         messages = self._convert_messages(request.messages)
         
@@ -188,6 +130,7 @@ class OpenAIProvider(BaseProvider):
             "temperature": request.temperature,
             "top_p": request.top_p,
             "stop": request.stop,
+            "reasoning_effort": self._reasoning_effort(request),
         }
 
         # Tools
@@ -212,6 +155,10 @@ class OpenAIProvider(BaseProvider):
             if mapped_tools:
                 payload["tools"] = mapped_tools
 
+        # Structured output (normalized to the OpenAI shape by the client)
+        if request.response_format:
+            payload["response_format"] = request.response_format
+
         return {k: v for k, v in payload.items() if v is not None}
 
     def _convert_messages(self, messages: List[InputMessage]) -> List[Dict[str, Any]]:
@@ -236,12 +183,13 @@ class OpenAIProvider(BaseProvider):
                 result.append({"role": msg.role, "content": content})
         return result
 
-    def _map_complete_response(self, data: Dict[str, Any]) -> LLMResponse:
+    def _map_complete_response(self, data: Dict[str, Any], request: LLMRequest) -> LLMResponse:
         usage_data = data.get("usage", {})
         usage = Usage(
             prompt_tokens=usage_data.get("prompt_tokens", 0),
             completion_tokens=usage_data.get("completion_tokens", 0),
-            total_tokens=usage_data.get("total_tokens", 0)
+            total_tokens=usage_data.get("total_tokens", 0),
+            cache_read_tokens=(usage_data.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
         )
 
         choices = []
@@ -253,15 +201,14 @@ class OpenAIProvider(BaseProvider):
             if tool_calls:
                 blocks = []
                 if content:
-                    blocks.append(ContentBlock(type="text", text=content))
+                    blocks.append(TextContent(text=content))
                 for tc in tool_calls:
                     fn = tc.get("function", {})
                     try:
                         args = json.loads(fn.get("arguments", "{}"))
                     except:
                         args = {}
-                    blocks.append(ContentBlock(
-                        type="tool_use",
+                    blocks.append(ToolUseContent(
                         id=tc.get("id"),
                         name=fn.get("name"),
                         input=args
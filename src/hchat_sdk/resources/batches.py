@@ -0,0 +1,302 @@
+"""
+Native provider batch endpoints (Anthropic Message Batches, OpenAI / Azure Batch API).
+
+    job = await client.batches.create([
+        {"id": "q1", "model": "claude-sonnet-4-5", "input": "Summarize ...", "max_tokens": 512},
+        {"id": "q2", "model": "claude-sonnet-4-5", "input": "Translate ...", "max_tokens": 512},
+    ])
+    job = await client.batches.wait(job)                 # polls with exponential backoff
+    async for result in client.batches.results(job, path="results.jsonl"):
+        print(result.custom_id, result.status, result.response)
+
+Records have the same shape as `hchat_sdk.batch` input lines. Each one is converted by the
+provider that would send it through `messages.complete`, and the whole set is submitted as
+one provider job. The provider processes the job asynchronously (usually within 24 h and
+at a discount), so use this API for offline work that does not need an answer right away.
+Result files are streamed to disk before they are parsed, so large batches never sit in memory.
+
+A batch goes to one provider. OpenAI and Azure also require one model per batch.
+Google models and `response_format` are not supported.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from ..types.request import LLMRequest
+from ..types.response import LLMResponse
+
+if TYPE_CHECKING:
+    from .messages import Messages
+
+
+class BatchJob(BaseModel):
+    id: str
+    provider: str
+    model: str  # model of the first request
+    url: str  # the batch resource: GET to poll, POST {url}/cancel to cancel
+    status: str  # provider status (Anthropic processing_status, OpenAI batch status)
+    done: bool = False
+    request_counts: Dict[str, int] = {}
+    result_urls: List[str] = []  # result files, set once the job is done
+
+
+class BatchResult(BaseModel):
+    custom_id: str
+    status: str  # succeeded | errored | canceled | expired
+    response: Optional[LLMResponse] = None
+    error: Optional[Any] = None
+
+
+class _AnthropicBatches:
+    """POST {messages_url}/batches with inline requests; results are one JSONL file."""
+    single_model = False
+
+    def batches_url(self, url: str) -> str:
+        return f"{url}/batches"
+
+    async def submit(
+        self, http_client: httpx.AsyncClient, batches_url: str, headers: Dict[str, str],
+        items: List[Tuple[str, Dict[str, Any]]], completion_window: str
+    ) -> Dict[str, Any]:
+        body = {"requests": [{"custom_id": custom_id, "params": payload} for custom_id, payload in items]}
+        response = await http_client.post(batches_url, headers=headers, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def state(self, data: Dict[str, Any], url: str) -> Tuple[str, bool, Dict[str, int], List[str]]:
+        status = data.get("processing_status", "in_progress")
+        done = status == "ended"
+        results = [str(httpx.URL(url + "/").join(data.get("results_url") or "results"))] if done else []
+        return status, done, data.get("request_counts") or {}, results
+
+    def parse(self, line: Dict[str, Any]) -> Tuple[str, str, Optional[Dict[str, Any]], Any]:
+        result = line.get("result") or {}
+        return line["custom_id"], result.get("type", "errored"), result.get("message"), result.get("error")
+
+
+class _OpenAIBatches:
+    """Upload a JSONL file, POST /batches; results are an output file and an error file."""
+    single_model = True
+    endpoint = "/v1/chat/completions"
+
+    def api_url(self, url: str) -> str:
+        return url.rsplit("/chat/completions", 1)[0]
+
+    def batches_url(self, url: str) -> str:
+        return f"{self.api_url(url)}/batches"
+
+    async def submit(
+        self, http_client: httpx.AsyncClient, batches_url: str, headers: Dict[str, str],
+        items: List[Tuple[str, Dict[str, Any]]], completion_window: str
+    ) -> Dict[str, Any]:
+        api_url = batches_url.rsplit("/batches", 1)[0]
+        lines = b"".join(
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": self.endpoint, "body": payload},
+                       ensure_ascii=False).encode() + b"\n"
+            for custom_id, payload in items
+        )
+        # httpx sets the multipart Content-Type
+        upload_headers = {k: v for k, v in headers.items() if k.lower() != "content-type"}
+        response = await http_client.post(
+            f"{api_url}/files", headers=upload_headers,
+            data={"purpose": "batch"}, files={"file": ("batch.jsonl", lines, "application/jsonl")}
+        )
+        response.raise_for_status()
+        body = {"input_file_id": response.json()["id"], "endpoint": self.endpoint, "completion_window": completion_window}
+        response = await http_client.post(batches_url, headers=headers, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def state(self, data: Dict[str, Any], url: str) -> Tuple[str, bool, Dict[str, int], List[str]]:
+        status = data.get("status", "validating")
+        done = status in ("completed", "failed", "expired", "cancelled")
+        api_url = url.rsplit("/batches/", 1)[0]
+        results = [
+            f"{api_url}/files/{file_id}/content"
+            for file_id in (data.get("output_file_id"), data.get("error_file_id")) if file_id
+        ] if done else []
+        return status, done, data.get("request_counts") or {}, results
+
+    def parse(self, line: Dict[str, Any]) -> Tuple[str, str, Optional[Dict[str, Any]], Any]:
+        response = line.get("response") or {}
+        body = response.get("body")
+        if line.get("error") or response.get("status_code", 200) >= 400:
+            return line["custom_id"], "errored", None, line.get("error") or (body or {}).get("error")
+        return line["custom_id"], "succeeded", body, None
+
+
+class _AzureBatches(_OpenAIBatches):
+    """Azure OpenAI: the same protocol under {api_base}/openai, addressed by deployment name."""
+    endpoint = "/chat/completions"
+
+    def api_url(self, url: str) -> str:
+        return url.split("/deployments/", 1)[0]
+
+
+_BATCH_APIS = {
+    'anthropic': _AnthropicBatches(),
+    'openai': _OpenAIBatches(),
+    'azure': _AzureBatches(),
+    'hchat': _AzureBatches(),
+}
+
+
+def _batch_api(provider_name: str):
+    if provider_name not in _BATCH_APIS:
+        raise ValueError(f"Native batches are not supported for provider: {provider_name}")
+    return _BATCH_APIS[provider_name]
+
+
+class Batches:
+    """Submit, poll and collect native provider batch jobs; see the module docstring."""
+
+    def __init__(self, messages: "Messages", http_client: httpx.AsyncClient):
+        self.messages = messages
+        self.http_client = http_client
+
+    def _probe(self, provider_name: str, model: str) -> LLMRequest:
+        return LLMRequest(
+            api_key=self.messages.api_key, api_base=self.messages.api_base,
+            provider=provider_name, model=model, messages=[]
+        )
+
+    def _endpoint(self, job: BatchJob) -> Tuple[str, Dict[str, str]]:
+        provider = self.messages._get_provider_instance(job.provider)
+        url, headers, _ = provider._prepare(self._probe(job.provider, job.model), stream=False)
+        return url, headers
+
+    def _job(self, provider_name: str, model: str, url: str, data: Dict[str, Any]) -> BatchJob:
+        status, done, counts, result_urls = _batch_api(provider_name).state(data, url)
+        return BatchJob(
+            id=data["id"], provider=provider_name, model=model, url=url,
+            status=status, done=done, request_counts=counts, result_urls=result_urls
+        )
+
+    async def create(
+        self, requests: Iterable[Dict[str, Any]], model: Optional[str] = None, completion_window: str = "24h"
+    ) -> BatchJob:
+        """
+        Submit `requests` (records with `id`, `model`, `messages` or `input`, and config keys)
+        as one provider batch job. `model` is the default for records without one.
+        """
+        from ..batch import _RECORD_KEYS  # hchat_sdk.batch imports the client, which imports this module
+
+        items: List[Tuple[str, Dict[str, Any]]] = []
+        first: Optional[LLMRequest] = None
+        for n, record in enumerate(requests):
+            custom_id = str(record.get("id", n))
+            record_model = record.get("model", model)
+            input = record.get("messages", record.get("input"))
+            if record_model is None or input is None:
+                raise ValueError(f"request {custom_id!r} needs a model and 'messages' or 'input'")
+            api = _batch_api(self.messages._provider_for(record_model))
+            config = {k: v for k, v in record.items() if k not in _RECORD_KEYS}
+            provider, request, cfg = self.messages._build_request(record_model, input, config, stream=False)
+            request = self.messages._check_context_window(request, cfg)
+            if request.response_format is not None:
+                raise ValueError("response_format is not supported in batches")
+            if first is None:
+                first = request
+            elif request.provider != first.provider or (api.single_model and request.model != first.model):
+                raise ValueError(
+                    f"A batch goes to one provider{' and model' if api.single_model else ''}; "
+                    f"got {first.provider}/{first.model} and {request.provider}/{request.model}"
+                )
+            if provider.inline_url_images:
+                request = await provider._inline_url_images(request)
+            _, _, payload = provider._prepare(request, stream=False)
+            payload.pop("stream", None)
+            payload.setdefault("model", request.model)  # Azure payloads address the deployment by URL
+            items.append((custom_id, payload))
+        if first is None:
+            raise ValueError("A batch needs at least one request")
+
+        api = _batch_api(first.provider)
+        url, headers, _ = self.messages._get_provider_instance(first.provider)._prepare(first, stream=False)
+        batches_url = api.batches_url(url)
+        data = await api.submit(self.http_client, batches_url, headers, items, completion_window)
+        return self._job(first.provider, first.model, f"{batches_url}/{data['id']}", data)
+
+    async def retrieve(self, job: BatchJob) -> BatchJob:
+        """Fetch the current status of `job`."""
+        _, headers = self._endpoint(job)
+        response = await self.http_client.get(job.url, headers=headers)
+        response.raise_for_status()
+        return self._job(job.provider, job.model, job.url, response.json())
+
+    async def cancel(self, job: BatchJob) -> BatchJob:
+        """Ask the provider to stop `job`; requests already processed keep their results."""
+        _, headers = self._endpoint(job)
+        response = await self.http_client.post(f"{job.url}/cancel", headers=headers)
+        response.raise_for_status()
+        return self._job(job.provider, job.model, job.url, response.json())
+
+    async def wait(
+        self,
+        job: BatchJob,
+        poll_interval: float = 10.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        timeout: Optional[float] = None
+    ) -> BatchJob:
+        """
+        Poll until `job` is done. The delay starts at `poll_interval` and is multiplied by
+        `backoff` after each poll, up to `max_interval`. Raises TimeoutError after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = poll_interval
+        while not job.done:
+            if deadline is not None and time.monotonic() + interval > deadline:
+                raise TimeoutError(f"Batch {job.id} is still {job.status!r} after {timeout:.0f}s")
+            await asyncio.sleep(interval)
+            interval = min(interval * backoff, max_interval)
+            job = await self.retrieve(job)
+        return job
+
+    async def download(self, job: BatchJob, path: str) -> str:
+        """Stream the result files of a finished `job` to `path` as provider JSONL."""
+        if not job.done:
+            raise ValueError(f"Batch {job.id} has not finished (status {job.status!r})")
+        _, headers = self._endpoint(job)
+        with open(path, "wb") as f:
+            for url in job.result_urls:
+                last = b"\n"
+                async with self.http_client.stream("GET", url, headers=headers) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+                        last = chunk[-1:] or last
+                if last != b"\n":
+                    f.write(b"\n")  # keep the next file's first record on its own line
+        return path
+
+    async def results(self, job: BatchJob, path: Optional[str] = None) -> AsyncIterator[BatchResult]:
+        """
+        Download the results of a finished `job` (to `path`, or a temporary file that is removed
+        afterwards) and yield them one by one, in file order, mapped to `LLMResponse`.
+        """
+        keep = path is not None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="hchat-batch-", suffix=".jsonl")
+            os.close(fd)
+        try:
+            await self.download(job, path)
+            api = _batch_api(job.provider)
+            provider = self.messages._get_provider_instance(job.provider)
+            request = self._probe(job.provider, job.model)
+            with open(path, "rb") as f:
+                for raw in f:
+                    if not raw.strip():
+                        continue
+                    custom_id, status, body, error = api.parse(json.loads(raw))
+                    response = provider._map_complete_response(body, request) if body is not None else None
+                    yield BatchResult(custom_id=custom_id, status=status, response=response, error=error)
+        finally:
+            if not keep:
+                os.remove(path)
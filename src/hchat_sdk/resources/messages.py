@@ -1,93 +1,523 @@
-from typing import Union, List, Optional, AsyncGenerator, Dict, Any
+from typing import (
+    TYPE_CHECKING, Union, List, Optional, AsyncGenerator, AsyncIterator, Awaitable, Iterator, Dict, Any, Tuple, Type
+)
+import importlib
+from abc import ABC, abstractmethod
+from contextlib import aclosing
+import httpx
+
 from ..types.request import InputMessage, LLMRequest, HChatConfig, MessageRole
-from ..types.response import LLMResponse, ResponseChunk
-from ..capabilities import get_provider_for_model
-from ..providers.base import BaseProvider
-from ..providers.openai import OpenAIProvider
-from ..providers.anthropic import AnthropicProvider
-from ..providers.google import GoogleProvider
-from ..providers.azure import AzureProvider
-
-class Messages:
-    def __init__(self, api_key: str, api_base: str):
+from ..types.response import LLMResponse, ResponseChunk, Usage
+from ..capabilities import ModelCapability, get_provider_for_model, get_model_capability
+from ..errors import ContextWindowExceededError
+
+# Feature modules are imported where they are used, so creating a client only loads what it needs
+if TYPE_CHECKING:
+    from ..cascade import CascadeResult, Validator
+    from ..catalog import ModelCatalog
+    from ..compression import RequestCompression
+    from ..concurrency import ConcurrencyController
+    from ..context import ContextStrategy
+    from ..images import ImageFetcher
+    from ..metrics import MetricsRecorder
+    from ..multiplex import StreamMultiplexer
+    from ..providers.base import BaseProvider
+    from ..scheduler import RequestScheduler
+    from ..singleflight import SingleFlight
+    from ..streaming import MessageStream, SyncMessageStream
+    from ..structured import ResponseFormat, StructuredChunk, StructuredResponse
+    from ..usage import UsageTracker
+
+# provider name -> (module, class); modules are imported on first use so a process
+# that only talks to one provider never loads the others
+_PROVIDER_CLASSES: Dict[str, Tuple[str, str]] = {
+    'openai': ('openai', 'OpenAIProvider'),
+    'anthropic': ('anthropic', 'AnthropicProvider'),
+    'google': ('google', 'GoogleProvider'),
+    'azure': ('azure', 'AzureProvider'),
+    # Mapping hchat provider to Azure logic (deployment endpoint)
+    'hchat': ('azure', 'AzureProvider'),
+}
+
+
+def _load_provider_class(provider_name: str) -> Type["BaseProvider"]:
+    if provider_name not in _PROVIDER_CLASSES:
+        raise ValueError(f"Unsupported provider: {provider_name}")
+    module_name, class_name = _PROVIDER_CLASSES[provider_name]
+    module = importlib.import_module(f"..providers.{module_name}", __package__)
+    return getattr(module, class_name)
+
+class BaseMessages(ABC):
+    """Request building and provider routing shared by the async and sync clients."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: str,
+        context_strategy: Optional[Union["ContextStrategy", List["ContextStrategy"]]] = None,
+        usage_tracker: Optional["UsageTracker"] = None,
+        metrics: Optional["MetricsRecorder"] = None,
+        compression: Optional["RequestCompression"] = None,
+        catalog: Optional["ModelCatalog"] = None
+    ):
         self.api_key = api_key
         self.api_base = api_base
-        self._providers: Dict[str, BaseProvider] = {}
+        self.context_strategy = context_strategy
+        # Remote model catalog; once loaded it replaces the static registry for this client
+        self.catalog = catalog
+        # gzip/zstd request bodies above a size threshold; None sends plain JSON
+        self.compression = compression
+        # Cost accounting and budget guards; None records nothing
+        self.usage_tracker = usage_tracker
+        # Latency histograms (TTFT, inter-token, throughput) per (provider, model)
+        self.metrics = metrics
+        self._providers: Dict[str, "BaseProvider"] = {}
+
+    @abstractmethod
+    def _new_provider(self, provider_cls: Type["BaseProvider"]) -> "BaseProvider":
+        pass
+
+    def _capability(self, model: str) -> Optional[ModelCapability]:
+        return get_model_capability(model, self.catalog.index if self.catalog is not None else None)
 
-    def _get_provider_instance(self, provider_name: str) -> BaseProvider:
+    def _provider_for(self, model: str) -> str:
+        return get_provider_for_model(model, self.catalog.index if self.catalog is not None else None)
+
+    def _get_provider_instance(self, provider_name: str) -> "BaseProvider":
         if provider_name in self._providers:
             return self._providers[provider_name]
-            
-        if provider_name == 'openai':
-            instance = OpenAIProvider()
-        elif provider_name == 'anthropic':
-            instance = AnthropicProvider()
-        elif provider_name == 'google':
-            instance = GoogleProvider()
-        elif provider_name == 'azure':
-            instance = AzureProvider()
-        elif provider_name == 'hchat':
-            # Mapping hchat provider to Azure logic (deployment endpoint)
-            instance = AzureProvider()
-        else:
-            raise ValueError(f"Unsupported provider: {provider_name}")
-            
+
+        instance = self._new_provider(_load_provider_class(provider_name))
         self._providers[provider_name] = instance
         return instance
 
     def _normalize_input(self, input_data: Union[str, List[InputMessage]]) -> List[InputMessage]:
         if isinstance(input_data, str):
-            from ..types.request import InputMessage, MessageRole # Import here to avoid circular or just use available
             return [InputMessage(role=MessageRole.USER, content=input_data)]
         return input_data
 
-    async def complete(self, model: str, input: Union[str, List[InputMessage]], **config) -> LLMResponse:
+    def _build_request(
+        self, model: str, input: Union[str, List[InputMessage]], config: Dict[str, Any], stream: bool
+    ) -> Tuple["BaseProvider", LLMRequest, HChatConfig]:
         messages = self._normalize_input(input)
-        provider_name = get_provider_for_model(model)
+        if self.catalog is not None:
+            self.catalog.revalidate()  # background refresh when stale; routing uses the current copy
+        if self.usage_tracker is not None:
+            # Budgets may reject the request or swap in a cheaper model before routing
+            model = self.usage_tracker.admit(model, config.get('tenant'), config.get('tag'))
+        provider_name = self._provider_for(model)
         provider = self._get_provider_instance(provider_name)
-        
+
         cfg = HChatConfig(**config)
-        
+        reasoning, reasoning_effort, reasoning_budget = self._resolve_reasoning(model, cfg)
+        response_format = None
+        if cfg.response_format is not None:
+            from ..structured import normalize_response_format
+            response_format = normalize_response_format(cfg.response_format)
+
         request = LLMRequest(
             api_key=self.api_key,
             api_base=self.api_base,
             provider=provider_name,
             model=model,
             messages=messages,
-            stream=False,
+            stream=stream,
             max_tokens=cfg.max_tokens,
             temperature=cfg.temperature,
             top_p=cfg.top_p,
             top_k=cfg.top_k,
             stop=cfg.stop,
             tools=cfg.tools,
-            system=cfg.system
+            system=cfg.system,
+            reasoning=reasoning,
+            reasoning_effort=reasoning_effort,
+            reasoning_budget=reasoning_budget,
+            response_format=response_format,
+            prompt_caching=cfg.prompt_caching
         )
-        
-        return await provider.complete(request)
+        return provider, request, cfg
 
-    async def stream(self, model: str, input: Union[str, List[InputMessage]], **config) -> AsyncGenerator[ResponseChunk, None]:
-        messages = self._normalize_input(input)
-        provider_name = get_provider_for_model(model)
-        provider = self._get_provider_instance(provider_name)
-        
-        cfg = HChatConfig(**config)
-        
-        request = LLMRequest(
-            api_key=self.api_key,
-            api_base=self.api_base,
-            provider=provider_name,
-            model=model,
-            messages=messages,
-            stream=True,
-            max_tokens=cfg.max_tokens,
-            temperature=cfg.temperature,
-            top_p=cfg.top_p,
-            top_k=cfg.top_k,
-            stop=cfg.stop,
-            tools=cfg.tools,
-            system=cfg.system
+    def _resolve_reasoning(self, model: str, cfg: HChatConfig) -> Tuple[Optional[bool], Optional[str], Optional[int]]:
+        """(reasoning, effort, budget) for the request; None fields leave the provider default."""
+        cap = self._capability(model)
+        if cap is not None and not cap.reasoning:
+            return None, None, None  # the model rejects reasoning parameters
+        enabled, effort, budget = cfg.reasoning, cfg.reasoning_effort, cfg.reasoning_budget
+        if enabled is None and effort is None and budget is None:
+            # Registry default: tunes cost/latency without asking for visible thinking
+            effort = cap.default_reasoning_effort if cap else None
+            return None, effort, None
+        if enabled is False:
+            return False, 'minimal', 0
+        if enabled is None:
+            enabled = budget > 0 if budget is not None else effort != 'minimal'
+        return enabled, effort, budget
+
+    def _check_context_window(self, request: LLMRequest, cfg: HChatConfig) -> LLMRequest:
+        """
+        Reject or trim a request whose estimated prompt exceeds the context window, per
+        `cfg.context_overflow`. Runs on the final history, after any context strategy.
+        """
+        mode = cfg.context_overflow
+        cap = self._capability(request.model) if mode else None
+        if cap is None:
+            return request
+        limit = cap.context_window - (request.max_tokens or cap.max_tokens)
+
+        from ..context import trim_to_budget
+        from ..tokens import get_token_counter
+
+        counter = get_token_counter(request.model)
+        fixed = counter.count_messages([], system=request.system, tools=request.tools)
+        total = fixed + sum(counter.count_message_tokens(request.messages))
+        if total <= limit:
+            return request
+        if mode == 'error':
+            raise ContextWindowExceededError(request.model, total, limit)
+
+        trimmed, kept_tokens = trim_to_budget(request.messages, request.model, limit - fixed)
+        if fixed + kept_tokens > limit:
+            raise ContextWindowExceededError(request.model, fixed + kept_tokens, limit)
+        return request.model_copy(update={"messages": trimmed})
+
+    def _record_usage(self, request: LLMRequest, cfg: HChatConfig, usage: Optional[Usage]) -> None:
+        if self.usage_tracker is not None and usage is not None:
+            self.usage_tracker.record(request.model, usage, cfg.tenant, cfg.tag, self._capability(request.model))
+
+    def _record_stream_usage(self, request: LLMRequest, cfg: HChatConfig, chunk: ResponseChunk) -> None:
+        if self.usage_tracker is not None and chunk.type == 'stream_stop' and chunk.data.get('usage'):
+            self._record_usage(request, cfg, Usage.model_validate(chunk.data['usage']))
+
+    def _context_strategies(self, cfg: HChatConfig) -> List["ContextStrategy"]:
+        # An explicit context_strategy=None disables the client-wide default for this call
+        strategy = cfg.context_strategy if 'context_strategy' in cfg.model_fields_set else self.context_strategy
+        if not strategy:
+            return []
+        return list(strategy) if isinstance(strategy, (list, tuple)) else [strategy]
+
+
+class Messages(BaseMessages):
+    def __init__(
+        self,
+        api_key: str,
+        api_base: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        context_strategy: Optional[Union["ContextStrategy", List["ContextStrategy"]]] = None,
+        coalesce: bool = False,
+        concurrency_controller: Optional["ConcurrencyController"] = None,
+        scheduler: Optional["RequestScheduler"] = None,
+        usage_tracker: Optional["UsageTracker"] = None,
+        metrics: Optional["MetricsRecorder"] = None,
+        compression: Optional["RequestCompression"] = None,
+        catalog: Optional["ModelCatalog"] = None
+    ):
+        super().__init__(api_key, api_base, context_strategy, usage_tracker, metrics, compression, catalog)
+        self.http_client = http_client or httpx.AsyncClient(timeout=60.0)
+        self._image_fetcher: Optional["ImageFetcher"] = None
+        # Single-flight: identical concurrent requests share one upstream call
+        self.coalesce = coalesce
+        self._single_flight: Optional["SingleFlight"] = None
+        # Adaptive per-(provider, model) in-flight limits; None sends everything immediately
+        self.concurrency_controller = concurrency_controller
+        # Priority / per-tenant fair admission in front of the providers
+        self.scheduler = scheduler
+
+    @property
+    def image_fetcher(self) -> "ImageFetcher":
+        """URL image cache shared by every provider of this client."""
+        if self._image_fetcher is None:
+            from ..images import ImageFetcher
+            self._image_fetcher = ImageFetcher(self.http_client)
+        return self._image_fetcher
+
+    @property
+    def single_flight(self) -> "SingleFlight":
+        if self._single_flight is None:
+            from ..singleflight import SingleFlight
+            self._single_flight = SingleFlight()
+        return self._single_flight
+
+    def _new_provider(self, provider_cls: Type["BaseProvider"]) -> "BaseProvider":
+        return provider_cls(self.http_client, self.image_fetcher, metrics=self.metrics, compression=self.compression)
+
+    async def _apply_context_strategy(self, request: LLMRequest, cfg: HChatConfig) -> LLMRequest:
+        strategies = self._context_strategies(cfg)
+        if not strategies:
+            return request
+        messages = list(request.messages)
+        for s in strategies:
+            messages = await s.apply(messages, request.model, self)
+        return request.model_copy(update={"messages": messages})
+
+    def _should_coalesce(self, cfg: HChatConfig) -> bool:
+        return self.coalesce if cfg.coalesce is None else cfg.coalesce
+
+    def _coalesce_key(self, request: LLMRequest, cfg: HChatConfig) -> str:
+        # Usage is recorded and admission granted once per shared call, so only callers
+        # billed and scheduled alike may share one
+        from ..singleflight import request_key
+        return request_key(request, (cfg.tenant, cfg.tag, cfg.priority))
+
+    # Admission layers, outermost first: scheduler -> adaptive limiter -> provider
+
+    def _send(self, provider: "BaseProvider", request: LLMRequest, cfg: HChatConfig) -> Awaitable[LLMResponse]:
+        async def call() -> LLMResponse:
+            if self.concurrency_controller is None:
+                response = await provider.complete(request)
+            else:
+                response = await self.concurrency_controller.run(
+                    request.provider, request.model, lambda: provider.complete(request)
+                )
+            self._record_usage(request, cfg, response.usage)
+            return response
+
+        if self.scheduler is None:
+            return call()
+        return self.scheduler.run(call, cfg.priority, cfg.tenant, cfg.queue_timeout)
+
+    def _open_stream(self, provider: "BaseProvider", request: LLMRequest, cfg: HChatConfig) -> AsyncIterator[ResponseChunk]:
+        async def factory() -> AsyncGenerator[ResponseChunk, None]:
+            if self.concurrency_controller is None:
+                chunks = provider.stream(request)
+            else:
+                chunks = self.concurrency_controller.stream(request.provider, request.model, lambda: provider.stream(request))
+            # Closed with this generator, so an early stop reaches the provider right away
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    self._record_stream_usage(request, cfg, chunk)
+                    yield chunk
+
+        if self.scheduler is None:
+            return factory()
+        return self.scheduler.stream(factory, cfg.priority, cfg.tenant, cfg.queue_timeout)
+
+    async def _resumable_stream(
+        self, provider: "BaseProvider", request: LLMRequest, cfg: HChatConfig
+    ) -> AsyncGenerator[ResponseChunk, None]:
+        """One logical stream over as many continuation attempts as `cfg.resume` allows."""
+        from ..resume import StreamResumer
+
+        resumer = StreamResumer(provider, request, cfg.resume)
+        attempt = request
+        stopped = True  # until the stream ends or fails on its own
+        try:
+            while True:
+                try:
+                    async with aclosing(self._open_stream(provider, attempt, cfg)) as chunks:
+                        async for chunk in chunks:
+                            for out in resumer.feed(chunk):
+                                yield out
+                    stopped = False
+                    return
+                except Exception as e:
+                    attempt = resumer.next_request(e)
+                    if attempt is None:
+                        stopped = False
+                        raise
+        finally:
+            # A stream stopped early by the consumer is estimated from all generated text by its
+            # handle, interrupted attempts included; otherwise they are recorded here
+            if not stopped:
+                for lost in resumer.lost:
+                    self._record_usage(request, cfg, lost)
+
+    async def complete(self, model: str, input: Union[str, List[InputMessage]], **config) -> LLMResponse:
+        provider, request, cfg = self._build_request(model, input, config, stream=False)
+        request = self._check_context_window(await self._apply_context_strategy(request, cfg), cfg)
+        if self._should_coalesce(cfg):
+            return await self.single_flight.do(self._coalesce_key(request, cfg), lambda: self._send(provider, request, cfg))
+        return await self._send(provider, request, cfg)
+
+    def stream(self, model: str, input: Union[str, List[InputMessage]], **config) -> "MessageStream":
+        """
+        Stream a response. The returned handle is async-iterable and supports `cancel()`,
+        `stop_when=` conditions and `async with`; see `hchat_sdk.streaming`.
+        """
+        from ..streaming import MessageStream
+        return MessageStream(self, lambda: self._start_stream(model, input, config))
+
+    async def _start_stream(
+        self, model: str, input: Union[str, List[InputMessage]], config: Dict[str, Any]
+    ) -> Tuple[AsyncIterator[ResponseChunk], LLMRequest, HChatConfig]:
+        provider, request, cfg = self._build_request(model, input, config, stream=True)
+        request = self._check_context_window(await self._apply_context_strategy(request, cfg), cfg)
+        open_stream = self._resumable_stream if cfg.resume else self._open_stream
+        if self._should_coalesce(cfg):
+            chunks = self.single_flight.stream(self._coalesce_key(request, cfg), lambda: open_stream(provider, request, cfg))
+        else:
+            chunks = open_stream(provider, request, cfg)
+        return chunks, request, cfg
+
+    async def parse(
+        self, model: str, input: Union[str, List[InputMessage]], response_format: "ResponseFormat", **config
+    ) -> "StructuredResponse":
+        """
+        Complete with a structured-output schema and validate the answer into `response_format`
+        (a Pydantic model class or JSON schema). Raises StructuredOutputError if it does not validate.
+        """
+        from ..structured import StructuredResponse, parse_structured, response_text
+
+        response = await self.complete(model, input, response_format=response_format, **config)
+        return StructuredResponse(response=response, parsed=parse_structured(response_text(response), response_format))
+
+    async def stream_parse(
+        self, model: str, input: Union[str, List[InputMessage]], response_format: "ResponseFormat", **config
+    ) -> AsyncGenerator["StructuredChunk", None]:
+        """
+        Stream a structured answer as progressively parsed partial objects.
+        The final chunk has done=True and `parsed` validated against `response_format`.
+        """
+        from ..structured import StructuredStream
+
+        structured = StructuredStream(response_format)
+        async for chunk in self.stream(model, input, response_format=response_format, **config):
+            partial = structured.feed(chunk)
+            if partial is not None:
+                yield partial
+        yield structured.finish()
+
+    async def cascade(
+        self,
+        models: List[str],
+        input: Union[str, List[InputMessage]],
+        validator: "Validator",
+        hedge_after: Optional[float] = None,
+        stage_configs: Optional[List[Optional[Dict[str, Any]]]] = None,
+        **config
+    ) -> "CascadeResult":
+        """
+        Try `models` from cheapest to strongest, escalating when `validator` rejects an answer.
+        `hedge_after` starts the next stage in parallel if the current one is still running
+        after that many seconds; the loser is cancelled. See `hchat_sdk.cascade` for validators.
+        """
+        from ..cascade import Cascade
+        return await Cascade(self, models, input, validator, hedge_after, config, stage_configs).run()
+
+    def stream_many(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        buffer_size: int = 16
+    ) -> "StreamMultiplexer":
+        """
+        Run many streams concurrently and consume them through one iterator.
+        Each request is a dict with `model`, `input`, an optional `id` and any config kwargs.
+
+            async with client.messages.stream_many(requests) as mux:
+                async for request_id, chunk in mux:
+                    ...
+        """
+        from ..multiplex import StreamMultiplexer
+        return StreamMultiplexer(self, requests, max_concurrency=max_concurrency, buffer_size=buffer_size)
+
+
+class SyncMessages(BaseMessages):
+    """Blocking counterpart of `Messages` backed by a pooled `httpx.Client`."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: str,
+        http_client: Optional[httpx.Client] = None,
+        context_strategy: Optional[Union["ContextStrategy", List["ContextStrategy"]]] = None,
+        usage_tracker: Optional["UsageTracker"] = None,
+        metrics: Optional["MetricsRecorder"] = None,
+        compression: Optional["RequestCompression"] = None,
+        catalog: Optional["ModelCatalog"] = None
+    ):
+        super().__init__(api_key, api_base, context_strategy, usage_tracker, metrics, compression, catalog)
+        self.http_client = http_client or httpx.Client(timeout=60.0)
+        self._image_fetcher: Optional["ImageFetcher"] = None
+
+    @property
+    def image_fetcher(self) -> "ImageFetcher":
+        """URL image cache shared by every provider of this client."""
+        if self._image_fetcher is None:
+            from ..images import ImageFetcher
+            self._image_fetcher = ImageFetcher(sync_http_client=self.http_client)
+        return self._image_fetcher
+
+    def _new_provider(self, provider_cls: Type["BaseProvider"]) -> "BaseProvider":
+        return provider_cls(
+            image_fetcher=self.image_fetcher, sync_http_client=self.http_client,
+            metrics=self.metrics, compression=self.compression
         )
-        
-        async for chunk in provider.stream(request):
-            yield chunk
+
+    def _apply_context_strategy(self, request: LLMRequest, cfg: HChatConfig) -> LLMRequest:
+        strategies = self._context_strategies(cfg)
+        if not strategies:
+            return request
+        messages = list(request.messages)
+        for s in strategies:
+            if not s.supports_sync:
+                raise ValueError(f"{type(s).__name__} only supports the async client")
+            messages = s.apply_sync(messages, request.model, self)
+        return request.model_copy(update={"messages": messages})
+
+    def complete(self, model: str, input: Union[str, List[InputMessage]], **config) -> LLMResponse:
+        provider, request, cfg = self._build_request(model, input, config, stream=False)
+        request = self._check_context_window(self._apply_context_strategy(request, cfg), cfg)
+        response = provider.complete_sync(request)
+        self._record_usage(request, cfg, response.usage)
+        return response
+
+    def stream(self, model: str, input: Union[str, List[InputMessage]], **config) -> "SyncMessageStream":
+        from ..streaming import SyncMessageStream
+        return SyncMessageStream(self, lambda: self._start_stream(model, input, config))
+
+    def _start_stream(
+        self, model: str, input: Union[str, List[InputMessage]], config: Dict[str, Any]
+    ) -> Tuple[Iterator[ResponseChunk], LLMRequest, HChatConfig]:
+        provider, request, cfg = self._build_request(model, input, config, stream=True)
+        request = self._check_context_window(self._apply_context_strategy(request, cfg), cfg)
+
+        def chunks() -> Iterator[ResponseChunk]:
+            for chunk in provider.stream_sync(request):
+                self._record_stream_usage(request, cfg, chunk)
+                yield chunk
+
+        def resumable_chunks() -> Iterator[ResponseChunk]:
+            from ..resume import StreamResumer
+
+            resumer = StreamResumer(provider, request, cfg.resume)
+            attempt = request
+            stopped = True  # see Messages._resumable_stream
+            try:
+                while True:
+                    try:
+                        for chunk in provider.stream_sync(attempt):
+                            self._record_stream_usage(attempt, cfg, chunk)
+                            yield from resumer.feed(chunk)
+                        stopped = False
+                        return
+                    except Exception as e:
+                        attempt = resumer.next_request(e)
+                        if attempt is None:
+                            stopped = False
+                            raise
+            finally:
+                if not stopped:
+                    for lost in resumer.lost:
+                        self._record_usage(request, cfg, lost)
+
+        return (resumable_chunks() if cfg.resume else chunks()), request, cfg
+
+    def parse(
+        self, model: str, input: Union[str, List[InputMessage]], response_format: "ResponseFormat", **config
+    ) -> "StructuredResponse":
+        from ..structured import StructuredResponse, parse_structured, response_text
+
+        response = self.complete(model, input, response_format=response_format, **config)
+        return StructuredResponse(response=response, parsed=parse_structured(response_text(response), response_format))
+
+    def stream_parse(
+        self, model: str, input: Union[str, List[InputMessage]], response_format: "ResponseFormat", **config
+    ) -> Iterator["StructuredChunk"]:
+        from ..structured import StructuredStream
+
+        structured = StructuredStream(response_format)
+        for chunk in self.stream(model, input, response_format=response_format, **config):
+            partial = structured.feed(chunk)
+            if partial is not None:
+                yield partial
+        yield structured.finish()
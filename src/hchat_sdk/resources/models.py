@@ -1,37 +1,64 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from pydantic import BaseModel
 
-from ..capabilities import MODEL_CAPABILITIES
+from ..capabilities import ModelCapability, list_model_capabilities
+
+if TYPE_CHECKING:
+    from ..catalog import ModelCatalog
 
 class Model(BaseModel):
     model: str
     name: str
     maxToken: int
+    contextWindow: Optional[int] = None
 
 class Models:
-    def __init__(self, api_key: str, api_base: str):
+    def __init__(self, api_key: str, api_base: str, catalog: Optional["ModelCatalog"] = None):
         self.api_key = api_key
         self.api_base = api_base
+        self.catalog = catalog
+
+    async def refresh(self) -> None:
+        """Fetch the remote catalog now (requires a client created with remote_catalog=True)."""
+        if self.catalog is None:
+            raise ValueError("Remote catalog is not enabled. Create the client with remote_catalog=True.")
+        await self.catalog.refresh()
+
+    async def _sync_catalog(self) -> None:
+        if self.catalog is None:
+            return
+        try:
+            await self.catalog.get()
+        except Exception:
+            pass  # the registry keeps its last known entries; see catalog.last_error
+
+    def _capabilities(self) -> List[ModelCapability]:
+        # A loaded catalog is authoritative; the static registry is the fallback until then
+        return list_model_capabilities(self.catalog.index if self.catalog is not None else None)
 
     async def list(self) -> List[Model]:
         """List available models based on capabilities."""
+        await self._sync_catalog()
         models: List[Model] = []
-        for cap in MODEL_CAPABILITIES:
+        for cap in self._capabilities():
             # Using model ID as name for now, similar to Node SDK
             models.append(Model(
                 model=cap.model,
                 name=cap.model,
-                maxToken=cap.max_tokens
+                maxToken=cap.max_tokens,
+                contextWindow=cap.context_window
             ))
         return models
 
     async def retrieve(self, model_id: str) -> Model:
         """Retrieve a specific model by ID."""
-        for cap in MODEL_CAPABILITIES:
+        await self._sync_catalog()
+        for cap in self._capabilities():
             if cap.model == model_id:
                 return Model(
                     model=cap.model,
                     name=cap.model,
-                    maxToken=cap.max_tokens
+                    maxToken=cap.max_tokens,
+                    contextWindow=cap.context_window
                 )
         raise ValueError(f"Model not found: {model_id}")
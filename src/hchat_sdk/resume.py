@@ -0,0 +1,134 @@
+"""
+Automatic resumption of interrupted streams.
+
+    async for chunk in client.messages.stream("claude-sonnet-4-5", prompt, resume=True):
+        ...
+
+When the connection drops mid-answer (an `httpx.TransportError`), the text received so
+far is sent back and the continuation is spliced into the same stream. Anthropic and
+Gemini get it as a prefilled assistant turn. Azure/OpenAI get the partial answer plus an
+instruction to continue. At the seam the continuation's stream_start and duplicate
+text_start are dropped, and text the model repeats is removed. The final stream_stop
+adds the estimated usage of the interrupted attempts and reports `resumed`.
+
+Answers that already streamed thinking or tool calls cannot be continued this way; for
+those the error is raised as before.
+"""
+from typing import Iterator, List, Optional, Union
+
+import httpx
+
+from .providers.base import BaseProvider
+from .tokens import estimate_usage, get_token_counter
+from .types.request import LLMRequest
+from .types.response import ResponseChunk, StreamDelta, StreamStop, TextDelta, Usage
+
+DEFAULT_MAX_RESUMES = 3
+# Errors that mean the connection dropped, not that the request was rejected
+RESUMABLE_ERRORS = (httpx.TransportError,)
+# Continuation text held back to detect a repeated tail before it reaches the caller
+_SEAM_WINDOW = 256
+# Shorter repeats are only removed when they are whitespace (prefill trims trailing whitespace)
+_MIN_OVERLAP = 8
+
+
+def strip_seam(text: str, continuation: str) -> str:
+    """Drop the longest head of `continuation` that repeats the end of `text`."""
+    for k in range(min(len(text), len(continuation)), 0, -1):
+        head = continuation[:k]
+        if (k >= _MIN_OVERLAP or head.isspace()) and text.endswith(head):
+            return continuation[k:]
+    return continuation
+
+
+class StreamResumer:
+    """Splices continuation attempts into one logical stream; see the module docstring."""
+
+    def __init__(self, provider: BaseProvider, request: LLMRequest, resume: Union[bool, int]):
+        self.provider = provider
+        self.request = request
+        self.max_resumes = DEFAULT_MAX_RESUMES if resume is True else int(resume)
+        self.attempt = request
+        self.resumes = 0
+        self.text = ""  # text delivered to the caller
+        self.attempt_start = 0  # offset in `text` where the current attempt's output begins
+        self.in_text = False
+        self.resumable = True
+        self.seam: Optional[str] = None  # held-back continuation text, None once the seam is resolved
+        self.lost: List[Usage] = []  # estimated usage of interrupted attempts
+
+    def next_request(self, error: BaseException) -> Optional[LLMRequest]:
+        """Request that continues after `error`, or None when the error should propagate."""
+        if not isinstance(error, RESUMABLE_ERRORS) or not self.resumable or self.resumes >= self.max_resumes:
+            return None
+        request = self.request
+        if self.text:
+            request = self.provider._continuation_request(self.request, self.text)
+            if request is None:
+                return None
+            if request.max_tokens:
+                remaining = request.max_tokens - get_token_counter(request.model).count_text(self.text)
+                if remaining <= 0:
+                    return None
+                request = request.model_copy(update={"max_tokens": remaining})
+
+        self.lost.append(estimate_usage(self.attempt, [self.text[self.attempt_start:], self.seam or ""]))
+        self.attempt = request
+        self.resumes += 1
+        self.attempt_start = len(self.text)
+        self.seam = "" if self.text else None
+        return request
+
+    def feed(self, chunk: ResponseChunk) -> Iterator[ResponseChunk]:
+        if chunk.type == 'stream_start':
+            if not self.resumes:
+                yield chunk
+            return
+        if chunk.type == 'stream_stop':
+            yield from self._resolve_seam()
+            yield self._merge_usage(chunk) if self.resumes else chunk
+            return
+        if chunk.type != 'stream_delta':
+            yield chunk
+            return
+
+        event = chunk.content
+        if event.type == 'text_start':
+            if not self.in_text:  # otherwise the continuation reopens the caller's open block
+                self.in_text = True
+                yield chunk
+            return
+        if event.type == 'text_delta':
+            if self.seam is not None:
+                self.seam += event.text
+                if len(self.seam) >= _SEAM_WINDOW:
+                    yield from self._resolve_seam()
+                return
+            self.text += event.text
+            yield chunk
+            return
+
+        yield from self._resolve_seam()
+        if event.type == 'text_end':
+            self.in_text = False
+        else:
+            self.resumable = False  # thinking and tool-call blocks cannot be continued by prefill
+        yield chunk
+
+    def _resolve_seam(self) -> Iterator[ResponseChunk]:
+        seam, self.seam = self.seam, None
+        text = strip_seam(self.text, seam) if seam else ""
+        if text:
+            self.text += text
+            yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=text))
+
+    def _merge_usage(self, chunk: StreamStop) -> StreamStop:
+        data = {**chunk.data, "resumed": self.resumes, "usageEstimated": True}
+        if chunk.data.get('usage'):
+            usage = Usage.model_validate(chunk.data['usage'])
+            for lost in self.lost:
+                usage.promptTokens += lost.promptTokens
+                usage.completionTokens += lost.completionTokens
+                usage.totalTokens += lost.totalTokens
+            data["usage"] = usage.model_dump()
+        return StreamStop(type="stream_stop", data=data)
@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from .errors import QueueTimeoutError
+
+T = TypeVar('T')
+
+# Lower rank is served first
+PRIORITIES: Dict[str, int] = {'interactive': 0, 'batch': 1}
+DEFAULT_TENANT = 'default'
+
+
+class SchedulerStats(BaseModel):
+    in_flight: int
+    max_concurrency: int
+    queued: Dict[str, int]  # per priority class
+    queued_by_tenant: Dict[str, int]
+    dropped: int = 0  # requests that hit their queue deadline
+
+
+class _Ticket:
+    __slots__ = ('future', 'priority', 'tenant')
+
+    def __init__(self, future: asyncio.Future, priority: str, tenant: str):
+        self.future = future
+        self.priority = priority
+        self.tenant = tenant
+
+
+class RequestScheduler:
+    """
+    Admission control for a client shared by several tenants.
+    - Strict priority between classes: queued `interactive` work always goes before `batch`
+    - Weighted fair queuing between tenants within a class (virtual finish tags)
+    - Work conserving: `batch` uses any idle slot, except the `reserved_interactive`
+      slots held back so interactive traffic never waits behind a full batch load
+    - Queue-time deadlines: requests still waiting after `queue_timeout` fail with
+      `QueueTimeoutError` instead of being sent late
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        reserved_interactive: int = 0,
+        queue_timeout: Optional[float] = None,
+    ):
+        if reserved_interactive >= max_concurrency:
+            raise ValueError("reserved_interactive must be smaller than max_concurrency")
+        self.max_concurrency = max_concurrency
+        self.tenant_weights = dict(tenant_weights or {})
+        self.reserved_interactive = reserved_interactive
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.dropped = 0
+        self._queues: Dict[str, List[Tuple[float, int, _Ticket]]] = {p: [] for p in PRIORITIES}
+        self._virtual_time: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._finish_tags: Dict[Tuple[str, str], float] = {}
+        self._seq = itertools.count()
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+        queue_timeout: Optional[float] = None
+    ) -> T:
+        await self.acquire(priority, tenant, queue_timeout)
+        try:
+            return await fn()
+        finally:
+            self.release()
+
+    async def stream(
+        self,
+        factory: Callable[[], AsyncIterator[T]],
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+        queue_timeout: Optional[float] = None
+    ) -> AsyncGenerator[T, None]:
+        """Holds a slot until the stream is exhausted or closed."""
+        await self.acquire(priority, tenant, queue_timeout)
+        try:
+            async with aclosing(factory()) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        finally:
+            self.release()
+
+    async def acquire(
+        self,
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+        queue_timeout: Optional[float] = None
+    ) -> None:
+        priority = priority or 'interactive'
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        tenant = tenant or DEFAULT_TENANT
+
+        if self._has_capacity(priority) and not any(self._queues[p] for p in PRIORITIES if PRIORITIES[p] <= PRIORITIES[priority]):
+            self.in_flight += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(loop.create_future(), priority, tenant)
+        heapq.heappush(self._queues[priority], (self._tag(priority, tenant), next(self._seq), ticket))
+        self._dispatch()  # in case the queue ahead held only expired/cancelled tickets
+
+        timeout = self.queue_timeout if queue_timeout is None else queue_timeout
+        timer = loop.call_later(timeout, self._expire, ticket, timeout) if timeout is not None else None
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled() and ticket.future.exception() is None:
+                self.release()  # slot was granted just before cancellation
+            elif not ticket.future.done():
+                ticket.future.cancel()  # dispatcher skips it
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def stats(self) -> SchedulerStats:
+        queued: Dict[str, int] = {}
+        by_tenant: Dict[str, int] = {}
+        for priority, queue in self._queues.items():
+            live = [t for _, _, t in queue if not t.future.done()]
+            queued[priority] = len(live)
+            for t in live:
+                by_tenant[t.tenant] = by_tenant.get(t.tenant, 0) + 1
+        return SchedulerStats(
+            in_flight=self.in_flight,
+            max_concurrency=self.max_concurrency,
+            queued=queued,
+            queued_by_tenant=by_tenant,
+            dropped=self.dropped,
+        )
+
+    def _has_capacity(self, priority: str) -> bool:
+        limit = self.max_concurrency if priority == 'interactive' else self.max_concurrency - self.reserved_interactive
+        return self.in_flight < limit
+
+    def _tag(self, priority: str, tenant: str) -> float:
+        # Virtual finish tag: a tenant with weight w advances 1/w per request, so
+        # under contention it gets a share of slots proportional to w
+        key = (priority, tenant)
+        start = max(self._virtual_time[priority], self._finish_tags.get(key, 0.0))
+        finish = start + 1.0 / self.tenant_weights.get(tenant, 1.0)
+        self._finish_tags[key] = finish
+        return finish
+
+    def _dispatch(self) -> None:
+        for priority in sorted(PRIORITIES, key=PRIORITIES.get):
+            queue = self._queues[priority]
+            while queue and self._has_capacity(priority):
+                tag, _, ticket = heapq.heappop(queue)
+                key = (priority, ticket.tenant)
+                if self._finish_tags.get(key) == tag:
+                    # The tenant's last queued request. Served, its tag becomes the virtual time;
+                    # dropped, it was never served. Either way a fresh start at the virtual time
+                    # is right, so one-off tenants don't accumulate entries
+                    del self._finish_tags[key]
+                if ticket.future.done():
+                    continue
+                self._virtual_time[priority] = tag
+                self.in_flight += 1
+                ticket.future.set_result(None)
+            if queue and any(not t.future.done() for _, _, t in queue):
+                return  # higher priority work is still waiting; don't let lower classes pass it
+
+    def _expire(self, ticket: _Ticket, timeout: float) -> None:
+        if not ticket.future.done():
+            self.dropped += 1
+            ticket.future.set_exception(QueueTimeoutError(ticket.tenant, ticket.priority, timeout))
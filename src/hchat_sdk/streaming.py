@@ -0,0 +1,310 @@
+"""
+Stream handles returned by `messages.stream()`.
+
+    async with client.messages.stream("gpt-4o", prompt, stop_when=r"</answer>") as stream:
+        async for chunk in stream:
+            ...
+            if user_left:
+                await stream.cancel()   # closes the HTTP response now; safe from another task
+    stream.stop_reason, stream.usage      # 'stop_condition' / 'cancelled', estimated usage
+
+Iterating a handle is the same as iterating the old generator. When the stream ends
+early (cancel, `stop_when`, or leaving an `async with` block) the upstream response is
+closed immediately, so the connection goes back to the pool and the provider stops
+generating. The handle then yields a final `stream_stop` with finishReason
+'cancelled' or 'stop_condition' and an estimated `usage`. That usage is also passed
+to the usage tracker.
+"""
+import asyncio
+import re
+from typing import (
+    TYPE_CHECKING, AsyncGenerator, AsyncIterator, Awaitable, Callable, Generator, Iterator,
+    List, Optional, Pattern, Tuple, Union
+)
+
+from .tokens import estimate_usage
+from .types.request import HChatConfig, LLMRequest
+from .types.response import ResponseChunk, StreamStop, Usage
+
+if TYPE_CHECKING:
+    from .resources.messages import BaseMessages
+
+# Regex, or a predicate on the text generated so far
+StopCondition = Union[str, Pattern, Callable[[str], bool]]
+
+# A regex match may span deltas; only this much already-scanned text is searched again
+_REGEX_LOOKBEHIND = 1024
+
+
+class _StreamState:
+    """Accumulates generated text, evaluates the stop condition and estimates partial usage."""
+
+    def __init__(self):
+        self.stop_when: Optional[StopCondition] = None
+        self.request: Optional[LLMRequest] = None
+        self.cfg: Optional[HChatConfig] = None
+        self.done = False  # the provider's own stream_stop was seen
+        self.text = ""
+        self.generated: List[str] = []  # thinking and tool-argument deltas count as output too
+        self.usage: Optional[Usage] = None
+        self.finish_reason: Optional[str] = None
+        self.stop_reason: Optional[str] = None  # 'cancelled' | 'stop_condition' once stopped early
+
+    def started(self, request: LLMRequest, cfg: HChatConfig) -> None:
+        self.request, self.cfg = request, cfg
+        stop_when = cfg.stop_when
+        self.stop_when = re.compile(stop_when) if isinstance(stop_when, str) else stop_when
+
+    def stop(self, reason: str) -> None:
+        if self.stop_reason is None and not self.done:
+            self.stop_reason = reason
+
+    @property
+    def stopped_early(self) -> bool:
+        return self.stop_reason is not None and self.request is not None
+
+    def observe(self, chunk: ResponseChunk) -> bool:
+        """Track one chunk; True when the stop condition matched on it."""
+        if chunk.type == 'stream_stop':
+            self.done = True
+            self.finish_reason = chunk.data.get('finishReason')
+            if chunk.data.get('usage'):
+                self.usage = Usage.model_validate(chunk.data['usage'])
+            return False
+        if chunk.type != 'stream_delta':
+            return False
+        event = chunk.content
+        if event.type == 'thinking_delta':
+            self.generated.append(event.thinking)
+        elif event.type == 'tool_call_delta':
+            self.generated.append(event.args)
+        elif event.type == 'text_delta':
+            scanned = len(self.text)
+            self.text += event.text
+            self.generated.append(event.text)
+            return self._matches(scanned)
+        return False
+
+    def _matches(self, scanned: int) -> bool:
+        if self.stop_when is None:
+            return False
+        if isinstance(self.stop_when, Pattern):
+            return self.stop_when.search(self.text, max(0, scanned - _REGEX_LOOKBEHIND)) is not None
+        return bool(self.stop_when(self.text))
+
+    def partial_stop(self) -> StreamStop:
+        """Synthetic stream_stop for a stream that ended before the provider's own."""
+        self.usage = estimate_usage(self.request, self.generated)
+        self.finish_reason = self.stop_reason
+        return StreamStop(
+            type="stream_stop",
+            data={
+                "finishReason": self.stop_reason,
+                "usage": self.usage.model_dump(exclude_none=True),
+                "usageEstimated": True,
+            },
+        )
+
+
+class MessageStream:
+    """
+    Async stream handle: iterate it like a generator, stop it with `cancel()`, or use
+    `async with` so leaving the block closes the upstream response. Chunks are
+    produced once; iterate a handle only once.
+    """
+
+    def __init__(
+        self,
+        messages: "BaseMessages",
+        start: Callable[[], Awaitable[Tuple[AsyncIterator[ResponseChunk], LLMRequest, HChatConfig]]]
+    ):
+        self._messages = messages
+        self._start = start
+        self._state = _StreamState()
+        self._chunks: Optional[AsyncIterator[ResponseChunk]] = None
+        self._iterator: Optional[AsyncGenerator[ResponseChunk, None]] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+
+    @property
+    def text(self) -> str:
+        return self._state.text
+
+    @property
+    def usage(self) -> Optional[Usage]:
+        """Provider usage, or the estimate when the stream was stopped early."""
+        return self._state.usage
+
+    @property
+    def finish_reason(self) -> Optional[str]:
+        return self._state.finish_reason
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        return self._state.stop_reason
+
+    def __aiter__(self) -> AsyncGenerator[ResponseChunk, None]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def __anext__(self) -> ResponseChunk:
+        return await self.__aiter__().__anext__()
+
+    async def __aenter__(self) -> "MessageStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def cancel(self) -> None:
+        """
+        Stop the stream and close the upstream response. From another task this interrupts
+        a pending read; returns once the connection has been released.
+        """
+        if not self._closed.is_set():
+            self._state.stop('cancelled')
+        reader = self._reader
+        if reader is not None and reader is not asyncio.current_task():
+            if self._state.stop_reason is not None:
+                reader.cancel()
+            await self._closed.wait()  # the reader closes the upstream on its way out
+        else:
+            await self._close_upstream()
+
+    async def aclose(self) -> None:
+        """Cancel if still running and finalize the iterator (no further chunks)."""
+        await self.cancel()
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def _close_upstream(self) -> None:
+        chunks, self._chunks = self._chunks, None
+        try:
+            if chunks is not None and hasattr(chunks, 'aclose'):
+                await chunks.aclose()
+        finally:
+            self._closed.set()
+
+    async def _iterate(self) -> AsyncGenerator[ResponseChunk, None]:
+        state = self._state
+        stop: Optional[StreamStop] = None
+        try:
+            if state.stop_reason is not None:
+                return  # cancelled before the first read
+            self._chunks, request, cfg = await self._start()
+            state.started(request, cfg)
+            while self._chunks is not None:
+                self._reader = asyncio.current_task()
+                try:
+                    chunk = await self._chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                except asyncio.CancelledError:
+                    if state.stop_reason is None:
+                        raise
+                    # Interrupted by cancel() from another task, not by our caller
+                    asyncio.current_task().uncancel()
+                    break
+                finally:
+                    self._reader = None
+                if state.observe(chunk):
+                    state.stop('stop_condition')
+                yield chunk
+                if state.stop_reason is not None:
+                    break
+        finally:
+            await self._close_upstream()
+            # Accounted here so an aclose() at a yield still records the partial usage
+            if state.stopped_early:
+                stop = state.partial_stop()
+                self._messages._record_usage(state.request, state.cfg, state.usage)
+        if stop is not None:
+            yield stop
+
+
+class SyncMessageStream:
+    """
+    Blocking stream handle. `cancel()` may be called from the consuming loop, or from
+    another thread; in that case the stream stops after the chunk currently being read.
+    """
+
+    def __init__(
+        self,
+        messages: "BaseMessages",
+        start: Callable[[], Tuple[Iterator[ResponseChunk], LLMRequest, HChatConfig]]
+    ):
+        self._messages = messages
+        self._start = start
+        self._state = _StreamState()
+        self._chunks: Optional[Iterator[ResponseChunk]] = None
+        self._iterator: Optional[Generator[ResponseChunk, None, None]] = None
+        self._reading = False
+        self._closed = False
+
+    text = MessageStream.text
+    usage = MessageStream.usage
+    finish_reason = MessageStream.finish_reason
+    stop_reason = MessageStream.stop_reason
+
+    def __iter__(self) -> Generator[ResponseChunk, None, None]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    def __next__(self) -> ResponseChunk:
+        return next(self.__iter__())
+
+    def __enter__(self) -> "SyncMessageStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def cancel(self) -> None:
+        if not self._closed:
+            self._state.stop('cancelled')
+        if not self._reading:
+            self._close_upstream()
+
+    def close(self) -> None:
+        self.cancel()
+        if self._iterator is not None:
+            self._iterator.close()
+
+    def _close_upstream(self) -> None:
+        chunks, self._chunks = self._chunks, None
+        try:
+            if chunks is not None and hasattr(chunks, 'close'):
+                chunks.close()
+        finally:
+            self._closed = True
+
+    def _iterate(self) -> Generator[ResponseChunk, None, None]:
+        state = self._state
+        stop: Optional[StreamStop] = None
+        try:
+            if state.stop_reason is not None:
+                return
+            self._chunks, request, cfg = self._start()
+            state.started(request, cfg)
+            while self._chunks is not None:
+                self._reading = True
+                try:
+                    chunk = next(self._chunks)
+                except StopIteration:
+                    break
+                finally:
+                    self._reading = False
+                if state.observe(chunk):
+                    state.stop('stop_condition')
+                yield chunk
+                if state.stop_reason is not None:
+                    break
+        finally:
+            self._close_upstream()
+            if state.stopped_early:
+                stop = state.partial_stop()
+                self._messages._record_usage(state.request, state.cfg, state.usage)
+        if stop is not None:
+            yield stop
@@ -0,0 +1,419 @@
+"""
+Structured outputs: JSON answers validated into a Pydantic model (or a JSON schema).
+
+    class Invoice(BaseModel):
+        total: float
+        items: List[str]
+
+    result = await client.messages.parse("gpt-4o", "Extract the invoice", response_format=Invoice)
+    result.parsed.total
+
+    async for chunk in client.messages.stream_parse("claude-sonnet-4-5", "...", response_format=Invoice):
+        chunk.partial  # dict parsed so far; chunk.parsed is set on the final chunk
+
+Providers get the schema natively: `response_format` on Azure/OpenAI, `responseSchema`
+on Gemini and a forced tool on Anthropic (returned as text, like the others).
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from .errors import StructuredOutputError
+from .types.response import LLMResponse, ResponseChunk
+
+ResponseFormat = Union[Type[BaseModel], Dict[str, Any]]
+
+
+class StructuredResponse(BaseModel):
+    response: LLMResponse
+    parsed: Any  # instance of the requested model, or plain JSON for dict schemas
+
+
+class StructuredChunk(BaseModel):
+    partial: Any = None  # best-effort parse of the JSON received so far
+    done: bool = False
+    parsed: Any = None  # validated result, set on the final chunk
+
+
+# ---- Schema normalization ----
+
+def normalize_response_format(spec: Optional[ResponseFormat]) -> Optional[Dict[str, Any]]:
+    """
+    Accepts a Pydantic model class, an OpenAI-style `response_format` dict or a bare
+    JSON schema, and returns the OpenAI-style dict the providers translate from.
+    """
+    if spec is None:
+        return None
+    if isinstance(spec, type) and issubclass(spec, BaseModel):
+        return _model_response_format(spec)
+    if spec.get("type") in ("json_schema", "json_object"):
+        return spec
+    return {"type": "json_schema", "json_schema": {"name": "response", "schema": spec, "strict": False}}
+
+
+@lru_cache(maxsize=256)
+def _model_response_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": False},
+    }
+
+
+def schema_of(response_format: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if response_format.get("type") != "json_schema":
+        return None
+    return response_format.get("json_schema", {}).get("schema")
+
+
+def tool_name_of(response_format: Dict[str, Any]) -> str:
+    """Name of the forced tool used for Anthropic (^[a-zA-Z0-9_-]{1,64}$)."""
+    name = response_format.get("json_schema", {}).get("name") or "response"
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", name)[:64]
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inline $refs and drop keywords Gemini's OpenAPI-subset `responseSchema` rejects.
+    Raises ValueError for recursive schemas, which cannot be inlined.
+    """
+    defs = schema.get("$defs", {})
+    supported = {"type", "format", "description", "nullable", "enum", "properties", "required", "items",
+                 "minItems", "maxItems", "minimum", "maximum", "anyOf", "propertyOrdering"}
+    resolving: List[str] = []  # $refs being inlined on the current path
+
+    def convert(node: Any) -> Any:
+        if not isinstance(node, dict):
+            return node
+        if "$ref" in node:
+            name = node["$ref"].split("/")[-1]
+            if name in resolving:
+                cycle = " -> ".join(resolving[resolving.index(name):] + [name])
+                raise ValueError(f"Gemini responseSchema does not support recursive schemas ({cycle})")
+            resolving.append(name)
+            try:
+                return convert(defs.get(name, {}))
+            finally:
+                resolving.pop()
+        any_of = node.get("anyOf")
+        if any_of:
+            non_null = [s for s in any_of if s.get("type") != "null"]
+            if len(non_null) == 1 and len(non_null) < len(any_of):
+                # Optional[X] -> X with nullable
+                merged = {**convert(non_null[0]), "nullable": True}
+                if "description" in node:
+                    merged["description"] = node["description"]
+                return merged
+        out: Dict[str, Any] = {}
+        for key, value in node.items():
+            if key not in supported:
+                continue
+            if key == "properties":
+                out[key] = {name: convert(sub) for name, sub in value.items()}
+            elif key == "items":
+                out[key] = convert(value)
+            elif key == "anyOf":
+                out[key] = [convert(sub) for sub in value]
+            else:
+                out[key] = value
+        return out
+
+    return convert(schema)
+
+
+# ---- Validation ----
+
+@lru_cache(maxsize=256)
+def _compiled_validator(schema_json: str) -> Callable[[Any], Optional[str]]:
+    """Compiled once per distinct schema; returns an error message or None."""
+    schema = json.loads(schema_json)
+    try:
+        import jsonschema
+    except ImportError:
+        return lambda data: None if _basic_schema_check(data, schema) else "does not match schema"
+    validator = jsonschema.Draft202012Validator(schema)
+
+    def validate(data: Any) -> Optional[str]:
+        error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+        return None if error is None else error.message
+    return validate
+
+
+def _basic_schema_check(data: Any, schema: Dict[str, Any]) -> bool:
+    types = {"object": dict, "array": list, "string": str, "number": (int, float), "integer": int, "boolean": bool}
+    expected = types.get(schema.get("type"))
+    if expected is not None and not isinstance(data, expected):
+        return False
+    if isinstance(data, dict):
+        return all(key in data for key in schema.get("required", []))
+    return True
+
+
+def schema_error(data: Any, schema: Dict[str, Any]) -> Optional[str]:
+    return _compiled_validator(json.dumps(schema, sort_keys=True))(data)
+
+
+def extract_json_text(text: str) -> str:
+    """Strip Markdown code fences and any prose before the first JSON bracket."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=0)
+    return text[start:].strip()
+
+
+def parse_structured(text: str, spec: ResponseFormat) -> Any:
+    """Validate a complete JSON answer against a Pydantic model or schema."""
+    text = extract_json_text(text)
+    if isinstance(spec, type) and issubclass(spec, BaseModel):
+        try:
+            return spec.model_validate_json(text)
+        except ValueError as e:
+            raise StructuredOutputError(str(e), text) from e
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise StructuredOutputError(f"Invalid JSON: {e}", text) from e
+    schema = schema_of(normalize_response_format(spec))
+    if schema is not None:
+        error = schema_error(data, schema)
+        if error is not None:
+            raise StructuredOutputError(error, text)
+    return data
+
+
+def response_text(response: LLMResponse) -> str:
+    content = response.choices[0].message.content if response.choices else ""
+    if isinstance(content, str):
+        return content
+    return "".join(block.text for block in content if block.type == 'text')
+
+
+# ---- Streaming ----
+
+_MISSING = object()
+_DETACHED = object()  # a value with no key to go under (malformed input); parsed but not shown
+_STRING_SPECIAL = re.compile(r'["\\]')
+_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+def _same(a: Any, b: Any) -> bool:
+    return a is b or (type(a) is type(b) and a == b)
+
+
+class PartialJSONParser:
+    """
+    Incremental parser for a JSON document that is still being generated.
+    Values are built as characters arrive, so feed() costs O(chunk). snapshot() copies
+    only the containers that are still open (finished values are shared, not re-parsed)
+    and returns the best parse of the prefix; an unfinished key or literal is left out
+    until complete. `version` changes whenever the snapshot would.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._chunks: List[str] = []
+        self._root: Any = _MISSING
+        self._stack: List[Tuple[Union[Dict[str, Any], List[Any]], Any]] = []  # (open container, key in parent)
+        self._key: Any = _MISSING  # key waiting for its value in the innermost object
+        self._expect_key = False
+        self._string: Optional[List[str]] = None  # decoded pieces of the open string
+        self._string_is_key = False
+        self._escape: Optional[str] = None  # escape sequence after the backslash, while incomplete
+        self._scalar: Optional[str] = None  # number / true / false / null being read
+        self._scalar_value: Any = _MISSING  # its value if the text so far is valid JSON
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        i = 0
+        while i < len(chunk):
+            if self._string is not None:
+                i = self._read_string(chunk, i)
+            else:
+                self._step(chunk[i])
+                i += 1
+        if self._scalar is not None:
+            try:
+                value = json.loads(self._scalar)
+            except ValueError:
+                value = _MISSING
+            if not _same(value, self._scalar_value):
+                self._scalar_value = value
+                self.version += 1
+
+    def snapshot(self) -> Any:
+        value = _MISSING
+        if self._string is not None and not self._string_is_key:
+            value = self._string_text()
+        elif self._scalar is not None:
+            value = self._scalar_value
+        if not self._stack:
+            root = self._root if self._root is not _MISSING else value
+            return None if root is _MISSING else root
+        # Copy the open containers from the innermost out; closed ones are never mutated again
+        key = self._key if isinstance(self._stack[-1][0], dict) else len(self._stack[-1][0])
+        for container, container_key in reversed(self._stack):
+            copy = dict(container) if isinstance(container, dict) else list(container)
+            if value is not _MISSING and key is not _MISSING and key is not _DETACHED:
+                if isinstance(copy, list) and key == len(copy):
+                    copy.append(value)
+                else:
+                    copy[key] = value
+            value, key = copy, container_key
+        return value
+
+    def _string_text(self) -> str:
+        if len(self._string) > 1:
+            self._string[:] = ["".join(self._string)]
+        return self._string[0] if self._string else ""
+
+    def _add(self, value: Any, visible: bool = True) -> Any:
+        """Attach a value to the innermost container; returns the key it went under."""
+        if not self._stack:
+            self._root = value
+            key = None
+        elif isinstance(self._stack[-1][0], list):
+            key = len(self._stack[-1][0])
+            self._stack[-1][0].append(value)
+        elif self._key is not _MISSING:
+            key, self._key = self._key, _MISSING
+            self._stack[-1][0][key] = value
+        else:
+            return _DETACHED
+        if visible:
+            self.version += 1
+        return key
+
+    def _read_string(self, chunk: str, i: int) -> int:
+        if self._escape is not None:
+            self._read_escape(chunk[i])
+            return i + 1
+        match = _STRING_SPECIAL.search(chunk, i)
+        end = match.start() if match else len(chunk)
+        if end > i:
+            self._append(chunk[i:end])
+        if match is None:
+            return end
+        if chunk[end] == '"':
+            text, is_key = self._string_text(), self._string_is_key
+            self._string = None
+            if is_key:
+                self._key = text
+            else:
+                self._add(text, visible=False)  # already shown while open
+        else:
+            self._escape = ""
+        return end + 1
+
+    def _read_escape(self, ch: str) -> None:
+        self._escape += ch
+        if self._escape[0] != 'u':
+            char = _ESCAPES.get(ch, ch)
+        elif len(self._escape) < 5:
+            return
+        else:
+            try:
+                char = chr(int(self._escape[1:], 16))
+            except ValueError:
+                char = self._escape
+            last = self._string[-1][-1:] if self._string else ""
+            if '\udc00' <= char <= '\udfff' and '\ud800' <= last <= '\udbff':
+                # low half of a surrogate pair: combine with the high half already read
+                self._string[-1] = self._string[-1][:-1]
+                char = chr(0x10000 + ((ord(last) - 0xD800) << 10) + (ord(char) - 0xDC00))
+        self._escape = None
+        self._append(char)
+
+    def _append(self, text: str) -> None:
+        self._string.append(text)
+        if not self._string_is_key:
+            self.version += 1
+
+    def _step(self, ch: str) -> None:
+        if self._scalar is not None:
+            if ch.isalnum() or ch in '+-.':
+                self._scalar += ch
+                return
+            self._end_scalar()
+
+        if self._root is not _MISSING and not self._stack:
+            return  # document complete; ignore trailing text
+        if ch == '"':
+            self._string = []
+            self._string_is_key = self._expect_key
+            if not self._string_is_key:
+                self.version += 1
+        elif ch in '{[':
+            container: Union[Dict[str, Any], List[Any]] = {} if ch == '{' else []
+            self._stack.append((container, self._add(container)))
+            self._expect_key = ch == '{'
+        elif ch in '}]':
+            if self._stack:
+                self._stack.pop()
+            self._key = _MISSING
+            self._expect_key = False
+        elif ch == ',':
+            self._key = _MISSING
+            self._expect_key = bool(self._stack) and isinstance(self._stack[-1][0], dict)
+        elif ch == ':':
+            self._expect_key = False
+        elif not ch.isspace():
+            self._scalar = ch
+            self._scalar_value = _MISSING
+
+    def _end_scalar(self) -> None:
+        token, shown = self._scalar, self._scalar_value
+        self._scalar = None
+        self._scalar_value = _MISSING
+        try:
+            value = json.loads(token)
+        except ValueError:
+            self._key = _MISSING
+            if shown is not _MISSING:
+                self.version += 1
+            return
+        self._add(value, visible=not _same(value, shown))
+
+
+class StructuredStream:
+    """Turns a chunk stream into StructuredChunks; shared by the async and sync clients."""
+
+    def __init__(self, spec: ResponseFormat):
+        self.spec = spec
+        self.parser = PartialJSONParser()
+        self._started = False
+
+    def feed(self, chunk: ResponseChunk) -> Optional[StructuredChunk]:
+        if chunk.type != 'stream_delta' or chunk.content.type != 'text_delta':
+            return None
+        text = chunk.content.text
+        if not self._started:
+            # Skip code fences / prose until the document starts
+            starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+            if not starts:
+                return None
+            text = text[min(starts):]
+            self._started = True
+        version = self.parser.version
+        self.parser.feed(text)
+        if self.parser.version == version:
+            return None
+        partial = self.parser.snapshot()
+        if partial is None:
+            return None
+        return StructuredChunk(partial=partial)
+
+    def finish(self) -> StructuredChunk:
+        parsed = parse_structured(self.parser.text, self.spec)
+        partial = parsed.model_dump() if isinstance(parsed, BaseModel) else parsed
+        return StructuredChunk(partial=partial, done=True, parsed=parsed)
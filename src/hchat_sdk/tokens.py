@@ -0,0 +1,176 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .types.request import InputMessage, LLMRequest
+from .types.response import Usage
+
+# Per-family calibration for the estimator (chars per token for ASCII / non-ASCII text),
+# fixed per-message framing overhead and a flat cost for an image block.
+_CALIBRATION = {
+    'gpt': {'ascii': 4.0, 'other': 1.3, 'message': 3, 'priming': 3, 'image': 765},
+    'claude': {'ascii': 3.5, 'other': 1.2, 'message': 4, 'priming': 1, 'image': 1600},
+    'gemini': {'ascii': 4.0, 'other': 1.5, 'message': 2, 'priming': 0, 'image': 258},
+}
+
+
+def _model_family(model: str) -> str:
+    if model.startswith('claude'):
+        return 'claude'
+    if model.startswith('gemini'):
+        return 'gemini'
+    return 'gpt'
+
+
+def _bpe_encoding_name(model: str) -> Optional[str]:
+    if model.startswith(('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')):
+        return 'o200k_base'
+    if model.startswith(('gpt-4', 'gpt-3.5')):
+        return 'cl100k_base'
+    return None
+
+
+@lru_cache(maxsize=None)
+def _load_bpe(encoding_name: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding(encoding_name)
+
+
+class TokenCounter:
+    """
+    Token counter for a single model.
+    - Exact BPE counts for GPT models when `tiktoken` is installed
+    - Calibrated character-ratio estimates for Claude, Gemini (and GPT without tiktoken)
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.family = _model_family(model)
+        self.calibration = _CALIBRATION[self.family]
+        encoding_name = _bpe_encoding_name(model)
+        self.bpe = _load_bpe(encoding_name) if encoding_name else None
+
+    @property
+    def exact(self) -> bool:
+        return self.bpe is not None
+
+    def count_text(self, text: str) -> int:
+        return self.count_texts([text])[0]
+
+    def count_texts(self, texts: Sequence[str]) -> List[int]:
+        """Count many strings in one call (uses the BPE batch encoder when available)."""
+        if self.bpe is not None:
+            return [len(ids) for ids in self.bpe.encode_ordinary_batch(list(texts))]
+        return [self._estimate(t) for t in texts]
+
+    def count_message_tokens(self, messages: Sequence[Union[InputMessage, Dict[str, Any]]]) -> List[int]:
+        """Per-message token counts, including framing overhead."""
+        texts: List[str] = []
+        owners: List[int] = []
+        fixed = [self.calibration['message']] * len(messages)
+
+        for i, m in enumerate(messages):
+            content = m.content if isinstance(m, InputMessage) else m.get('content')
+            for piece in self._iter_text(content):
+                if piece is None:
+                    fixed[i] += self.calibration['image']
+                else:
+                    texts.append(piece)
+                    owners.append(i)
+
+        counts = list(fixed)
+        for owner, n in zip(owners, self.count_texts(texts)):
+            counts[owner] += n
+        return counts
+
+    def count_messages(
+        self,
+        messages: Sequence[Union[InputMessage, Dict[str, Any]]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        total = sum(self.count_message_tokens(messages)) + self.calibration['priming']
+        extra = []
+        if system:
+            extra.append(system)
+        if tools:
+            extra.append(json.dumps(tools, separators=(',', ':')))
+        if extra:
+            total += sum(self.count_texts(extra))
+        return total
+
+    def _estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        ascii_chars = sum(1 for c in text if c < '\x80')
+        other_chars = len(text) - ascii_chars
+        estimate = ascii_chars / self.calibration['ascii'] + other_chars / self.calibration['other']
+        return max(1, round(estimate))
+
+    def _iter_text(self, content):
+        """Yield text pieces of a message; yields None for each image block."""
+        if content is None:
+            return
+        if isinstance(content, str):
+            yield content
+            return
+        for block in content:
+            b = block.model_dump() if hasattr(block, 'model_dump') else block
+            t = b.get('type')
+            if t == 'text':
+                yield b.get('text', '')
+            elif t == 'thinking':
+                yield b.get('thinking', '')
+            elif t in ('image', 'imageUrl'):
+                yield None
+            elif t == 'tool_use':
+                yield b.get('name', '')
+                yield json.dumps(b.get('input') or {}, separators=(',', ':'))
+            elif t == 'tool_result':
+                yield from self._iter_text(b.get('content'))
+
+
+@lru_cache(maxsize=64)
+def get_token_counter(model: str) -> TokenCounter:
+    """Cached counter per model (encoders are loaded once per process)."""
+    return TokenCounter(model)
+
+
+def count_tokens(
+    model: str,
+    input: Union[str, Sequence[Union[InputMessage, Dict[str, Any]]]],
+    system: Optional[str] = None,
+    tools: Optional[List[Dict[str, Any]]] = None
+) -> int:
+    """Estimate the prompt tokens of a request before sending it."""
+    counter = get_token_counter(model)
+    if isinstance(input, str):
+        input = [{'role': 'user', 'content': input}]
+    return counter.count_messages(input, system=system, tools=tools)
+
+
+def count_tokens_batch(
+    model: str,
+    conversations: Sequence[Sequence[Union[InputMessage, Dict[str, Any]]]]
+) -> List[int]:
+    """Count many conversations with a single batched encode."""
+    counter = get_token_counter(model)
+    flat = [m for conv in conversations for m in conv]
+    per_message = counter.count_message_tokens(flat)
+    totals = []
+    offset = 0
+    for conv in conversations:
+        totals.append(sum(per_message[offset:offset + len(conv)]) + counter.calibration['priming'])
+        offset += len(conv)
+    return totals
+
+
+def estimate_usage(request: LLMRequest, generated: Sequence[str]) -> Usage:
+    """Estimated usage of a stream that ended before the provider reported any (e.g. closed early)."""
+    counter = get_token_counter(request.model)
+    prompt = counter.count_messages(request.messages, system=request.system, tools=request.tools)
+    completion = sum(counter.count_texts([t for t in generated if t])) if any(generated) else 0
+    return Usage(prompt_tokens=prompt, completion_tokens=completion, total_tokens=prompt + completion)
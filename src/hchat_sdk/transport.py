@@ -0,0 +1,71 @@
+"""
+Transport options for `HChat` / `SyncHChat`.
+
+    HChat(api_key, api_base="http://egress/v2/api", uds="/run/egress.sock")   # plain HTTP over a Unix socket
+    HChat(api_key, proxy="http://proxy.internal:3128", verify=ssl_context)     # proxy, custom TLS
+    HChat(api_key, api_base="http://test/v2/api", transport=httpx.ASGITransport(app))  # in-process app
+
+Every provider, the image fetcher and the catalog use the one pooled client built here,
+so the options apply to all traffic. Passing the same `ssl.SSLContext` to several clients
+shares its TLS session cache. `keepalive_expiry` is how long idle pooled connections are
+kept (not applied to a custom `transport=`). `http_client=` on the clients takes a
+caller-owned `httpx.AsyncClient` / `httpx.Client` instead.
+"""
+import ssl
+from typing import Optional, Union
+
+import httpx
+
+Verify = Union[bool, ssl.SSLContext]
+
+DEFAULT_TIMEOUT = 60.0
+# Idle pooled connections are kept this long (httpx defaults to 5 s); stays below the 60 s idle
+# timeout common on load balancers, so the server rarely closes a connection first
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def _check(transport, uds: Optional[str], proxy) -> None:
+    if transport is not None and (uds is not None or proxy is not None):
+        raise ValueError("transport= cannot be combined with uds= or proxy=; configure them on the transport")
+    if uds is not None and proxy is not None:
+        raise ValueError("uds= and proxy= are mutually exclusive")
+
+
+def _limits(keepalive_expiry: Optional[float]) -> httpx.Limits:
+    if keepalive_expiry is None:
+        keepalive_expiry = DEFAULT_KEEPALIVE_EXPIRY
+    return httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=keepalive_expiry)
+
+
+def pool_keepalive_expiry(http_client: Union[httpx.AsyncClient, httpx.Client]) -> Optional[float]:
+    """`keepalive_expiry` of the client's connection pool; None when its transport has no pool."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    return getattr(pool, "_keepalive_expiry", None)
+
+
+def async_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    uds: Optional[str] = None,
+    proxy: Optional[Union[str, httpx.Proxy]] = None,
+    verify: Verify = True,
+    keepalive_expiry: Optional[float] = None,
+) -> httpx.AsyncClient:
+    _check(transport, uds, proxy)
+    limits = _limits(keepalive_expiry)
+    if uds is not None:
+        transport = httpx.AsyncHTTPTransport(uds=uds, verify=verify, limits=limits)
+    return httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, transport=transport, proxy=proxy, verify=verify, limits=limits)
+
+
+def sync_http_client(
+    transport: Optional[httpx.BaseTransport] = None,
+    uds: Optional[str] = None,
+    proxy: Optional[Union[str, httpx.Proxy]] = None,
+    verify: Verify = True,
+    keepalive_expiry: Optional[float] = None,
+) -> httpx.Client:
+    _check(transport, uds, proxy)
+    limits = _limits(keepalive_expiry)
+    if uds is not None:
+        transport = httpx.HTTPTransport(uds=uds, verify=verify, limits=limits)
+    return httpx.Client(timeout=DEFAULT_TIMEOUT, transport=transport, proxy=proxy, verify=verify, limits=limits)
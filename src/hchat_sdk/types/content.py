@@ -27,10 +27,12 @@ ImageSource = Union[Base64ImageSource, URLImageSource, FileImageSource]
 class TextContent(BaseModel):
     type: Literal['text'] = 'text'
     text: str
+    cache_control: Optional[Dict[str, Any]] = None  # Anthropic prompt caching, e.g. {"type": "ephemeral"}
 
 class ImageContent(BaseModel):
     type: Literal['image'] = 'image'
     source: ImageSource
+    cache_control: Optional[Dict[str, Any]] = None
 
 class ImageUrlContent(BaseModel):
     type: Literal['imageUrl'] = 'imageUrl'
@@ -41,12 +43,14 @@ class ToolUseContent(BaseModel):
     id: str
     name: str
     input: Dict[str, Any]
+    cache_control: Optional[Dict[str, Any]] = None
 
 class ToolResultContent(BaseModel):
     type: Literal['tool_result'] = 'tool_result'
     tool_use_id: str
     content: Union[str, List['ContentBlock']]
     is_error: Optional[bool] = None
+    cache_control: Optional[Dict[str, Any]] = None
 
 class ThinkingContent(BaseModel):
     type: Literal['thinking'] = 'thinking'
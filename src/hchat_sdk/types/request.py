@@ -23,6 +23,31 @@ class HChatConfig(BaseModel):
     tools: Optional[List[Dict[str, Any]]] = None # Simplified tool definition
     stream: Optional[bool] = False
     system: Optional[str] = None
+    # Reasoning: on/off, a graded effort, or an explicit thinking-token budget (0 disables).
+    # When none is set the model's registry default applies.
+    reasoning: Optional[bool] = None
+    reasoning_effort: Optional[Literal['minimal', 'low', 'medium', 'high']] = Field(None, alias="reasoningEffort")
+    reasoning_budget: Optional[int] = Field(None, alias="reasoningBudget", ge=0)
+    # Pre-flight context window check: 'error' rejects, 'trim' drops oldest turns
+    context_overflow: Optional[Literal['error', 'trim']] = Field(None, alias="contextOverflow")
+    # ContextStrategy (or list of them) from hchat_sdk.context; overrides Messages.context_strategy
+    context_strategy: Optional[Any] = Field(None, alias="contextStrategy")
+    # Anthropic: place cache_control breakpoints on system, tools and the conversation prefix
+    prompt_caching: Optional[bool] = Field(None, alias="promptCaching")
+    # Share one upstream call among identical in-flight requests (None = client default)
+    coalesce: Optional[bool] = None
+    # Scheduling (used when the client has a RequestScheduler)
+    priority: Optional[Literal['interactive', 'batch']] = None
+    tenant: Optional[str] = None
+    # Free-form label for usage accounting and budgets (e.g. job or feature name)
+    tag: Optional[str] = None
+    queue_timeout: Optional[float] = Field(None, alias="queueTimeout")
+    # Structured output: a Pydantic model class, OpenAI-style response_format dict or JSON schema
+    response_format: Optional[Any] = Field(None, alias="responseFormat")
+    # Client-side stop: regex (str or compiled) or predicate on the text so far; see hchat_sdk.streaming
+    stop_when: Optional[Any] = Field(None, alias="stopWhen")
+    # Continue a stream after a dropped connection: True (up to 3 times) or the max number of resumes
+    resume: Optional[Union[bool, int]] = None
     
     model_config = ConfigDict(populate_by_name=True, extra="allow")
 
@@ -47,11 +72,13 @@ class LLMRequest(BaseModel):
     stream: Optional[bool] = False
     system: Optional[str] = None
     reasoning: Optional[bool] = None
+    reasoning_effort: Optional[Literal['minimal', 'low', 'medium', 'high']] = Field(None, alias="reasoningEffort")
     reasoning_budget: Optional[int] = Field(None, alias="reasoningBudget")
     tools: Optional[List[Dict[str, Any]]] = None
     tool_choice: Optional[Union[str, Dict[str, Any]]] = Field(None, alias="toolChoice")
     extra_headers: Optional[Dict[str, str]] = Field(None, alias="extraHeaders")
     response_format: Optional[Dict[str, Any]] = None
+    prompt_caching: Optional[bool] = Field(None, alias="promptCaching")
 
     model_config = ConfigDict(populate_by_name=True)
 
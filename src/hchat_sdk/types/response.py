@@ -7,6 +7,8 @@ class Usage(BaseModel):
     completionTokens: int = Field(alias="completion_tokens")
     totalTokens: int = Field(alias="total_tokens")
     reasoningTokens: Optional[int] = Field(None, alias="reasoning_tokens")
+    cacheReadTokens: Optional[int] = Field(None, alias="cache_read_tokens")
+    cacheWriteTokens: Optional[int] = Field(None, alias="cache_write_tokens")
     
     model_config = ConfigDict(populate_by_name=True)
 
@@ -57,13 +59,16 @@ class ToolCallStart(BaseModel):
     name: str
     toolCallId: Optional[str] = None
 
+# Parallel tool calls may interleave; toolCallId ties deltas and ends to their ToolCallStart
 class ToolCallDelta(BaseModel):
     type: Literal['tool_call_delta']
     args: str
+    toolCallId: Optional[str] = None
 
 class ToolCallEnd(BaseModel):
     type: Literal['tool_call_end']
     input: Dict[str, Any]
+    toolCallId: Optional[str] = None
 
 ContentEvent = Union[
     TextStart, TextDelta, TextEnd,
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .capabilities import ModelCapability, ModelPricing, get_model_capability
+from .errors import BudgetExceededError
+from .types.response import Usage
+
+
+def cost_of(usage: Usage, pricing: Optional[ModelPricing]) -> float:
+    """USD cost of one response. Cached prompt tokens are billed at the cache prices."""
+    if pricing is None:
+        return 0.0
+    cache_read = usage.cacheReadTokens or 0
+    cache_write = usage.cacheWriteTokens or 0
+    uncached = max(usage.promptTokens - cache_read - cache_write, 0)
+    total = (
+        uncached * pricing.input
+        + cache_read * (pricing.cache_read if pricing.cache_read is not None else pricing.input)
+        + cache_write * (pricing.cache_write if pricing.cache_write is not None else pricing.input)
+        + usage.completionTokens * pricing.output  # includes reasoning tokens on every provider
+    )
+    return total / 1_000_000
+
+
+class UsageTotals(BaseModel):
+    model: str
+    tenant: Optional[str] = None
+    tag: Optional[str] = None
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    reasoning_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost: float = 0.0
+
+
+class UsageSnapshot(BaseModel):
+    timestamp: float
+    total_cost: float
+    totals: List[UsageTotals]
+
+
+class Budget(BaseModel):
+    """
+    Spending cap over the usage matching `model` / `tenant` / `tag` (None matches all).
+    Once `limit` USD is spent, requests in scope are rejected with BudgetExceededError,
+    or sent to `downgrade_to` instead when `action="downgrade"`.
+    """
+    limit: float
+    model: Optional[str] = None
+    tenant: Optional[str] = None
+    tag: Optional[str] = None
+    action: Literal['reject', 'downgrade'] = 'reject'
+    downgrade_to: Optional[str] = None
+
+    def matches(self, model: str, tenant: Optional[str], tag: Optional[str]) -> bool:
+        return (
+            (self.model is None or self.model == model)
+            and (self.tenant is None or self.tenant == tenant)
+            and (self.tag is None or self.tag == tag)
+        )
+
+
+class UsageTracker:
+    """
+    Aggregates Usage and cost per (model, tenant, tag) and enforces budgets.
+    Safe to share between threads and event loops: updates hold a plain lock and never await.
+    """
+
+    def __init__(self, budgets: Optional[List[Budget]] = None):
+        for b in budgets or []:
+            if b.action == 'downgrade' and not b.downgrade_to:
+                raise ValueError("Budget with action='downgrade' needs downgrade_to")
+        self.budgets = list(budgets or [])
+        self._totals: Dict[Tuple[str, Optional[str], Optional[str]], UsageTotals] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, model: str, usage: Usage, tenant: Optional[str] = None, tag: Optional[str] = None,
+        capability: Optional[ModelCapability] = None
+    ) -> float:
+        """Add `usage` to the totals; `capability` (the client's registry entry) prices it."""
+        cap = capability or get_model_capability(model)
+        cost = cost_of(usage, cap.pricing if cap else None)
+        key = (model, tenant, tag)
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = UsageTotals(model=model, tenant=tenant, tag=tag)
+            totals.requests += 1
+            totals.prompt_tokens += usage.promptTokens
+            totals.completion_tokens += usage.completionTokens
+            totals.reasoning_tokens += usage.reasoningTokens or 0
+            totals.cache_read_tokens += usage.cacheReadTokens or 0
+            totals.cache_write_tokens += usage.cacheWriteTokens or 0
+            totals.cost += cost
+        return cost
+
+    def spent(self, model: Optional[str] = None, tenant: Optional[str] = None, tag: Optional[str] = None) -> float:
+        with self._lock:
+            return sum(
+                t.cost for t in self._totals.values()
+                if (model is None or t.model == model)
+                and (tenant is None or t.tenant == tenant)
+                and (tag is None or t.tag == tag)
+            )
+
+    def admit(self, model: str, tenant: Optional[str] = None, tag: Optional[str] = None) -> str:
+        """Model to send the request to, after applying budgets; raises if a budget rejects it."""
+        seen = {model}
+        while True:
+            for budget in self.budgets:
+                if not budget.matches(model, tenant, tag) or model == budget.downgrade_to:
+                    continue
+                if self.spent(budget.model, budget.tenant, budget.tag) < budget.limit:
+                    continue
+                if budget.action == 'reject' or budget.downgrade_to in seen:
+                    raise BudgetExceededError(budget.limit, model, tenant, tag)
+                # Re-check every budget against the cheaper model
+                model = budget.downgrade_to
+                seen.add(model)
+                break
+            else:
+                return model
+
+    def snapshot(self) -> UsageSnapshot:
+        with self._lock:
+            totals = [t.model_copy() for t in self._totals.values()]
+        return UsageSnapshot(timestamp=time.time(), total_cost=sum(t.cost for t in totals), totals=totals)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+    def start_export(self, sink: Callable[[UsageSnapshot], None], interval: float = 60.0) -> asyncio.Task:
+        """Call `sink(snapshot)` every `interval` seconds until the returned task is cancelled."""
+        async def _loop() -> None:
+            try:
+                while True:
+                    await asyncio.sleep(interval)
+                    sink(self.snapshot())
+            finally:
+                sink(self.snapshot())  # final snapshot on shutdown
+        return asyncio.ensure_future(_loop())
@@ -0,0 +1,137 @@
+"""
+Connection pre-warming.
+
+    await client.warmup(models=["gpt-4o", "claude-sonnet-4-5", "gemini-2.5-flash"], connections=2)
+    task = client.start_keepalive(connections=2)   # cancel the task to stop
+
+`warmup` sends `connections` concurrent HEAD requests to the endpoint of each model. DNS, TCP
+and TLS are paid up front, and the connections wait in the shared pool for the first real
+request. The pool keys connections by origin (scheme, host, port), so models whose endpoints
+share an origin are probed once. The response status does not matter, since only the
+connection is wanted.
+
+The keepalive task repeats the probes so idle connections are not expired by the pool. By
+default it probes at 0.8 x the pool's `keepalive_expiry` (30 s, so every 24 s); raise
+`HChat(keepalive_expiry=...)` to probe less often. With a caller-supplied `http_client` the
+expiry is read from its connection pool; pass `interval=` when its transport has no pool.
+Gemini probes send the API key in the
+`x-goog-api-key` header rather than the URL.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from .capabilities import list_model_capabilities
+from .transport import DEFAULT_KEEPALIVE_EXPIRY
+from .types.request import LLMRequest
+
+if TYPE_CHECKING:
+    from .resources.messages import BaseMessages
+
+# Probe URL and headers of one endpoint
+Endpoint = Tuple[str, Dict[str, str]]
+
+# Default keepalive interval as a fraction of the pool's keepalive_expiry
+KEEPALIVE_FRACTION = 0.8
+
+
+class WarmupResult(BaseModel):
+    url: str
+    connections: int  # probes that reached the server
+    seconds: float
+    error: Optional[str] = None  # last connection error, if any probe failed
+
+
+def default_models(messages: Optional["BaseMessages"] = None) -> List[str]:
+    """One registered model per provider (from the client's catalog once it has loaded)."""
+    catalog = messages.catalog.index if messages is not None and messages.catalog is not None else None
+    models = {}
+    for cap in list_model_capabilities(catalog):
+        models.setdefault(cap.provider, cap.model)
+    return list(dict.fromkeys(models.values()))
+
+
+def endpoints(messages: "BaseMessages", models: Optional[List[str]] = None) -> List[Endpoint]:
+    """One non-streaming endpoint per origin for `models` (default: one model per provider)."""
+    found: Dict[Tuple[bytes, bytes, Optional[int]], Endpoint] = {}
+    for model in models or default_models(messages):
+        provider_name = messages._provider_for(model)
+        probe = LLMRequest(
+            api_key=messages.api_key, api_base=messages.api_base, provider=provider_name, model=model, messages=[]
+        )
+        url, headers = messages._get_provider_instance(provider_name)._probe_endpoint(probe)
+        origin = httpx.URL(url)
+        found.setdefault((origin.raw_scheme, origin.raw_host, origin.port), (url, headers))
+    return list(found.values())
+
+
+def _result(url: str, outcomes: List[Optional[BaseException]], started: float) -> WarmupResult:
+    errors = [e for e in outcomes if e is not None]
+    return WarmupResult(
+        url=url,
+        connections=len(outcomes) - len(errors),
+        seconds=time.perf_counter() - started,
+        error=repr(errors[-1]) if errors else None,
+    )
+
+
+async def warmup(http_client: httpx.AsyncClient, targets: List[Endpoint], connections: int = 1) -> List[WarmupResult]:
+    async def probe(url: str, headers: Dict[str, str]) -> Optional[BaseException]:
+        try:
+            await http_client.head(url, headers=headers)
+        except httpx.HTTPError as e:
+            return e
+        return None
+
+    async def warm(url: str, headers: Dict[str, str]) -> WarmupResult:
+        started = time.perf_counter()
+        # Concurrent probes each need their own connection, leaving `connections` in the pool
+        outcomes = await asyncio.gather(*(probe(url, headers) for _ in range(connections)))
+        return _result(url, list(outcomes), started)
+
+    return list(await asyncio.gather(*(warm(url, headers) for url, headers in targets)))
+
+
+def warmup_sync(http_client: httpx.Client, targets: List[Endpoint], connections: int = 1) -> List[WarmupResult]:
+    def probe(url: str, headers: Dict[str, str]) -> Optional[BaseException]:
+        try:
+            http_client.head(url, headers=headers)
+        except httpx.HTTPError as e:
+            return e
+        return None
+
+    results = []
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        for url, headers in targets:
+            started = time.perf_counter()
+            results.append(_result(url, list(pool.map(probe, [url] * connections, [headers] * connections)), started))
+    return results
+
+
+def start_keepalive(
+    http_client: httpx.AsyncClient, targets: List[Endpoint], connections: int = 1, interval: Optional[float] = None,
+    keepalive_expiry: Optional[float] = None
+) -> asyncio.Task:
+    """
+    Re-probe `targets` every `interval` seconds (default: KEEPALIVE_FRACTION of the pool's
+    `keepalive_expiry`) until the returned task is cancelled.
+    """
+    if keepalive_expiry is None:
+        keepalive_expiry = DEFAULT_KEEPALIVE_EXPIRY
+    if interval is None:
+        interval = KEEPALIVE_FRACTION * keepalive_expiry
+    elif interval >= keepalive_expiry:
+        raise ValueError(
+            f"keepalive interval ({interval:g}s) must be below the pool's keepalive_expiry ({keepalive_expiry:g}s), "
+            "or idle connections expire between probes"
+        )
+
+    async def _loop() -> None:
+        while True:
+            await warmup(http_client, targets, connections)
+            await asyncio.sleep(interval)
+    return asyncio.ensure_future(_loop())
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from hchat_sdk import HChat
+from hchat_sdk.batch import BatchRunner
+from hchat_sdk.types.request import InputMessage
+from hchat_sdk.types.response import Choice, LLMResponse, Usage
+
+class FakeMessages:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def complete(self, model, input, **config):
+        self.calls.append(input)
+        await asyncio.sleep(self.delay)
+        if input == "fail":
+            raise ValueError("bad request")
+        return LLMResponse(
+            id="resp", model=model, created=0,
+            usage=Usage(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+            choices=[Choice(index=0, message=InputMessage(role="assistant", content=f"echo {input}"), finish_reason="stop")]
+        )
+
+def make_runner(fake, **kwargs):
+    client = HChat(api_key="test-key")
+    client.messages = fake
+    return BatchRunner(client, on_progress=lambda p: None, **kwargs)
+
+def write_input(path, n):
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({"id": f"q{i}", "model": "gpt-4o", "input": "fail" if i == 3 else f"prompt {i}", "max_tokens": 10}) + "\n")
+
+def read_output(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+@pytest.mark.asyncio
+async def test_batch_runs_all_records(tmp_path):
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(src, 20)
+
+    progress = await make_runner(FakeMessages(), concurrency=4).run(str(src), str(dst))
+
+    results = read_output(dst)
+    assert sorted(r["line"] for r in results) == list(range(20))
+    assert progress.completed == 19 and progress.failed == 1
+    assert next(r for r in results if r["id"] == "q3")["error"]["type"] == "ValueError"
+    assert progress.fraction == 1.0
+
+@pytest.mark.asyncio
+async def test_batch_resumes_without_redoing_work(tmp_path):
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(src, 30)
+
+    first = FakeMessages(delay=0.01)
+    task = asyncio.ensure_future(make_runner(first, concurrency=3).run(str(src), str(dst)))
+    while len(read_output(dst) if dst.exists() else []) < 10:
+        await asyncio.sleep(0.005)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    second = FakeMessages()
+    await make_runner(second, concurrency=3).run(str(src), str(dst))
+
+    # Every line appears exactly once: finished lines were not re-sent after the restart
+    lines = [r["line"] for r in read_output(dst)]
+    assert sorted(lines) == list(range(30))
+    assert len(second.calls) < 30
@@ -0,0 +1,145 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+
+API_BASE = "http://egress.local/v2/api"
+
+
+class AnthropicBatchServer:
+    """In-process stub of the Message Batches API; a batch ends after `polls` status checks."""
+
+    def __init__(self, polls=2):
+        self.polls = polls
+        self.submitted = None
+        self.paths = []
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        method, path = scope["method"], scope["path"]
+        self.paths.append(f"{method} {path}")
+        if method == "POST" and path.endswith("/claude/messages/batches"):
+            self.submitted = json.loads(body)
+            status, content = 200, self.batch("in_progress")
+        elif method == "GET" and path.endswith("/batches/msgbatch_1"):
+            self.polls -= 1
+            status, content = 200, self.batch("ended" if self.polls <= 0 else "in_progress")
+        elif path.endswith("/batches/msgbatch_1/results"):
+            status, content = 200, self.results()
+        else:
+            status, content = 404, b"{}"
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": content})
+
+    def batch(self, processing_status):
+        return json.dumps({
+            "id": "msgbatch_1", "type": "message_batch", "processing_status": processing_status,
+            "request_counts": {"processing": 0, "succeeded": 1, "errored": 1, "canceled": 0, "expired": 0},
+            "results_url": "/v2/api/claude/messages/batches/msgbatch_1/results" if processing_status == "ended" else None,
+        }).encode()
+
+    def results(self):
+        return "\n".join(json.dumps(line) for line in [
+            {"custom_id": "q1", "result": {"type": "succeeded", "message": {
+                "id": "msg_1", "model": "claude-sonnet-4-5", "stop_reason": "end_turn",
+                "content": [{"type": "text", "text": "Bonjour"}],
+                "usage": {"input_tokens": 4, "output_tokens": 2},
+            }}},
+            {"custom_id": "q2", "result": {"type": "errored", "error": {"type": "invalid_request_error"}}},
+        ]).encode()
+
+
+@pytest.mark.asyncio
+async def test_anthropic_batch_round_trip_against_stub_server(tmp_path):
+    server = AnthropicBatchServer(polls=2)
+    async with HChat(api_key="test-key", api_base=API_BASE, transport=httpx.ASGITransport(server)) as client:
+        job = await client.batches.create([
+            {"id": "q1", "input": "Say hello in French", "max_tokens": 64},
+            {"id": "q2", "messages": [{"role": "user", "content": "Hi"}], "system": "Be brief"},
+        ], model="claude-sonnet-4-5")
+        assert job.id == "msgbatch_1" and not job.done
+        job = await client.batches.wait(job, poll_interval=0.001)
+        path = tmp_path / "results.jsonl"
+        results = [r async for r in client.batches.results(job, path=str(path))]
+
+    requests = server.submitted["requests"]
+    assert [r["custom_id"] for r in requests] == ["q1", "q2"]
+    assert requests[0]["params"]["max_tokens"] == 64 and "stream" not in requests[0]["params"]
+    assert requests[1]["params"]["system"]
+    assert server.paths.count("GET /v2/api/claude/messages/batches/msgbatch_1") == 2
+
+    assert job.done and job.result_urls == [f"{API_BASE}/claude/messages/batches/msgbatch_1/results"]
+    ok, failed = results
+    assert ok.custom_id == "q1" and ok.status == "succeeded"
+    assert ok.response.choices[0].message.content[0].text == "Bonjour"
+    assert ok.response.usage.totalTokens == 6
+    assert failed.status == "errored" and failed.response is None
+    assert len(path.read_text().splitlines()) == 2  # kept on disk
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out():
+    server = AnthropicBatchServer(polls=100)
+    async with HChat(api_key="test-key", api_base=API_BASE, transport=httpx.ASGITransport(server)) as client:
+        job = await client.batches.create([{"id": "q1", "input": "Hi"}], model="claude-sonnet-4-5")
+        with pytest.raises(TimeoutError):
+            await client.batches.wait(job, poll_interval=0.01, timeout=0.05)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_azure_batch_uploads_jsonl_and_reads_output_and_error_files():
+    base = f"{API_BASE}/openai"
+    upload = respx.post(f"{base}/files").mock(return_value=httpx.Response(200, json={"id": "file-in"}))
+    created = respx.post(f"{base}/batches").mock(return_value=httpx.Response(
+        200, json={"id": "batch_1", "status": "validating"}
+    ))
+    respx.get(f"{base}/batches/batch_1").mock(return_value=httpx.Response(200, json={
+        "id": "batch_1", "status": "completed", "output_file_id": "file-out", "error_file_id": "file-err",
+        "request_counts": {"total": 2, "completed": 1, "failed": 1},
+    }))
+    output = {"custom_id": "a", "error": None, "response": {"status_code": 200, "body": {
+        "id": "c", "model": "gpt-4o", "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }}}
+    errors = {"custom_id": "b", "error": None, "response": {"status_code": 400, "body": {"error": {"code": "bad"}}}}
+    respx.get(f"{base}/files/file-out/content").mock(return_value=httpx.Response(200, content=json.dumps(output)))
+    respx.get(f"{base}/files/file-err/content").mock(return_value=httpx.Response(200, content=json.dumps(errors)))
+
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        job = await client.batches.create([
+            {"id": "a", "model": "gpt-4o", "input": "Hi"}, {"id": "b", "model": "gpt-4o", "input": "Hey"},
+        ])
+        job = await client.batches.wait(job, poll_interval=0.001)
+        results = [r async for r in client.batches.results(job)]
+
+    multipart = upload.calls[0].request.content.replace(b"\r\n", b"\n")
+    lines = [json.loads(line) for line in multipart.split(b"\n") if line.startswith(b"{")]
+    assert [line["url"] for line in lines] == ["/chat/completions"] * 2
+    assert lines[0]["body"]["model"] == "gpt-4o" and lines[0]["body"]["messages"][0]["content"] == "Hi"
+    assert json.loads(created.calls[0].request.content) == {
+        "input_file_id": "file-in", "endpoint": "/chat/completions", "completion_window": "24h"
+    }
+    assert job.request_counts == {"total": 2, "completed": 1, "failed": 1}
+    assert [(r.custom_id, r.status) for r in results] == [("a", "succeeded"), ("b", "errored")]
+    assert results[0].response.choices[0].message.content == "Hi"
+    assert results[1].error == {"code": "bad"}
+
+
+@pytest.mark.asyncio
+async def test_mixed_or_unsupported_batches_are_rejected():
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        with pytest.raises(ValueError, match="one provider and model"):
+            await client.batches.create([{"model": "gpt-4o", "input": "a"}, {"model": "gpt-5-mini", "input": "b"}])
+        with pytest.raises(ValueError, match="not supported"):
+            await client.batches.create([{"model": "gemini-2.5-flash", "input": "a"}])
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.capabilities import get_model_capability
+from hchat_sdk.cascade import Cascade, json_validator, tool_call_validator
+from hchat_sdk.types.response import LLMResponse
+
+def make_response(model, text):
+    return LLMResponse.model_validate({
+        "id": "r", "model": model, "created": 1,
+        "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+    })
+
+class FakeMessages:
+    """Stands in for Messages.complete: per-model answer and delay."""
+
+    def __init__(self, answers, delays=None):
+        self.answers = answers
+        self.delays = delays or {}
+        self.calls = []
+        self.cancelled = []
+
+    async def complete(self, model, input, **config):
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return make_response(model, answer)
+
+    def _capability(self, model):
+        return get_model_capability(model)
+
+MODELS = ["gpt-4o-mini", "gpt-4o"]
+
+@pytest.mark.asyncio
+async def test_cheap_answer_is_kept_when_valid():
+    messages = FakeMessages({"gpt-4o-mini": '{"total": 3}', "gpt-4o": '{"total": 3}'})
+    result = await Cascade(messages, MODELS, "q", json_validator({"type": "object", "required": ["total"]})).run()
+
+    assert (result.model, result.escalated, result.accepted) == ("gpt-4o-mini", False, True)
+    assert messages.calls == ["gpt-4o-mini"]
+    [stage] = result.stages
+    assert stage.latency is not None
+    # gpt-4o-mini: $0.15 / 1M input, $0.60 / 1M output
+    assert stage.cost == pytest.approx((100 * 0.15 + 50 * 0.60) / 1_000_000)
+
+@pytest.mark.asyncio
+async def test_escalates_when_rejected_or_failing():
+    messages = FakeMessages({"gpt-4o-mini": "not json", "gpt-4o": '{"total": 3}'})
+    result = await Cascade(messages, MODELS, "q", json_validator()).run()
+    assert (result.model, result.escalated) == ("gpt-4o", True)
+    assert [s.accepted for s in result.stages] == [False, True]
+    assert result.total_cost > result.stages[1].cost
+
+    messages = FakeMessages({"gpt-4o-mini": RuntimeError("boom"), "gpt-4o": "ok"})
+    result = await Cascade(messages, MODELS, "q", lambda r: True).run()
+    assert result.model == "gpt-4o"
+    assert result.stages[0].error == "RuntimeError: boom"
+
+@pytest.mark.asyncio
+async def test_all_rejected_returns_strongest_answer():
+    messages = FakeMessages({"gpt-4o-mini": "a", "gpt-4o": "b"})
+    result = await Cascade(messages, MODELS, "q", lambda r: False).run()
+    assert (result.model, result.accepted) == ("gpt-4o", False)
+
+@pytest.mark.asyncio
+async def test_hedge_races_next_stage_and_cancels_loser():
+    messages = FakeMessages({"gpt-4o-mini": "slow", "gpt-4o": "fast"}, delays={"gpt-4o-mini": 5})
+    result = await asyncio.wait_for(Cascade(messages, MODELS, "q", lambda r: True, hedge_after=0.01).run(), 1)
+
+    assert result.model == "gpt-4o"
+    assert messages.cancelled == ["gpt-4o-mini"]
+    assert result.stages[0].cancelled and result.stages[0].latency is None
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_messages_cascade_with_tool_call_validator():
+    def reply(model, tool):
+        message = {"role": "assistant", "content": None if tool else "I can't"}
+        if tool:
+            message["tool_calls"] = [{"id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": '{"q": "x"}'}}]
+        return httpx.Response(200, json={
+            "id": "c", "model": model, "created": 1,
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool else "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+    respx.post("https://api.test/openai/deployments/gpt-4o-mini/chat/completions").mock(return_value=reply("gpt-4o-mini", False))
+    respx.post("https://api.test/openai/deployments/gpt-4o/chat/completions").mock(return_value=reply("gpt-4o", True))
+
+    async with HChat(api_key="test-key", api_base="https://api.test") as client:
+        result = await client.messages.cascade(MODELS, "Look up x", validator=tool_call_validator("lookup"))
+
+    assert result.model == "gpt-4o"
+    assert result.response.choices[0].message.content[0].input == {"q": "x"}
@@ -0,0 +1,125 @@
+import json
+import time
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.capabilities import get_provider_for_model
+from hchat_sdk.catalog import ModelCatalog
+
+API_BASE = "https://api.test"
+
+CATALOG = {"data": [
+    {"model": "gpt-4o", "provider": "azure", "maxTokens": 4096, "contextWindow": 128000},
+    {"model": "gpt-6-preview", "provider": "azure", "maxTokens": 32768, "contextWindow": 1000000},
+    {"model": "claude-sonnet-4-5"},  # missing fields fall back to the static registry
+]}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_loaded_catalog_is_authoritative(tmp_path):
+    route = respx.get(f"{API_BASE}/models").mock(return_value=httpx.Response(200, json=CATALOG))
+
+    async with HChat(api_key="test-key", api_base=API_BASE, remote_catalog=True) as client:
+        # Before the catalog loads, routing falls back to the static registry
+        assert client.messages._provider_for("gemini-2.5-pro") == "google"
+        models = await client.models.list()
+        await client.models.retrieve("gpt-6-preview")
+
+        assert [m.model for m in models] == ["gpt-4o", "gpt-6-preview", "claude-sonnet-4-5"]
+        assert client.messages._provider_for("gpt-6-preview") == "azure"
+        with pytest.raises(ValueError):
+            client.messages._provider_for("gemini-2.5-pro")  # retired: not in the catalog
+        with pytest.raises(ValueError):
+            await client.models.retrieve("gemini-2.5-pro")
+
+    assert route.call_count == 1  # construction, list() and retrieve() shared one fetch
+    # The process-wide static registry is untouched
+    assert get_provider_for_model("gemini-2.5-pro") == "google"
+    with pytest.raises(ValueError):
+        get_provider_for_model("gpt-6-preview")
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_disk_cache_routes_at_construction(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    route = respx.get(f"{API_BASE}/models").mock(return_value=httpx.Response(200, json=CATALOG))
+    await ModelCatalog("test-key", API_BASE, cache_path=path).refresh()
+
+    # A new process: routing uses the cached catalog before any request, without a fetch
+    async with HChat(api_key="test-key", api_base=API_BASE, remote_catalog=True, catalog_path=path) as client:
+        assert client.messages._provider_for("gpt-6-preview") == "azure"
+        assert client.messages.catalog._refreshing is None
+        await client.models.list()
+    assert route.call_count == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stale_disk_cache_revalidates_at_construction(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({
+        "fetched_at": time.time() - 7200,
+        "models": [{"model": "gpt-old", "provider": "azure", "max_tokens": 4096, "context_window": 8000}],
+    }))
+    route = respx.get(f"{API_BASE}/models").mock(return_value=httpx.Response(200, json=CATALOG))
+
+    async with HChat(api_key="test-key", api_base=API_BASE, remote_catalog=True, catalog_path=str(path)) as client:
+        catalog = client.messages.catalog
+        assert client.messages._provider_for("gpt-old") == "azure"
+        assert catalog._refreshing is not None  # started by the constructor
+        await catalog._refreshing
+        assert route.call_count == 1
+        assert client.messages._provider_for("gpt-6-preview") == "azure"
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_catalogs_are_per_client():
+    respx.get(f"{API_BASE}/models").mock(return_value=httpx.Response(200, json=CATALOG))
+    respx.get("https://other.test/models").mock(return_value=httpx.Response(200, json={"data": [
+        {"model": "gpt-other", "provider": "azure", "maxTokens": 4096, "contextWindow": 8000},
+    ]}))
+
+    async with HChat(api_key="test-key", api_base=API_BASE, remote_catalog=True) as first, \
+            HChat(api_key="test-key", api_base="https://other.test", remote_catalog=True) as second:
+        await first.models.refresh()
+        await second.models.refresh()
+        assert first.messages._provider_for("gpt-6-preview") == "azure"
+        with pytest.raises(ValueError):
+            second.messages._provider_for("gpt-6-preview")
+        assert [m.model for m in await second.models.list()] == ["gpt-other"]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stale_copy_served_while_revalidating(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({
+        "fetched_at": time.time() - 7200,
+        "models": [{"model": "gpt-old", "provider": "azure", "max_tokens": 4096, "context_window": 8000}],
+    }))
+    route = respx.get(f"{API_BASE}/models").mock(return_value=httpx.Response(200, json=CATALOG))
+
+    catalog = ModelCatalog("test-key", API_BASE, ttl=3600, cache_path=str(path))
+    models = await catalog.get()
+    assert [m.model for m in models] == ["gpt-old"]
+
+    await catalog._refreshing
+    assert route.call_count == 1
+    assert "gpt-6-preview" in [m.model for m in catalog.models]
+    assert json.loads(path.read_text())["models"][1]["model"] == "gpt-6-preview"
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_failed_refresh_keeps_last_known_registry():
+    respx.get(f"{API_BASE}/models").mock(side_effect=[
+        httpx.Response(200, json=CATALOG),
+        httpx.Response(503),
+    ])
+    catalog = ModelCatalog("test-key", API_BASE)
+    await catalog.refresh()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await catalog.refresh()
+    assert isinstance(catalog.last_error, httpx.HTTPStatusError)
+    assert catalog.index["gpt-6-preview"].provider == "azure"
@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import importlib.util
+import json
+import sys
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.compression import RequestCompression
+
+API_BASE = "https://api.test"
+AZURE = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+LONG_PROMPT = "All work and no play makes Jack a dull boy. " * 2000
+
+def azure_completion():
+    return httpx.Response(200, json={
+        "id": "c", "model": "gpt-4o", "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    })
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_large_bodies_are_gzipped_and_counted():
+    route = respx.post(AZURE).mock(side_effect=lambda request: azure_completion())
+    async with HChat(api_key="test-key", api_base=API_BASE, compression=True) as client:
+        await client.messages.complete("gpt-4o", LONG_PROMPT)
+        await client.messages.complete("gpt-4o", "short")
+        [stats] = client.stats()
+
+    large, small = (call.request for call in route.calls)
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert "gzip" in large.headers["Accept-Encoding"]
+    assert json.loads(gzip.decompress(large.content))["messages"][0]["content"] == LONG_PROMPT
+    assert "Content-Encoding" not in small.headers  # below the threshold
+
+    assert stats.compression.count == 1
+    assert stats.bytes_sent < stats.request_bytes / 10
+    assert stats.bytes_received > 0
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_endpoint_rejecting_compression_falls_back_to_plain_json():
+    route = respx.post(AZURE).mock(side_effect=[
+        httpx.Response(415, json={"error": "unsupported content encoding"}), azure_completion(), azure_completion(),
+    ])
+    async with HChat(api_key="test-key", api_base=API_BASE, compression=True) as client:
+        response = await client.messages.complete("gpt-4o", LONG_PROMPT)
+        await client.messages.complete("gpt-4o", LONG_PROMPT)
+
+    assert response.choices[0].message.content == "Hi"
+    encodings = [call.request.headers.get("Content-Encoding") for call in route.calls]
+    assert encodings == ["gzip", None, None]  # remembered for the endpoint
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_rejection_is_remembered_per_origin_without_the_query():
+    gemini = httpx.Response(200, json={
+        "candidates": [{"content": {"parts": [{"text": "Hi"}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": 2, "totalTokenCount": 7},
+    })
+    route = respx.post(url__startswith=f"{API_BASE}/models/").mock(side_effect=[
+        httpx.Response(415, json={"error": "unsupported content encoding"}), gemini, gemini,
+    ])
+    compression = RequestCompression()
+    async with HChat(api_key="secret-key", api_base=API_BASE, compression=compression) as client:
+        await client.messages.complete("gemini-2.5-flash", LONG_PROMPT)
+        await client.messages.complete("gemini-2.5-pro", LONG_PROMPT)
+
+    encodings = [call.request.headers.get("Content-Encoding") for call in route.calls]
+    assert encodings == ["gzip", None, None]  # the other model on the same host skips the 415
+    assert compression._unsupported == {API_BASE}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    respx.post(AZURE).mock(return_value=azure_completion())
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def spy(fn, *args):
+        offloaded.append(len(args[0]))
+        return await to_thread(fn, *args)
+
+    monkeypatch.setattr("hchat_sdk.providers.base.asyncio.to_thread", spy)
+    compression = RequestCompression(threshold=1024, offload_threshold=64 * 1024)
+    async with HChat(api_key="test-key", api_base=API_BASE, compression=compression) as client:
+        await client.messages.complete("gpt-4o", LONG_PROMPT)
+        await client.messages.complete("gpt-4o", LONG_PROMPT[:2048])
+    assert len(offloaded) == 1 and offloaded[0] > 64 * 1024
+
+@respx.mock
+def test_sync_client_compresses_streams():
+    route = respx.post(AZURE).mock(return_value=httpx.Response(
+        200, text="data: [DONE]\n", headers={"content-type": "text/event-stream"}
+    ))
+    with SyncHChat(api_key="test-key", api_base=API_BASE, compression="gzip") as client:
+        list(client.messages.stream("gpt-4o", LONG_PROMPT))
+    assert route.calls[0].request.headers["Content-Encoding"] == "gzip"
+
+@pytest.mark.skipif(
+    sys.version_info >= (3, 14) or importlib.util.find_spec("zstandard") is not None,
+    reason="zstd is available"
+)
+def test_zstd_requires_zstandard():
+    with pytest.raises(ImportError, match="zstandard"):
+        RequestCompression("zstd")
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.concurrency import AdaptiveLimiter, ConcurrencyController
+
+API_BASE = "https://api.test"
+COMPLETIONS = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+def overloaded():
+    request = httpx.Request("POST", COMPLETIONS)
+    return httpx.HTTPStatusError("429", request=request, response=httpx.Response(429, request=request))
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_saturated_and_healthy():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4)
+    for _ in range(20):
+        held = int(limiter.limit)
+        for _ in range(held):
+            await limiter.acquire()
+        for _ in range(held):
+            limiter.release(latency=0.1)
+    assert limiter.limit == 4
+
+    # Not saturated: no growth
+    limiter = AdaptiveLimiter(initial_limit=4)
+    for _ in range(20):
+        await limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.limit == 4
+
+@pytest.mark.asyncio
+async def test_overload_halves_once_per_latency_window():
+    limiter = AdaptiveLimiter(initial_limit=16)
+    limiter.latency = 60.0  # one window covers the whole test
+    for _ in range(3):
+        await limiter.acquire()
+        limiter.release(overloaded=True)
+    assert limiter.limit == 8
+    assert limiter.overloads == 3
+
+@pytest.mark.asyncio
+async def test_latency_inflation_reduces_limit():
+    limiter = AdaptiveLimiter(initial_limit=10, smoothing=1.0)
+    await limiter.acquire()
+    limiter.release(latency=0.1)
+    await limiter.acquire()
+    limiter.release(latency=0.8)
+    assert limiter.limit == 5
+
+@pytest.mark.asyncio
+async def test_requests_queue_beyond_limit_and_stats_expose_it():
+    controller = ConcurrencyController(initial_limit=2)
+    release = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+        return "ok"
+
+    tasks = [asyncio.ensure_future(controller.run("azure", "gpt-4o", call)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    [stats] = controller.stats()
+    assert (stats.in_flight, stats.queued) == (2, 3)
+
+    # A cancelled waiter leaves the queue without taking a slot
+    tasks[-1].cancel()
+    await asyncio.sleep(0)
+    assert controller.stats()[0].queued == 2
+
+    release.set()
+    assert await asyncio.gather(*tasks[:-1]) == ["ok"] * 4
+    assert peak == 2
+    assert controller.stats()[0].in_flight == 0
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_messages_back_off_on_429():
+    respx.post(COMPLETIONS).mock(side_effect=[
+        httpx.Response(429),
+        httpx.Response(200, json={
+            "id": "chatcmpl-1", "model": "gpt-4o", "created": 1,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+        }),
+    ])
+    async with HChat(api_key="test-key", api_base=API_BASE, adaptive_concurrency=ConcurrencyController(initial_limit=8)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.messages.complete("gpt-4o", "Hello")
+        await client.messages.complete("gpt-4o", "Hello")
+        [stats] = client.messages.concurrency_controller.stats()
+
+    assert (stats.provider, stats.model) == ("azure", "gpt-4o")
+    assert stats.limit == 4
+    assert stats.overloads == 1
+    assert stats.latency is not None
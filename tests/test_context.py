@@ -0,0 +1,70 @@
+import pytest
+
+from hchat_sdk.context import DropOldMedia, LastTurns, RollingSummary, SlidingWindow
+from hchat_sdk.types.request import InputMessage
+from hchat_sdk.types.response import Choice, LLMResponse, Usage
+
+def make_history(turns):
+    history = [InputMessage(role="system", content="Be helpful.")]
+    for i in range(turns):
+        history.append(InputMessage(role="user", content=f"question {i}"))
+        history.append(InputMessage(role="assistant", content=f"answer {i}"))
+    return history
+
+class FakeMessages:
+    def __init__(self):
+        self.prompts = []
+
+    async def complete(self, model, input, **config):
+        self.prompts.append(input)
+        return LLMResponse(
+            id="summary", model=model, created=0,
+            usage=Usage(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+            choices=[Choice(index=0, message=InputMessage(role="assistant", content=f"summary #{len(self.prompts)}"), finish_reason="stop")]
+        )
+
+@pytest.mark.asyncio
+async def test_last_turns_keeps_system():
+    result = await LastTurns(2).apply(make_history(5), "gpt-4o", None)
+    assert [m.content for m in result] == ["Be helpful.", "question 3", "answer 3", "question 4", "answer 4"]
+
+@pytest.mark.asyncio
+async def test_sliding_window_starts_with_user():
+    history = make_history(50)
+    result = await SlidingWindow(max_tokens=60).apply(history, "gpt-4o", None)
+    assert result[0].role == "system"
+    assert result[1].role == "user"
+    assert result[-1].content == "answer 49"
+    assert len(result) < len(history)
+
+@pytest.mark.asyncio
+async def test_drop_old_media():
+    image = {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": "AAAA"}}
+    history = [
+        InputMessage(role="user", content=[{"type": "text", "text": "look"}, image]),
+        InputMessage(role="assistant", content=[{"type": "thinking", "thinking": "hmm"}, {"type": "text", "text": "a cat"}]),
+        InputMessage(role="user", content=[{"type": "text", "text": "again"}, image]),
+    ]
+    result = await DropOldMedia(keep_last_turns=1).apply(history, "claude-sonnet-4-5", None)
+    assert [b.type for b in result[0].content] == ["text", "text"]
+    assert [b.type for b in result[1].content] == ["text"]
+    assert [b.type for b in result[2].content] == ["text", "image"]
+
+@pytest.mark.asyncio
+async def test_rolling_summary_is_incremental():
+    fake = FakeMessages()
+    strategy = RollingSummary(keep_last_turns=2)
+
+    first = await strategy.apply(make_history(4), "gpt-4o", fake)
+    assert "summary #1" in first[1].content
+    assert len(fake.prompts) == 1
+
+    # Same prefix again: served from cache
+    await strategy.apply(make_history(4), "gpt-4o", fake)
+    assert len(fake.prompts) == 1
+
+    # One more turn: only the new turn is summarized on top of the previous summary
+    await strategy.apply(make_history(5), "gpt-4o", fake)
+    assert len(fake.prompts) == 2
+    assert "summary #1" in fake.prompts[1]
+    assert "question 0" not in fake.prompts[1]
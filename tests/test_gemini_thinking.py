@@ -0,0 +1,92 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, ProviderStreamError
+from hchat_sdk.concurrency import is_overload
+from hchat_sdk.providers.google import GoogleProvider
+from hchat_sdk.types.content import TextContent, ThinkingContent
+from hchat_sdk.types.request import InputMessage, LLMRequest
+
+API_BASE = "https://api.test"
+STREAM_URL = f"{API_BASE}/models/gemini-2.5-flash:streamGenerateContent"
+
+def sse(*chunks):
+    return "\n".join(["data: " + json.dumps(c) for c in chunks] + [""])
+
+def mock_stream(text):
+    return respx.post(url__startswith=STREAM_URL).mock(
+        return_value=httpx.Response(200, text=text, headers={"content-type": "text/event-stream"})
+    )
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_thoughts_and_signature_are_streamed():
+    mock_stream(sse(
+        {"candidates": [{"content": {"parts": [{"text": "Need the weather.", "thought": True}]}}]},
+        {"candidates": [{"content": {"parts": [{"text": " Call the tool.", "thought": True}]}}]},
+        {"candidates": [{"content": {"parts": [
+            {"functionCall": {"name": "get_weather", "args": {"city": "Seoul"}}, "thoughtSignature": "sig-1"}
+        ]}, "finishReason": "STOP"}],
+         "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 5, "thoughtsTokenCount": 7}},
+    ))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        chunks = [c async for c in client.messages.stream("gemini-2.5-flash", "Weather?", reasoning=True)]
+
+    events = [c.content for c in chunks if c.type == 'stream_delta']
+    assert [e.type for e in events] == [
+        'thinking_start', 'thinking_delta', 'thinking_delta', 'thinking_delta', 'thinking_end',
+        'tool_call_start', 'tool_call_delta', 'tool_call_end',
+    ]
+    assert "".join(e.thinking for e in events if e.type == 'thinking_delta') == "Need the weather. Call the tool."
+    assert events[3].signature == "sig-1"
+    assert chunks[-1].data["finishReason"] == "STOP"
+    assert chunks[-1].data["usage"]["reasoningTokens"] == 7
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_error_is_raised():
+    mock_stream(sse(
+        {"candidates": [{"content": {"parts": [{"text": "Hel"}]}}]},
+        {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}},
+    ))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        with pytest.raises(ProviderStreamError, match="overloaded") as exc:
+            async for _ in client.messages.stream("gemini-2.5-flash", "Hi"):
+                pass
+    assert is_overload(exc.value)  # backs off the adaptive limiter like an HTTP 503
+
+def make_request(messages):
+    return LLMRequest(
+        api_key="k", api_base=API_BASE, provider="google", model="gemini-2.5-flash", messages=messages
+    )
+
+def test_signature_is_returned_on_the_next_turn():
+    provider = GoogleProvider()
+    response = provider._map_complete_response({
+        "candidates": [{"content": {"parts": [
+            {"text": "thinking...", "thought": True},
+            {"functionCall": {"name": "get_weather", "args": {"city": "Seoul"}}, "thoughtSignature": "sig-1"},
+        ]}}],
+    }, make_request([InputMessage(role="user", content="Weather?")]))
+    blocks = response.choices[0].message.content
+    assert [b.type for b in blocks] == ['thinking', 'thinking', 'tool_use']
+    assert blocks[1].signature == "sig-1"
+
+    request = make_request([
+        InputMessage(role="user", content="Weather?"),
+        response.choices[0].message,
+        InputMessage(role="assistant", content=[
+            ThinkingContent(thinking="", signature="sig-2"), TextContent(text="It is sunny."),
+            ThinkingContent(thinking="", signature="sig-3"),
+        ]),
+    ])
+    contents = provider._convert_request(request)["contents"]
+    assert contents[1]["parts"] == [
+        {"functionCall": {"name": "get_weather", "args": {"city": "Seoul"}}, "thoughtSignature": "sig-1"}
+    ]
+    assert contents[2]["parts"] == [
+        {"text": "It is sunny.", "thoughtSignature": "sig-2"}, {"text": "", "thoughtSignature": "sig-3"}
+    ]
@@ -0,0 +1,119 @@
+import base64
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk.images import ImageFetcher
+from hchat_sdk.providers.anthropic import AnthropicProvider
+from hchat_sdk.types.request import LLMRequest
+
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_caches_and_revalidates():
+    route = respx.get("https://img.test/a.png").mock(side_effect=[
+        httpx.Response(200, content=PNG, headers={"content-type": "image/png", "etag": '"v1"'}),
+        httpx.Response(304),
+    ])
+    fetcher = ImageFetcher(httpx.AsyncClient(), revalidate_after=0.0)
+
+    first = await fetcher.fetch("https://img.test/a.png")
+    assert first.media_type == "image/png"
+    assert base64.b64decode(first.data) == PNG
+
+    second = await fetcher.fetch("https://img.test/a.png")
+    assert second.data == first.data
+    assert route.calls.last.request.headers["if-none-match"] == '"v1"'
+    assert route.call_count == 2
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_many_dedupes_and_sniffs_type():
+    route = respx.get("https://img.test/b").mock(
+        return_value=httpx.Response(200, content=PNG, headers={"content-type": "application/octet-stream"})
+    )
+    fetcher = ImageFetcher(httpx.AsyncClient())
+
+    images = await fetcher.fetch_many(["https://img.test/b", "https://img.test/b"])
+    assert images["https://img.test/b"].media_type == "image/png"
+    assert route.call_count == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_anthropic_inlines_url_images():
+    respx.get("https://img.test/c.png").mock(
+        return_value=httpx.Response(200, content=PNG, headers={"content-type": "image/png"})
+    )
+    provider = AnthropicProvider()
+    request = LLMRequest(
+        api_key="test-key",
+        api_base="https://api.test",
+        provider="anthropic",
+        model="claude-sonnet-4-5",
+        messages=[{"role": "user", "content": [
+            {"type": "text", "text": "What is this?"},
+            {"type": "image", "source": {"type": "url", "url": "https://img.test/c.png"}},
+        ]}],
+    )
+
+    request = await provider._inline_url_images(request)
+    payload = provider._convert_request(request, stream=False)
+    image = payload["messages"][0]["content"][1]
+    assert image["source"]["type"] == "base64"
+    assert image["source"]["media_type"] == "image/png"
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_inlined_url_images_keep_cache_control():
+    respx.get("https://img.test/d.png").mock(
+        return_value=httpx.Response(200, content=PNG, headers={"content-type": "image/png"})
+    )
+    provider = AnthropicProvider()
+    request = LLMRequest(
+        api_key="test-key",
+        api_base="https://api.test",
+        provider="anthropic",
+        model="claude-sonnet-4-5",
+        messages=[{"role": "user", "content": [
+            {"type": "image", "source": {"type": "url", "url": "https://img.test/d.png"},
+             "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "What is this?"},
+        ]}],
+    )
+
+    request = await provider._inline_url_images(request)
+    payload = provider._convert_request(request, stream=False)
+    image = payload["messages"][0]["content"][0]
+    assert image["source"]["type"] == "base64"
+    assert image["cache_control"] == {"type": "ephemeral"}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_oversized_images_are_rejected_without_reading_the_body():
+    sent = []
+
+    async def body():
+        for _ in range(100):
+            sent.append(1)
+            yield b"\0" * 1024
+
+    respx.get("https://img.test/declared.png").mock(
+        return_value=httpx.Response(200, headers={"content-length": str(50 * 1024 * 1024)}, content=b"")
+    )
+    respx.get("https://img.test/chunked.png").mock(return_value=httpx.Response(200, content=body()))
+    fetcher = ImageFetcher(httpx.AsyncClient(), max_image_bytes=4 * 1024)
+
+    with pytest.raises(ValueError, match="too large"):
+        await fetcher.fetch("https://img.test/declared.png")
+    with pytest.raises(ValueError, match="too large"):
+        await fetcher.fetch("https://img.test/chunked.png")
+    assert len(sent) < 10
+
+@respx.mock
+def test_sync_fetch_caps_streamed_body():
+    respx.get("https://img.test/big.png").mock(return_value=httpx.Response(200, content=PNG * 1000))
+    fetcher = ImageFetcher(sync_http_client=httpx.Client(), max_image_bytes=1024)
+    with pytest.raises(ValueError, match="too large"):
+        fetcher.fetch_sync("https://img.test/big.png")
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).parent.parent / "src")
+
+# Cumulative `import hchat_sdk` budget in microseconds; override on slow CI machines
+IMPORT_BUDGET_US = int(os.getenv("HCHAT_IMPORT_BUDGET_US", "50000"))
+
+def run(code, *flags):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.getenv("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *flags, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+def cumulative_us(importtime_log, module):
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+def test_import_is_within_budget():
+    result = run("import hchat_sdk", "-X", "importtime")
+    assert cumulative_us(result.stderr, "hchat_sdk") < IMPORT_BUDGET_US
+
+def test_import_defers_heavy_dependencies():
+    result = run(
+        "import sys, hchat_sdk\n"
+        "print(sorted(m for m in ('httpx', 'pydantic', 'hchat_sdk.client') if m in sys.modules))"
+    )
+    assert result.stdout.strip() == "[]"
+
+def test_client_import_is_within_budget():
+    # -X importtime does not report modules loaded through importlib, so time it directly
+    result = run(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "from hchat_sdk import HChat\n"
+        "print(int((time.perf_counter() - start) * 1e6))"
+    )
+    assert int(result.stdout) < IMPORT_BUDGET_US
+
+def test_client_import_defers_heavy_dependencies():
+    result = run(
+        "import sys\n"
+        "from hchat_sdk import HChat, SyncHChat\n"
+        "print(sorted(m for m in sys.modules if m in ('httpx', 'pydantic') or m.startswith('hchat_sdk.')))"
+    )
+    assert result.stdout.strip() == "['hchat_sdk.client']"
+
+def test_client_construction_loads_only_core_modules():
+    result = run(
+        "import sys\n"
+        "from hchat_sdk import HChat, SyncHChat\n"
+        "HChat(api_key='k')\n"
+        "SyncHChat(api_key='k')\n"
+        "print(sorted(m for m in sys.modules if m.startswith('hchat_sdk.')))"
+    )
+    assert eval(result.stdout) == [
+        "hchat_sdk.capabilities", "hchat_sdk.client", "hchat_sdk.errors", "hchat_sdk.metrics",
+        "hchat_sdk.resources", "hchat_sdk.resources.messages", "hchat_sdk.resources.models",
+        "hchat_sdk.transport", "hchat_sdk.types", "hchat_sdk.types.content",
+        "hchat_sdk.types.request", "hchat_sdk.types.response",
+    ]
+
+def test_only_the_used_provider_is_loaded():
+    result = run(
+        "import sys\n"
+        "from hchat_sdk import HChat\n"
+        "client = HChat(api_key='k')\n"
+        "client.messages._get_provider_instance('anthropic')\n"
+        "print(sorted(m.rsplit('.', 1)[1] for m in sys.modules if m.startswith('hchat_sdk.providers.')))"
+    )
+    assert result.stdout.strip() == "['anthropic', 'base']"
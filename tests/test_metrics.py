@@ -0,0 +1,91 @@
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.metrics import MetricsRecorder, StreamingHistogram
+
+API_BASE = "https://api.test"
+
+ANTHROPIC_SSE = "\n".join([
+    'data: {"type": "message_start", "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 12}}}',
+    'data: {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}',
+    'data: {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hello"}}',
+    'data: {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": " there"}}',
+    'data: {"type": "content_block_stop", "index": 0}',
+    'data: {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 3}}',
+    'data: {"type": "message_stop"}',
+    "",
+])
+
+def test_histogram_quantiles_with_fixed_memory():
+    h = StreamingHistogram()
+    buckets = len(h.counts)
+    for ms in range(1, 10001):
+        h.record(ms / 1000)
+    assert len(h.counts) == buckets
+    assert h.quantile(0.5) == pytest.approx(5.0, rel=0.03)
+    assert h.quantile(0.99) == pytest.approx(9.9, rel=0.03)
+    assert h.summary().max == 10.0
+    assert h.summary().mean == pytest.approx(5.0005)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_records_ttft_inter_token_and_throughput():
+    respx.post(f"{API_BASE}/claude/messages").mock(
+        return_value=httpx.Response(200, text=ANTHROPIC_SSE, headers={"content-type": "text/event-stream"})
+    )
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        async for _ in client.messages.stream("claude-sonnet-4-5", "Hi"):
+            pass
+        [stats] = client.stats()
+
+    assert (stats.provider, stats.model, stats.requests, stats.errors) == ("anthropic", "claude-sonnet-4-5", 1, 0)
+    assert stats.ttft.count == 1 and stats.inter_token.count == 1
+    assert stats.total.count == 1 and stats.total.p50 >= stats.ttft.p50
+    assert stats.tokens_per_second.count == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_closed_early_is_still_timed():
+    respx.post(f"{API_BASE}/claude/messages").mock(
+        return_value=httpx.Response(200, text=ANTHROPIC_SSE, headers={"content-type": "text/event-stream"})
+    )
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        async with client.messages.stream("claude-sonnet-4-5", "Hi") as stream:
+            async for chunk in stream:
+                if chunk.type == 'stream_delta' and chunk.content.type == 'text_delta':
+                    break
+        [stats] = client.stats()
+
+    assert (stats.requests, stats.errors) == (1, 0)
+    assert stats.ttft.count == 1 and stats.total.count == 1
+
+@respx.mock
+def test_errors_and_prometheus_export():
+    respx.post(f"{API_BASE}/openai/deployments/gpt-4o/chat/completions").mock(side_effect=[
+        httpx.Response(200, json={
+            "id": "c", "model": "gpt-4o", "created": 1,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+        }),
+        httpx.Response(503, json={"error": "overloaded"}),
+    ])
+    recorder = MetricsRecorder()
+    with SyncHChat(api_key="test-key", api_base=API_BASE, metrics=recorder) as client:
+        client.messages.complete("gpt-4o", "Hello")
+        with pytest.raises(httpx.HTTPStatusError):
+            client.messages.complete("gpt-4o", "Hello")
+        [stats] = client.stats()
+
+    assert (stats.requests, stats.errors, stats.error_rate) == (2, 1, 0.5)
+    assert stats.ttft.count == 0 and stats.total.count == 1
+    text = recorder.to_prometheus()
+    assert '# TYPE hchat_request_duration_seconds summary' in text
+    assert 'hchat_request_duration_seconds_count{provider="azure",model="gpt-4o"} 1' in text
+    assert 'hchat_errors_total{provider="azure",model="gpt-4o"} 1' in text
+    assert 'hchat_request_duration_seconds{provider="azure",model="gpt-4o",quantile="0.99"}' in text
+
+def test_metrics_can_be_disabled():
+    client = SyncHChat(api_key="test-key", metrics=False)
+    assert client.messages.metrics is None and client.stats() == []
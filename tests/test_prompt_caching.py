@@ -0,0 +1,61 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.providers.anthropic import AnthropicProvider
+from hchat_sdk.types.request import InputMessage, LLMRequest
+
+TOOLS = [{"type": "function", "name": "lookup", "description": "Look up a record", "parameters": {"type": "object"}}]
+
+def make_request(**kwargs):
+    return LLMRequest(
+        api_key="test-key",
+        api_base="https://api.test",
+        provider="anthropic",
+        model="claude-sonnet-4-5",
+        messages=[
+            {"role": "user", "content": "first question"},
+            {"role": "assistant", "content": "first answer"},
+            {"role": "user", "content": "second question"},
+        ],
+        system="You are a very long system prompt.",
+        tools=TOOLS,
+        **kwargs
+    )
+
+def test_auto_breakpoints():
+    payload = AnthropicProvider()._convert_request(make_request(prompt_caching=True), stream=False)
+    assert payload["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert payload["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert payload["messages"][0]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert payload["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in payload["messages"][1]["content"][-1]
+
+def test_explicit_markers_without_auto_mode():
+    request = make_request()
+    request.messages[0] = InputMessage(role="user", content=[
+        {"type": "text", "text": "big document", "cache_control": {"type": "ephemeral"}}
+    ])
+    payload = AnthropicProvider()._convert_request(request, stream=False)
+    assert payload["messages"][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert payload["system"] == "You are a very long system prompt."
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_cache_usage_is_reported():
+    respx.post("https://api.test/claude/messages").mock(return_value=httpx.Response(200, json={
+        "id": "msg_1",
+        "model": "claude-sonnet-4-5",
+        "content": [{"type": "text", "text": "hi"}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 10, "cache_read_input_tokens": 2000, "cache_creation_input_tokens": 0, "output_tokens": 5},
+    }))
+    client = HChat(api_key="test-key", api_base="https://api.test")
+    response = await client.messages.complete("claude-sonnet-4-5", "hi", prompt_caching=True)
+    assert response.usage.cacheReadTokens == 2000
+    assert response.usage.promptTokens == 2010
+    sent = json.loads(respx.calls.last.request.content)
+    assert sent["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
@@ -0,0 +1,45 @@
+import pytest
+
+from hchat_sdk import HChat
+
+def payload(model, **config):
+    client = HChat(api_key="test-key", api_base="https://api.test")
+    provider, request, _ = client.messages._build_request(model, "Hello", config, stream=False)
+    if request.provider == "google":
+        return provider._convert_request(request)
+    return provider._convert_request(request, stream=False)
+
+def test_azure_reasoning_effort():
+    assert "reasoning_effort" not in payload("gpt-4o")
+    assert "reasoning_effort" not in payload("gpt-4o", reasoning=True)  # not a reasoning model
+    assert payload("gpt-5-mini")["reasoning_effort"] == "minimal"  # registry default
+    assert payload("gpt-5-mini", reasoning=True)["reasoning_effort"] == "high"
+    assert payload("gpt-5-mini", reasoning_effort="medium")["reasoning_effort"] == "medium"
+    assert payload("gpt-5-mini", reasoning_budget=3000)["reasoning_effort"] == "medium"
+
+def test_anthropic_thinking_budget():
+    assert "thinking" not in payload("claude-sonnet-4-5")
+    assert payload("claude-sonnet-4-5", reasoning=True)["thinking"] == {"type": "enabled", "budget_tokens": 1024}
+    sent = payload("claude-sonnet-4-5", reasoning_effort="medium", max_tokens=8192, temperature=0.2)
+    assert sent["thinking"]["budget_tokens"] == 4096
+    assert "temperature" not in sent
+    # Budgets are clamped to the API minimum and kept below max_tokens
+    assert payload("claude-sonnet-4-5", reasoning_budget=200)["thinking"]["budget_tokens"] == 1024
+    assert payload("claude-sonnet-4-5", reasoning_effort="high", max_tokens=8192)["thinking"]["budget_tokens"] == 4096
+    assert "thinking" not in payload("claude-sonnet-4-5", reasoning_effort="minimal", temperature=0.2)
+    assert "thinking" not in payload("claude-3-5-sonnet-v2", reasoning=True)
+
+def test_gemini_thinking_budget():
+    assert payload("gemini-2.5-flash")["generationConfig"]["thinkingConfig"] == {"includeThoughts": False, "thinkingBudget": 1024}
+    assert payload("gemini-2.5-flash", reasoning_budget=2048)["generationConfig"]["thinkingConfig"] == {
+        "includeThoughts": True, "thinkingBudget": 2048
+    }
+    assert payload("gemini-2.5-flash", reasoning=False)["generationConfig"]["thinkingConfig"]["thinkingBudget"] == 0
+    assert payload("gemini-2.5-pro", reasoning=False)["generationConfig"]["thinkingConfig"]["thinkingBudget"] == 128
+    assert "thinkingConfig" not in payload("gemini-2.0-flash", reasoning=True)["generationConfig"]
+
+def test_invalid_reasoning_options_are_rejected():
+    with pytest.raises(ValueError):
+        payload("gpt-5-mini", reasoning_effort="extreme")
+    with pytest.raises(ValueError):
+        payload("gpt-5-mini", reasoning_budget=-1)
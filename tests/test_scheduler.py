@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, QueueTimeoutError
+from hchat_sdk.scheduler import RequestScheduler
+
+API_BASE = "https://api.test"
+
+async def occupy(scheduler, n):
+    """Take n slots directly; returns a function that frees them."""
+    for _ in range(n):
+        await scheduler.acquire()
+    return lambda: [scheduler.release() for _ in range(n)]
+
+async def run_queued(scheduler, jobs, log):
+    async def job(name, **kwargs):
+        await scheduler.run(lambda: asyncio.sleep(0), **kwargs)
+        log.append(name)
+    tasks = [asyncio.ensure_future(job(name, **kwargs)) for name, kwargs in jobs]
+    await asyncio.sleep(0)
+    return tasks
+
+@pytest.mark.asyncio
+async def test_interactive_is_served_before_queued_batch():
+    scheduler = RequestScheduler(max_concurrency=1)
+    free = await occupy(scheduler, 1)
+    log = []
+    tasks = await run_queued(scheduler, [
+        ("b1", {"priority": "batch"}),
+        ("b2", {"priority": "batch"}),
+        ("i1", {"priority": "interactive"}),
+    ], log)
+    assert scheduler.stats().queued == {"interactive": 1, "batch": 2}
+
+    free()
+    await asyncio.gather(*tasks)
+    assert log == ["i1", "b1", "b2"]
+
+@pytest.mark.asyncio
+async def test_tenants_share_by_weight():
+    scheduler = RequestScheduler(max_concurrency=1, tenant_weights={"search": 2.0})
+    free = await occupy(scheduler, 1)
+    log = []
+    jobs = [("etl", {"tenant": "etl", "priority": "batch"})] * 6 + [("search", {"tenant": "search", "priority": "batch"})] * 6
+    tasks = await run_queued(scheduler, jobs, log)
+
+    free()
+    await asyncio.gather(*tasks)
+    # Weight 2 gets two slots for every one while both tenants have work queued
+    assert log[:9].count("search") == 6
+    assert log[:9].count("etl") == 3
+
+@pytest.mark.asyncio
+async def test_batch_uses_idle_capacity_but_not_reserved_slots():
+    scheduler = RequestScheduler(max_concurrency=3, reserved_interactive=1)
+    await scheduler.acquire(priority="batch")
+    await scheduler.acquire(priority="batch")
+
+    third = asyncio.ensure_future(scheduler.acquire(priority="batch"))
+    await asyncio.sleep(0)
+    assert not third.done()
+
+    # The reserved slot is still free for interactive traffic
+    await asyncio.wait_for(scheduler.acquire(priority="interactive"), 1)
+    assert scheduler.in_flight == 3
+
+    scheduler.release()  # interactive done; batch still capped at 2
+    await asyncio.sleep(0)
+    assert not third.done()
+    scheduler.release()
+    await asyncio.wait_for(third, 1)
+
+@pytest.mark.asyncio
+async def test_stale_requests_are_dropped():
+    scheduler = RequestScheduler(max_concurrency=1)
+    free = await occupy(scheduler, 1)
+
+    with pytest.raises(QueueTimeoutError):
+        await scheduler.acquire(tenant="etl", queue_timeout=0.01)
+    assert scheduler.stats().dropped == 1
+
+    # The dropped ticket does not block later requests
+    free()
+    await asyncio.wait_for(scheduler.acquire(), 1)
+
+@pytest.mark.asyncio
+async def test_finish_tags_are_dropped_once_tenants_are_served():
+    scheduler = RequestScheduler(max_concurrency=1, tenant_weights={"search": 2.0})
+    free = await occupy(scheduler, 1)
+    log = []
+    jobs = [(f"t{i}", {"tenant": f"t{i}", "priority": "batch"}) for i in range(50)]
+    tasks = await run_queued(scheduler, jobs + [("search", {"tenant": "search"})] * 3, log)
+    with pytest.raises(QueueTimeoutError):
+        await scheduler.acquire(tenant="gone", priority="batch", queue_timeout=0.01)
+
+    free()
+    await asyncio.gather(*tasks)
+    assert len(log) == 53
+    assert scheduler._finish_tags == {}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_messages_pass_priority_and_tenant_to_scheduler():
+    respx.post(f"{API_BASE}/openai/deployments/gpt-4o/chat/completions").mock(return_value=httpx.Response(200, json={
+        "id": "chatcmpl-1", "model": "gpt-4o", "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+    }))
+    scheduler = RequestScheduler(max_concurrency=1)
+    free = await occupy(scheduler, 1)
+
+    async with HChat(api_key="test-key", api_base=API_BASE, scheduler=scheduler) as client:
+        pending = asyncio.ensure_future(client.messages.complete("gpt-4o", "Hello", priority="batch", tenant="etl"))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats().queued_by_tenant == {"etl": 1}
+
+        free()
+        response = await asyncio.wait_for(pending, 1)
+
+    assert response.choices[0].message.content == "Hi"
+    assert scheduler.in_flight == 0
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.singleflight import SingleFlight
+from hchat_sdk.usage import UsageTracker
+
+API_BASE = "https://api.test"
+COMPLETIONS = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+def completion(text):
+    return httpx.Response(200, json={
+        "id": "chatcmpl-1",
+        "model": "gpt-4o",
+        "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    })
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_identical_completes_share_one_upstream_call():
+    route = respx.post(COMPLETIONS).mock(return_value=completion("Hi!"))
+
+    async with HChat(api_key="test-key", api_base=API_BASE, coalesce=True) as client:
+        responses = await asyncio.gather(*(client.messages.complete("gpt-4o", "Hello") for _ in range(5)))
+        assert client.messages.single_flight.in_flight == 0
+
+        # Different parameters are a different request
+        await asyncio.gather(
+            client.messages.complete("gpt-4o", "Hello", temperature=0.1),
+            client.messages.complete("gpt-4o", "Hello", temperature=0.9),
+        )
+
+    assert route.call_count == 3
+    assert {r.choices[0].message.content for r in responses} == {"Hi!"}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_tenants_are_not_coalesced_together():
+    route = respx.post(COMPLETIONS).mock(return_value=completion("Hi!"))
+    tracker = UsageTracker()
+
+    async with HChat(api_key="test-key", api_base=API_BASE, coalesce=True, usage_tracker=tracker) as client:
+        await asyncio.gather(
+            client.messages.complete("gpt-4o", "Hello", tenant="a"),
+            client.messages.complete("gpt-4o", "Hello", tenant="a"),
+            client.messages.complete("gpt-4o", "Hello", tenant="b"),
+        )
+
+    assert route.call_count == 2
+    assert sorted(t.tenant for t in tracker.snapshot().totals) == ["a", "b"]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_coalescing_is_opt_in_per_call():
+    route = respx.post(COMPLETIONS).mock(return_value=completion("Hi!"))
+
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        await asyncio.gather(*(client.messages.complete("gpt-4o", "Hello") for _ in range(3)))
+        assert route.call_count == 3
+
+        await asyncio.gather(*(client.messages.complete("gpt-4o", "Hello", coalesce=True) for _ in range(3)))
+        assert route.call_count == 4
+
+@pytest.mark.asyncio
+async def test_stream_subscribers_share_and_replay():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def upstream():
+        nonlocal started
+        started += 1
+        yield "a"
+        await release.wait()
+        yield "b"
+        yield "c"
+
+    async def consume():
+        return [chunk async for chunk in flight.stream("k", upstream)]
+
+    first = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.01)
+    # Joins after "a" was produced and still receives it
+    second = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await first == ["a", "b", "c"]
+    assert await second == ["a", "b", "c"]
+    assert started == 1
+    assert flight.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_upstream_cancelled_only_when_last_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    first = asyncio.ensure_future(flight.do("k", slow))
+    second = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+
+    second.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0.01)
+    assert flight.in_flight == 0
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.usage import UsageTracker
+
+API_BASE = "https://api.test"
+AZURE_STREAM = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+def azure_sse(*texts, done=True):
+    lines = ["data: " + json.dumps({"id": "c", "model": "gpt-4o", "choices": [{"index": 0, "delta": {"content": t}}]})
+             for t in texts]
+    if done:
+        lines.append("data: " + json.dumps({"id": "c", "model": "gpt-4o", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+        lines.append("data: " + json.dumps({"id": "c", "model": "gpt-4o", "choices": [],
+                                            "usage": {"prompt_tokens": 9, "completion_tokens": 4, "total_tokens": 13}}))
+        lines.append("data: [DONE]")
+    return "\n".join(lines + [""])
+
+
+class HangingStream(httpx.AsyncByteStream):
+    """Sends `head`, then stalls until closed, like a model that keeps generating."""
+
+    def __init__(self, head: str):
+        self.head = head.encode()
+        self.closed = False
+
+    async def __aiter__(self):
+        yield self.head
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stop_condition_closes_stream_with_estimated_usage():
+    respx.post(AZURE_STREAM).mock(return_value=httpx.Response(
+        200, text=azure_sse("<answer>42", "</answer>", " and more"), headers={"content-type": "text/event-stream"}
+    ))
+    tracker = UsageTracker()
+    async with HChat(api_key="test-key", api_base=API_BASE, usage_tracker=tracker) as client:
+        stream = client.messages.stream("gpt-4o", "Answer?", stop_when=r"</answer>")
+        chunks = [c async for c in stream]
+
+    texts = [c.content.text for c in chunks if c.type == 'stream_delta' and c.content.type == 'text_delta']
+    assert texts == ["<answer>42", "</answer>"]
+    stop = chunks[-1]
+    assert stop.type == 'stream_stop' and stop.data["finishReason"] == "stop_condition"
+    assert stop.data["usageEstimated"] is True
+    assert stream.stop_reason == "stop_condition" and stream.usage.completionTokens > 0
+    [totals] = tracker.snapshot().totals
+    assert totals.prompt_tokens == stream.usage.promptTokens
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_cancel_from_another_task_releases_the_connection():
+    body = HangingStream(azure_sse("Hello", done=False))
+    respx.post(AZURE_STREAM).mock(return_value=httpx.Response(
+        200, stream=body, headers={"content-type": "text/event-stream"}
+    ))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        stream = client.messages.stream("gpt-4o", "Hi")
+        first_text = asyncio.Event()
+        chunks = []
+
+        async def consume():
+            async for chunk in stream:
+                chunks.append(chunk)
+                if chunk.type == 'stream_delta' and chunk.content.type == 'text_delta':
+                    first_text.set()
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.wait_for(first_text.wait(), 1)
+        await asyncio.wait_for(stream.cancel(), 1)
+        assert body.closed
+        await asyncio.wait_for(consumer, 1)  # finishes normally rather than raising CancelledError
+
+    assert chunks[-1].data["finishReason"] == "cancelled"
+    assert stream.usage.completionTokens == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_leaving_async_with_after_a_full_stream_keeps_provider_usage():
+    respx.post(AZURE_STREAM).mock(return_value=httpx.Response(
+        200, text=azure_sse("Hi"), headers={"content-type": "text/event-stream"}
+    ))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        async with client.messages.stream("gpt-4o", "Hi") as stream:
+            async for chunk in stream:
+                if chunk.type == 'stream_stop':
+                    break
+    assert stream.stop_reason is None and stream.usage.totalTokens == 13
+
+@respx.mock
+def test_sync_stream_stops_on_predicate():
+    respx.post(AZURE_STREAM).mock(return_value=httpx.Response(
+        200, text=azure_sse("one ", "two ", "three"), headers={"content-type": "text/event-stream"}
+    ))
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        with client.messages.stream("gpt-4o", "Count", stop_when=lambda text: "two" in text) as stream:
+            chunks = list(stream)
+
+    assert stream.text == "one two "
+    assert chunks[-1].data["finishReason"] == "stop_condition"
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from hchat_sdk import HChat
+from hchat_sdk.types.response import StreamDelta, StreamStart, StreamStop, TextDelta
+
+class FakeStreams:
+    """Stands in for Messages.stream: one text delta per word of the input."""
+
+    def __init__(self):
+        self.open = 0
+        self.peak = 0
+        self.closed = []
+
+    async def stream(self, model, input, **config):
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        try:
+            if input == "boom":
+                raise RuntimeError("upstream failed")
+            yield StreamStart(type="stream_start", data={"model": model})
+            for word in input.split():
+                await asyncio.sleep(0)
+                yield StreamDelta(type="stream_delta", content=TextDelta(type="text_delta", text=word))
+            yield StreamStop(type="stream_stop", data={"finishReason": "stop"})
+        finally:
+            self.open -= 1
+            self.closed.append(input)
+
+def make_client():
+    client = HChat(api_key="test-key")
+    fake = FakeStreams()
+    client.messages.stream = fake.stream
+    return client, fake
+
+@pytest.mark.asyncio
+async def test_stream_many_fans_in_with_bounded_concurrency():
+    client, fake = make_client()
+    requests = [{"id": f"r{i}", "model": "gpt-4o", "input": "a b c d"} for i in range(6)]
+
+    texts = {}
+    async with client.messages.stream_many(requests, max_concurrency=2, buffer_size=1) as mux:
+        async for request_id, chunk in mux:
+            if chunk.type == "stream_delta":
+                texts[request_id] = texts.get(request_id, "") + chunk.content.text
+
+    assert texts == {f"r{i}": "abcd" for i in range(6)}
+    assert fake.peak <= 2
+
+@pytest.mark.asyncio
+async def test_stream_many_reports_errors_per_stream():
+    client, _ = make_client()
+    requests = [{"id": "ok", "model": "gpt-4o", "input": "x y"}, {"id": "bad", "model": "gpt-4o", "input": "boom"}]
+
+    events = [(rid, chunk.type) async for rid, chunk in client.messages.stream_many(requests)]
+    assert ("bad", "error") in events
+    assert ("ok", "stream_stop") in events
+
+@pytest.mark.asyncio
+async def test_stream_many_cancel_and_early_exit():
+    client, fake = make_client()
+    requests = [{"id": str(i), "model": "gpt-4o", "input": " ".join(["w"] * 50)} for i in range(4)]
+
+    seen = set()
+    async with client.messages.stream_many(requests, buffer_size=2) as mux:
+        async for request_id, chunk in mux:
+            if request_id == "0":
+                mux.cancel("0")
+            seen.add(request_id)
+            if len(seen) == 4:
+                break
+
+    assert fake.open == 0
+    assert len(fake.closed) == 4
@@ -0,0 +1,168 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.providers.azure import AzureProvider
+from hchat_sdk.providers.base import CONTINUE_PROMPT
+from hchat_sdk.resume import strip_seam
+from hchat_sdk.types.request import LLMRequest
+from hchat_sdk.usage import UsageTracker
+
+API_BASE = "https://api.test"
+ANTHROPIC = f"{API_BASE}/claude/messages"
+AZURE = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+def sse(*events):
+    return "\n".join(["data: " + json.dumps(e) for e in events] + [""])
+
+def anthropic_text(*texts, output_tokens=5):
+    return sse(
+        {"type": "message_start", "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 20}}},
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        *[{"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": t}} for t in texts],
+        {"type": "content_block_stop", "index": 0},
+        {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": output_tokens}},
+        {"type": "message_stop"},
+    )
+
+def azure_text(*texts):
+    return sse(
+        *[{"id": "c", "model": "gpt-4o", "choices": [{"index": 0, "delta": {"content": t}}]} for t in texts],
+        {"id": "c", "model": "gpt-4o", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+        {"id": "c", "model": "gpt-4o", "choices": [], "usage": {"prompt_tokens": 30, "completion_tokens": 6, "total_tokens": 36}},
+    )
+
+
+class DroppedStream(httpx.AsyncByteStream, httpx.SyncByteStream):
+    """Sends `head`, then the connection resets."""
+
+    def __init__(self, head: str):
+        self.head = head.encode()
+
+    async def __aiter__(self):
+        yield self.head
+        raise httpx.ReadError("connection reset by peer")
+
+    def __iter__(self):
+        yield self.head
+        raise httpx.ReadError("connection reset by peer")
+
+
+def dropped(head):
+    return httpx.Response(200, stream=DroppedStream(head), headers={"content-type": "text/event-stream"})
+
+def event_stream(text):
+    return httpx.Response(200, text=text, headers={"content-type": "text/event-stream"})
+
+def text_events(chunks):
+    return [c.content for c in chunks if c.type == 'stream_delta']
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_anthropic_stream_resumes_with_prefill():
+    head = "\n".join(anthropic_text("Once upon ", "a time").splitlines()[:4]) + "\n"
+    route = respx.post(ANTHROPIC).mock(side_effect=[
+        dropped(head), event_stream(anthropic_text(" there was", " a fox."))
+    ])
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        chunks = [c async for c in client.messages.stream("claude-sonnet-4-5", "Tell a story", max_tokens=100, resume=True)]
+
+    retry = json.loads(route.calls[1].request.content)
+    assert retry["messages"][-1] == {"role": "assistant", "content": [{"type": "text", "text": "Once upon a time"}]}
+    assert retry["max_tokens"] < 100
+
+    events = text_events(chunks)
+    assert [e.type for e in events].count('text_start') == 1
+    assert "".join(e.text for e in events if e.type == 'text_delta') == "Once upon a time there was a fox."
+    assert [c.type for c in chunks].count('stream_start') == 1
+    stop = chunks[-1]
+    assert stop.data["resumed"] == 1
+    assert stop.data["usage"]["promptTokens"] > 20 and stop.data["usage"]["completionTokens"] > 5
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_azure_continuation_drops_repeated_text_at_the_seam():
+    head = "\n".join(azure_text("The quick brown ", "fox jumps").splitlines()[:2]) + "\n"
+    route = respx.post(AZURE).mock(side_effect=[
+        dropped(head), event_stream(azure_text("fox jumps over", " the lazy dog."))
+    ])
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        chunks = [c async for c in client.messages.stream("gpt-4o", "Pangram?", resume=True)]
+
+    retry = json.loads(route.calls[1].request.content)
+    assert retry["messages"][-2:] == [
+        {"role": "assistant", "content": "The quick brown fox jumps"},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+    text = "".join(e.text for e in text_events(chunks) if e.type == 'text_delta')
+    assert text == "The quick brown fox jumps over the lazy dog."
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stopped_resumed_stream_records_interrupted_attempts_once():
+    head = "\n".join(anthropic_text("Once upon ", "a time").splitlines()[:4]) + "\n"
+    respx.post(ANTHROPIC).mock(side_effect=[
+        dropped(head), event_stream(anthropic_text(" there was", " a fox.", " The end."))
+    ])
+    tracker = UsageTracker()
+    async with HChat(api_key="test-key", api_base=API_BASE, usage_tracker=tracker) as client:
+        stream = client.messages.stream("claude-sonnet-4-5", "Tell a story", resume=True, stop_when="fox")
+        chunks = [c async for c in stream]
+
+    assert chunks[-1].data["finishReason"] == "stop_condition"
+    [totals] = tracker.snapshot().totals
+    assert totals.requests == 1
+    assert (totals.prompt_tokens, totals.completion_tokens) == (stream.usage.promptTokens, stream.usage.completionTokens)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_drop_is_raised_without_resume():
+    respx.post(AZURE).mock(return_value=dropped(azure_text("Hi")))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        with pytest.raises(httpx.ReadError):
+            async for _ in client.messages.stream("gpt-4o", "Hi"):
+                pass
+
+@respx.mock
+def test_sync_stream_resumes():
+    head = "\n".join(anthropic_text("Hello").splitlines()[:3]) + "\n"
+    respx.post(ANTHROPIC).mock(side_effect=[dropped(head), event_stream(anthropic_text(" world"))])
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        with client.messages.stream("claude-sonnet-4-5", "Greet", resume=1) as stream:
+            chunks = list(stream)
+    assert stream.text == "Hello world"
+    assert chunks[-1].data["resumed"] == 1
+
+def test_strip_seam():
+    assert strip_seam("a sentence ends here", "ends here and goes on") == " and goes on"
+    assert strip_seam("Hello ", " world") == "world"  # whitespace trimmed from the prefill
+    assert strip_seam("x.", ". Next") == ". Next"  # short non-whitespace overlaps are kept
+
+def continuation(messages):
+    request = LLMRequest(
+        api_key="test-key", api_base=API_BASE, provider="azure", model="gpt-4o", messages=messages
+    )
+    return AzureProvider()._continuation_request(request, "partial")
+
+def test_continuation_is_refused_when_it_cannot_be_spliced():
+    tool_call = {"type": "tool_use", "id": "t1", "name": "lookup", "input": {}}
+    assert continuation([
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": [{"type": "text", "text": "Let me "}]},
+    ]) is None
+    assert continuation([
+        {"role": "user", "content": "Weather?"},
+        {"role": "assistant", "content": [tool_call]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": "sunny"}]},
+    ]) is None
+    assert continuation([
+        {"role": "user", "content": "Weather?"},
+        {"role": "assistant", "content": [tool_call]},
+        {"role": "tool", "content": "sunny"},
+    ]) is None
+
+    resumed = continuation([{"role": "user", "content": "Hi"}])
+    assert [m.content for m in resumed.messages] == ["Hi", "partial", CONTINUE_PROMPT]
@@ -0,0 +1,145 @@
+import json
+from typing import List, Optional
+
+import httpx
+import pytest
+import respx
+from pydantic import BaseModel
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.errors import StructuredOutputError
+from hchat_sdk.providers.google import GoogleProvider
+from hchat_sdk.structured import PartialJSONParser, normalize_response_format, parse_structured, to_gemini_schema
+from hchat_sdk.types.request import InputMessage, LLMRequest
+
+API_BASE = "https://api.test"
+
+class Address(BaseModel):
+    city: str
+
+class Person(BaseModel):
+    name: str
+    age: int
+    tags: List[str] = []
+    address: Optional[Address] = None
+
+def test_partial_parser_closes_open_containers():
+    parser = PartialJSONParser()
+    seen = []
+    for piece in ['{"na', 'me": "Ad', 'a", "ag', 'e": 3', '6, "tags": ["x", "y', '"]}']:
+        parser.feed(piece)
+        seen.append(parser.snapshot())
+    assert seen == [
+        {},
+        {"name": "Ad"},
+        {"name": "Ada"},
+        {"name": "Ada", "age": 3},
+        {"name": "Ada", "age": 36, "tags": ["x", "y"]},
+        {"name": "Ada", "age": 36, "tags": ["x", "y"]},
+    ]
+
+def test_partial_parser_handles_escapes_and_literals():
+    parser = PartialJSONParser()
+    parser.feed('{"q": "say \\"hi\\')
+    assert parser.snapshot() == {"q": 'say "hi'}
+    parser.feed('"", "ok": tr')
+    assert parser.snapshot() == {"q": 'say "hi"'}
+    parser.feed('ue}')
+    assert parser.snapshot() == {"q": 'say "hi"', "ok": True}
+
+def test_partial_parser_shares_finished_values():
+    parser = PartialJSONParser()
+    parser.feed('{"done": {"a": [1, 2]}, "open": [')
+    first = parser.snapshot()
+    version = parser.version
+    parser.feed('3, "\\ud83d\\ude00')
+    second = parser.snapshot()
+    assert parser.version != version
+    assert second["done"] is first["done"]  # finished values are not rebuilt
+    assert first["open"] == [] and second["open"] == [3, "\U0001f600"]
+
+def test_parse_structured_validates_models_and_schemas():
+    person = parse_structured('```json\n{"name": "Ada", "age": 36}\n```', Person)
+    assert person == Person(name="Ada", age=36)
+    with pytest.raises(StructuredOutputError):
+        parse_structured('{"name": "Ada"}', Person)
+    schema = {"type": "object", "required": ["total"]}
+    assert parse_structured('{"total": 3}', schema) == {"total": 3}
+    with pytest.raises(StructuredOutputError):
+        parse_structured('{"sum": 3}', schema)
+
+def test_gemini_schema_inlines_refs_and_nullable():
+    request = LLMRequest(
+        api_key="k", api_base=API_BASE, provider="google", model="gemini-2.5-flash",
+        messages=[InputMessage(role="user", content="hi")], response_format=normalize_response_format(Person)
+    )
+    config = GoogleProvider()._convert_request(request)["generationConfig"]
+    assert config["responseMimeType"] == "application/json"
+    schema = config["responseSchema"]
+    assert "$defs" not in json.dumps(schema) and "title" not in schema
+    assert schema["properties"]["address"] == {
+        "type": "object", "properties": {"city": {"type": "string"}}, "required": ["city"], "nullable": True
+    }
+
+class Node(BaseModel):
+    value: int
+    children: List["Node"] = []
+
+def test_gemini_schema_rejects_recursive_models():
+    with pytest.raises(ValueError, match="recursive schemas \\(Node -> Node\\)"):
+        to_gemini_schema(Node.model_json_schema())
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_parse_sends_json_schema_to_azure():
+    route = respx.post(f"{API_BASE}/openai/deployments/gpt-4o/chat/completions").mock(return_value=httpx.Response(200, json={
+        "id": "chatcmpl-1", "model": "gpt-4o", "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": '{"name": "Ada", "age": 36}'}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }))
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        result = await client.messages.parse("gpt-4o", "Who?", response_format=Person)
+
+    assert result.parsed == Person(name="Ada", age=36)
+    sent = json.loads(route.calls.last.request.content)["response_format"]
+    assert sent["type"] == "json_schema"
+    assert sent["json_schema"]["name"] == "Person"
+    assert sent["json_schema"]["schema"]["required"] == ["name", "age"]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_anthropic_forced_tool_streams_partial_objects():
+    deltas = ['{"name": "A', 'da", "age"', ': 36}']
+    sse = "\n".join(
+        ['data: {"type": "message_start", "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 12}}}',
+         'data: {"type": "content_block_start", "index": 0, "content_block": {"type": "tool_use", "id": "t1", "name": "Person", "input": {}}}']
+        + ["data: " + json.dumps({"type": "content_block_delta", "index": 0, "delta": {"type": "input_json_delta", "partial_json": d}})
+           for d in deltas]
+        + ['data: {"type": "content_block_stop", "index": 0}',
+           'data: {"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": 9}}',
+           'data: {"type": "message_stop"}', ""]
+    )
+    route = respx.post(f"{API_BASE}/claude/messages").mock(
+        return_value=httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+    )
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        chunks = [c async for c in client.messages.stream_parse("claude-sonnet-4-5", "Who?", response_format=Person)]
+
+    assert [c.partial for c in chunks[:-1]] == [{"name": "A"}, {"name": "Ada"}, {"name": "Ada", "age": 36}]
+    assert chunks[-1].done and chunks[-1].parsed == Person(name="Ada", age=36)
+    sent = json.loads(route.calls.last.request.content)
+    assert sent["tool_choice"] == {"type": "tool", "name": "Person"}
+    assert sent["tools"][-1]["input_schema"]["required"] == ["name", "age"]
+
+@respx.mock
+def test_sync_parse_maps_anthropic_tool_answer_to_text():
+    respx.post(f"{API_BASE}/claude/messages").mock(return_value=httpx.Response(200, json={
+        "id": "msg_1", "model": "claude-sonnet-4-5",
+        "content": [{"type": "tool_use", "id": "t1", "name": "response", "input": {"total": 3}}],
+        "stop_reason": "tool_use",
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }))
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        result = client.messages.parse("claude-sonnet-4-5", "Sum", response_format={"type": "object", "required": ["total"]})
+    assert result.parsed == {"total": 3}
+    assert result.response.choices[0].finishReason == "stop"
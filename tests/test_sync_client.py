@@ -0,0 +1,59 @@
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.context import ContextStrategy
+
+API_BASE = "https://api.test"
+
+ANTHROPIC_SSE = "\n".join([
+    'data: {"type": "message_start", "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 12}}}',
+    'data: {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}',
+    'data: {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hello"}}',
+    'data: {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": " there"}}',
+    'data: {"type": "content_block_stop", "index": 0}',
+    'data: {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 3}}',
+    'data: {"type": "message_stop"}',
+    "",
+])
+
+@respx.mock
+def test_sync_complete():
+    respx.post(f"{API_BASE}/openai/deployments/gpt-4o/chat/completions").mock(return_value=httpx.Response(200, json={
+        "id": "chatcmpl-1",
+        "model": "gpt-4o",
+        "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi!"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }))
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        response = client.messages.complete("gpt-4o", "Hello")
+    assert response.choices[0].message.content == "Hi!"
+    assert response.usage.totalTokens == 7
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_sync_stream_matches_async_stream():
+    respx.post(f"{API_BASE}/claude/messages").mock(
+        side_effect=lambda request: httpx.Response(200, text=ANTHROPIC_SSE, headers={"content-type": "text/event-stream"})
+    )
+
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        sync_chunks = [c.model_dump() for c in client.messages.stream("claude-sonnet-4-5", "Hello")]
+
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        async_chunks = [c.model_dump() async for c in client.messages.stream("claude-sonnet-4-5", "Hello")]
+
+    assert sync_chunks == async_chunks
+    assert [c["type"] for c in sync_chunks][0] == "stream_start"
+    assert sync_chunks[-1]["data"]["usage"]["promptTokens"] == 12
+
+def test_async_only_context_strategy_is_rejected():
+    class Retrieval(ContextStrategy):
+        async def apply(self, messages, model, client):
+            return messages
+
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        with pytest.raises(ValueError, match="Retrieval only supports the async client"):
+            client.messages.complete("gpt-4o", "Hello", context_strategy=Retrieval())
@@ -0,0 +1,81 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat, ContextWindowExceededError, count_tokens, count_tokens_batch
+from hchat_sdk.context import LastTurns
+from hchat_sdk.tokens import get_token_counter
+
+API_BASE = "https://api.test"
+AZURE = f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+def test_count_tokens_scales_with_text():
+    short = count_tokens("claude-sonnet-4-5", "Hello")
+    long = count_tokens("claude-sonnet-4-5", "Hello " * 1000)
+    assert 0 < short < long
+    assert get_token_counter("claude-sonnet-4-5") is get_token_counter("claude-sonnet-4-5")
+
+def test_count_tokens_batch_matches_single():
+    convs = [
+        [{"role": "user", "content": "What is the capital of Korea?"}],
+        [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello! How can I help?"}],
+    ]
+    assert count_tokens_batch("gemini-2.5-flash", convs) == [count_tokens("gemini-2.5-flash", c) for c in convs]
+
+def test_preflight_rejects_oversized_request():
+    client = HChat(api_key="test-key")
+    huge = "word " * 200_000
+    _, request, cfg = client.messages._build_request("gpt-4o", huge, {"context_overflow": "error"}, stream=False)
+    with pytest.raises(ContextWindowExceededError):
+        client.messages._check_context_window(request, cfg)
+
+def test_preflight_trims_oldest_turns():
+    client = HChat(api_key="test-key")
+    history = []
+    for i in range(40):
+        history.append({"role": "user", "content": f"question {i} " + "filler " * 5000})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+    history.append({"role": "user", "content": "final question"})
+
+    _, request, cfg = client.messages._build_request("gpt-4o", history, {"context_overflow": "trim"}, stream=False)
+    request = client.messages._check_context_window(request, cfg)
+    assert len(request.messages) < len(history)
+    assert request.messages[0].role == "user"
+    assert request.messages[-1].content == "final question"
+
+def long_history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "filler " * 5000})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+    return history + [{"role": "user", "content": "final question"}]
+
+def azure_completion(request):
+    return httpx.Response(200, json={
+        "id": "c", "model": "gpt-4o", "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    })
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_context_window_is_checked_after_the_context_strategy():
+    route = respx.post(AZURE).mock(side_effect=azure_completion)
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        await client.messages.complete(
+            "gpt-4o", long_history(40), context_strategy=LastTurns(1), context_overflow="error"
+        )
+        with pytest.raises(ContextWindowExceededError):
+            await client.messages.complete("gpt-4o", long_history(40), context_overflow="error")
+    assert [m["content"] for m in json.loads(route.calls[0].request.content)["messages"]] == ["final question"]
+
+@respx.mock
+def test_sync_context_window_is_checked_after_the_context_strategy():
+    respx.post(AZURE).mock(side_effect=azure_completion)
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        response = client.messages.complete(
+            "gpt-4o", long_history(40), context_strategy=LastTurns(1), context_overflow="error"
+        )
+    assert response.choices[0].message.content == "Hi"
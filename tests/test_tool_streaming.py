@@ -0,0 +1,82 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat
+from hchat_sdk.providers.openai import OpenAIProvider
+from hchat_sdk.types.request import InputMessage, LLMRequest
+
+API_BASE = "https://api.test"
+
+def tool_delta(index, args, id=None, name=None):
+    call = {"index": index, "function": {"arguments": args}}
+    if id:
+        call["id"] = id
+        call["function"]["name"] = name
+    return {"choices": [{"index": 0, "delta": {"tool_calls": [call]}}]}
+
+# Two parallel calls whose argument fragments interleave across indices
+CHUNKS = [
+    {"id": "chatcmpl-1", "model": "gpt-4o", "choices": [{"index": 0, "delta": {"role": "assistant"}}]},
+    tool_delta(0, "", id="call_a", name="get_weather"),
+    tool_delta(1, "", id="call_b", name="get_time"),
+    tool_delta(0, '{"city": "Se'),
+    tool_delta(1, '{"tz": "Asia/'),
+    tool_delta(0, 'oul"}'),
+    tool_delta(1, 'Seoul"}'),
+    {"choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}]},
+    {"choices": [], "usage": {"prompt_tokens": 20, "completion_tokens": 30, "total_tokens": 50}},
+]
+
+def sse(chunks):
+    return "\n".join(["data: " + json.dumps(c) for c in chunks] + ["data: [DONE]", ""])
+
+def collect_tool_calls(events):
+    calls, ends = {}, {}
+    for event in events:
+        if event.type == 'tool_call_start':
+            calls[event.toolCallId] = {"name": event.name, "args": ""}
+        elif event.type == 'tool_call_delta':
+            calls[event.toolCallId]["args"] += event.args
+        elif event.type == 'tool_call_end':
+            ends[event.toolCallId] = event.input
+    return calls, ends
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_azure_interleaved_parallel_tool_calls():
+    respx.post(f"{API_BASE}/openai/deployments/gpt-4o/chat/completions").mock(
+        return_value=httpx.Response(200, text=sse(CHUNKS), headers={"content-type": "text/event-stream"})
+    )
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        chunks = [c async for c in client.messages.stream("gpt-4o", "Weather and time in Seoul?")]
+
+    events = [c.content for c in chunks if c.type == 'stream_delta']
+    calls, ends = collect_tool_calls(events)
+    assert calls == {
+        "call_a": {"name": "get_weather", "args": '{"city": "Seoul"}'},
+        "call_b": {"name": "get_time", "args": '{"tz": "Asia/Seoul"}'},
+    }
+    assert ends == {"call_a": {"city": "Seoul"}, "call_b": {"tz": "Asia/Seoul"}}
+    # Every call is closed exactly once, before stream_stop
+    assert [e.type for e in events].count('tool_call_end') == 2
+    assert chunks[-1].type == 'stream_stop' and chunks[-1].data["finishReason"] == "tool_calls"
+
+def test_openai_parser_closes_calls_before_text():
+    request = LLMRequest(
+        api_key="k", api_base=API_BASE, provider="openai", model="gpt-4o",
+        messages=[InputMessage(role="user", content="hi")]
+    )
+    parser = OpenAIProvider()._create_stream_parser(request)
+    chunks = CHUNKS[:7] + [{"choices": [{"index": 0, "delta": {"content": "Done."}, "finish_reason": "stop"}]}]
+    events = []
+    for line in sse(chunks).split("\n"):
+        events += [c.content for c in parser.feed(line) if c.type == 'stream_delta']
+    events += [c.content for c in parser.finish() if c.type == 'stream_delta']
+
+    types = [e.type for e in events]
+    assert types.index('text_start') > max(i for i, t in enumerate(types) if t == 'tool_call_end')
+    assert collect_tool_calls(events)[1] == {"call_a": {"city": "Seoul"}, "call_b": {"tz": "Asia/Seoul"}}
+    assert types[-1] == 'text_end'
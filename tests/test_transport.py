@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+import pytest
+
+from hchat_sdk import HChat, SyncHChat
+
+API_BASE = "http://egress.local/v2/api"
+
+AZURE_COMPLETION = {
+    "id": "c", "model": "gpt-4o", "created": 1,
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+}
+ANTHROPIC_SSE = "\n".join("data: " + json.dumps(e) for e in [
+    {"type": "message_start", "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 3}}},
+    {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+    {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hello"}},
+    {"type": "content_block_stop", "index": 0},
+    {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 1}},
+    {"type": "message_stop"},
+]) + "\n"
+
+def route(path):
+    if path.endswith("/claude/messages"):
+        return "text/event-stream", ANTHROPIC_SSE.encode()
+    return "application/json", json.dumps(AZURE_COMPLETION).encode()
+
+seen = []
+
+async def asgi_app(scope, receive, send):
+    seen.append(scope["path"])
+    content_type, body = route(scope["path"])
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type.encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+def wsgi_app(environ, start_response):
+    content_type, body = route(environ["PATH_INFO"])
+    start_response("200 OK", [("Content-Type", content_type)])
+    return [body]
+
+@pytest.mark.asyncio
+async def test_asgi_transport_serves_every_provider_in_process():
+    seen.clear()
+    async with HChat(api_key="test-key", api_base=API_BASE, transport=httpx.ASGITransport(asgi_app)) as client:
+        response = await client.messages.complete("gpt-4o", "Hi")
+        chunks = [c async for c in client.messages.stream("claude-sonnet-4-5", "Hi")]
+
+    assert response.choices[0].message.content == "Hi"
+    assert chunks[-1].type == "stream_stop"
+    assert seen == ["/v2/api/openai/deployments/gpt-4o/chat/completions", "/v2/api/claude/messages"]
+
+def test_sync_client_takes_a_wsgi_transport():
+    with SyncHChat(api_key="test-key", api_base=API_BASE, transport=httpx.WSGITransport(wsgi_app)) as client:
+        assert client.messages.complete("gpt-4o", "Hi").choices[0].message.content == "Hi"
+
+@pytest.mark.asyncio
+async def test_unix_domain_socket():
+    requests = []
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length"))
+        requests.append((head.split(b" ")[1].decode(), json.loads(await reader.readexactly(length))))
+        body = json.dumps(AZURE_COMPLETION).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    path = os.path.join(tempfile.mkdtemp(), "egress.sock")
+    server = await asyncio.start_unix_server(handle, path)
+    async with server:
+        async with HChat(api_key="test-key", api_base=API_BASE, uds=path) as client:
+            response = await client.messages.complete("gpt-4o", "Hi")
+
+    assert response.usage.totalTokens == 7
+    assert requests[0][0] == "/v2/api/openai/deployments/gpt-4o/chat/completions"
+    assert requests[0][1]["messages"][0]["content"] == "Hi"
+
+@pytest.mark.asyncio
+async def test_caller_owned_client_is_left_open():
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(asgi_app))
+    async with HChat(api_key="test-key", api_base=API_BASE, http_client=http_client) as client:
+        await client.messages.complete("gpt-4o", "Hi")
+    assert not http_client.is_closed
+    await http_client.aclose()
+
+def test_conflicting_transport_options_are_rejected():
+    with pytest.raises(ValueError):
+        HChat(api_key="k", uds="/tmp/egress.sock", proxy="http://proxy:3128")
+    with pytest.raises(ValueError):
+        SyncHChat(api_key="k", transport=httpx.HTTPTransport(), uds="/tmp/egress.sock")
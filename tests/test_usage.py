@@ -0,0 +1,108 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import BudgetExceededError, HChat, SyncHChat
+from hchat_sdk.capabilities import ModelPricing
+from hchat_sdk.types.response import Usage
+from hchat_sdk.usage import Budget, UsageTracker, cost_of
+
+API_BASE = "https://api.test"
+AZURE = f"{API_BASE}/openai/deployments/{{model}}/chat/completions"
+
+def azure_completion(model, prompt_tokens=1000, completion_tokens=500):
+    return httpx.Response(200, json={
+        "id": "chatcmpl-1", "model": model, "created": 1,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    })
+
+def test_cost_bills_cached_tokens_at_cache_price():
+    pricing = ModelPricing(input=3.0, output=15.0, cache_read=0.3, cache_write=3.75)
+    usage = Usage(prompt_tokens=1_000_000, completion_tokens=100_000, total_tokens=1_100_000,
+                  cache_read_tokens=800_000, cache_write_tokens=100_000)
+    assert cost_of(usage, pricing) == pytest.approx(0.3 + 0.24 + 0.375 + 1.5)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_usage_is_aggregated_per_model_tenant_and_tag():
+    respx.post(AZURE.format(model="gpt-4o")).mock(return_value=azure_completion("gpt-4o"))
+    tracker = UsageTracker()
+
+    async with HChat(api_key="test-key", api_base=API_BASE, usage_tracker=tracker) as client:
+        await client.messages.complete("gpt-4o", "Hello", tenant="search", tag="rerank")
+        await client.messages.complete("gpt-4o", "Hello", tenant="search", tag="rerank")
+        await client.messages.complete("gpt-4o", "Hello", tenant="etl")
+
+    snapshot = tracker.snapshot()
+    by_key = {(t.tenant, t.tag): t for t in snapshot.totals}
+    assert by_key[("search", "rerank")].requests == 2
+    assert by_key[("search", "rerank")].prompt_tokens == 2000
+    # gpt-4o: $2.50 / 1M input, $10 / 1M output
+    assert tracker.spent(tenant="etl") == pytest.approx(0.0025 + 0.005)
+    assert snapshot.total_cost == pytest.approx(3 * 0.0075)
+
+@respx.mock
+def test_budget_rejects_then_downgrades():
+    respx.post(AZURE.format(model="gpt-4o")).mock(return_value=azure_completion("gpt-4o"))
+    mini = respx.post(AZURE.format(model="gpt-4o-mini")).mock(return_value=azure_completion("gpt-4o-mini"))
+    tracker = UsageTracker(budgets=[
+        Budget(limit=0.005, tenant="etl"),
+        Budget(limit=0.005, tenant="search", model="gpt-4o", action="downgrade", downgrade_to="gpt-4o-mini"),
+    ])
+
+    with SyncHChat(api_key="test-key", api_base=API_BASE, usage_tracker=tracker) as client:
+        client.messages.complete("gpt-4o", "Hello", tenant="etl")
+        with pytest.raises(BudgetExceededError):
+            client.messages.complete("gpt-4o", "Hello", tenant="etl")
+
+        client.messages.complete("gpt-4o", "Hello", tenant="search")
+        response = client.messages.complete("gpt-4o", "Hello", tenant="search")
+
+    assert response.model == "gpt-4o-mini"
+    assert mini.call_count == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_usage_is_recorded_for_gemini():
+    sse = "\n".join([
+        "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": "Hi"}]}}], "modelVersion": "gemini-2.5-flash"}),
+        "data: " + json.dumps({
+            "candidates": [{"content": {"parts": [{"text": " there"}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 4, "thoughtsTokenCount": 6, "totalTokenCount": 20},
+        }),
+        "",
+    ])
+    respx.post(url__startswith=f"{API_BASE}/models/gemini-2.5-flash:streamGenerateContent").mock(
+        return_value=httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+    )
+    tracker = UsageTracker()
+
+    async with HChat(api_key="test-key", api_base=API_BASE, usage_tracker=tracker) as client:
+        chunks = [c async for c in client.messages.stream("gemini-2.5-flash", "Hello")]
+
+    usage = chunks[-1].data["usage"]
+    assert (usage["promptTokens"], usage["completionTokens"], usage["reasoningTokens"]) == (10, 10, 6)
+    [totals] = tracker.snapshot().totals
+    assert totals.completion_tokens == 10
+    assert totals.cost == pytest.approx((10 * 0.30 + 10 * 2.50) / 1_000_000)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_anthropic_response_has_timestamp_and_reasoning_estimate():
+    respx.post(f"{API_BASE}/claude/messages").mock(return_value=httpx.Response(200, json={
+        "id": "msg_1", "model": "claude-sonnet-4-5", "stop_reason": "end_turn",
+        "content": [
+            {"type": "thinking", "thinking": "Let me think about this carefully. " * 10, "signature": "sig"},
+            {"type": "text", "text": "Hi"},
+        ],
+        "usage": {"input_tokens": 12, "output_tokens": 200},
+    }))
+
+    async with HChat(api_key="test-key", api_base=API_BASE) as client:
+        response = await client.messages.complete("claude-sonnet-4-5", "Hello", reasoning=True)
+
+    assert response.created > 0
+    assert 0 < response.usage.reasoningTokens < 200
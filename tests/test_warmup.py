@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+import pytest
+import respx
+
+from hchat_sdk import HChat, SyncHChat
+from hchat_sdk.warmup import endpoints
+
+API_BASE = "http://egress.local/v2/api"
+
+AZURE_COMPLETION = json.dumps({
+    "id": "c", "model": "gpt-4o", "created": 1,
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+}).encode()
+
+
+class CountingServer:
+    """Keep-alive HTTP/1.1 server on a Unix socket that counts accepted connections."""
+
+    def __init__(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "egress.sock")
+        self.connections = 0
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                method = head.split(b" ")[0].decode()
+                self.requests.append(method)
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                status, body = (b"405 Method Not Allowed", b"") if method == "HEAD" else (b"200 OK", AZURE_COMPLETION)
+                writer.write(b"HTTP/1.1 %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                             % (status, len(body), body))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_warmup_preopens_pooled_connections():
+    server = CountingServer()
+    async with await asyncio.start_unix_server(server.handle, server.path):
+        async with HChat(api_key="test-key", api_base=API_BASE, uds=server.path) as client:
+            results = await client.warmup(models=["gpt-4o", "gpt-4o", "claude-sonnet-4-5"], connections=4)
+            warmed = server.connections
+            await asyncio.gather(*(client.messages.complete("gpt-4o", "Hi") for _ in range(4)))
+
+    # Both models are served from one origin, whose pool is shared: probed once
+    assert [r.url for r in results] == [f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"]
+    assert results[0].connections == 4 and results[0].error is None
+    assert warmed == 4
+    assert server.connections == warmed  # the real requests reused warm connections
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_keepalive_probes_until_closed():
+    route = respx.head(url__startswith=f"{API_BASE}/models/gemini-2.5-flash").mock(return_value=httpx.Response(404))
+    async with HChat(api_key="secret", api_base=API_BASE) as client:
+        [result] = await client.warmup(models=["gemini-2.5-flash"])
+        task = client.start_keepalive(models=["gemini-2.5-flash"], interval=0.01)
+        await asyncio.sleep(0.1)
+    assert result.url == f"{API_BASE}/models/gemini-2.5-flash:generateContent"
+    assert task.cancelled() and route.call_count >= 3
+    probe = route.calls[-1].request
+    assert not probe.url.query and probe.headers["x-goog-api-key"] == "secret"  # key kept out of the URL
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_keepalive_interval_follows_keepalive_expiry(monkeypatch):
+    respx.head(url__startswith=API_BASE).mock(return_value=httpx.Response(404))
+    sleeps = []
+    sleep = asyncio.sleep
+
+    async def spy(delay):
+        sleeps.append(delay)
+        await sleep(0)
+    monkeypatch.setattr("hchat_sdk.warmup.asyncio.sleep", spy)
+    async with HChat(api_key="test-key", api_base=API_BASE, keepalive_expiry=60) as client:
+        client.start_keepalive(models=["gpt-4o"])
+        while not sleeps:
+            await sleep(0)
+        with pytest.raises(ValueError, match="below the pool's keepalive_expiry"):
+            client.start_keepalive(models=["gpt-4o"], interval=60)
+    assert sleeps[0] == pytest.approx(48)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_keepalive_interval_follows_a_supplied_client(monkeypatch):
+    respx.head(url__startswith=API_BASE).mock(return_value=httpx.Response(404))
+    sleeps = []
+    sleep = asyncio.sleep
+
+    async def spy(delay):
+        sleeps.append(delay)
+        await sleep(0)
+    monkeypatch.setattr("hchat_sdk.warmup.asyncio.sleep", spy)
+    async with httpx.AsyncClient(limits=httpx.Limits(keepalive_expiry=10)) as http_client:
+        async with HChat(api_key="test-key", api_base=API_BASE, http_client=http_client) as client:
+            client.start_keepalive(models=["gpt-4o"])
+            while not sleeps:
+                await sleep(0)
+    assert sleeps[0] == pytest.approx(8)
+
+def test_endpoints_are_deduplicated_by_origin():
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        [(url, _)] = endpoints(client.messages, ["gpt-4o", "claude-sonnet-4-5", "gemini-2.5-flash"])
+    assert url == f"{API_BASE}/openai/deployments/gpt-4o/chat/completions"
+
+@respx.mock
+def test_sync_warmup_reports_errors():
+    respx.head(url__startswith=API_BASE).mock(side_effect=httpx.ConnectError("refused"))
+    with SyncHChat(api_key="test-key", api_base=API_BASE) as client:
+        results = client.warmup(connections=2)
+    assert len(results) == 1  # every provider is behind the one api_base origin
+    assert all(r.connections == 0 and "refused" in r.error for r in results)